@@ -1,113 +1,3447 @@
 # Made with <3 by berg_
 # Can be used on its own, but will also integrate with the server monitor!
 
-import customtkinter as ctk
 import os
 import sys
 import glob
 import re
 import csv
 import json
+import importlib.util
+import importlib.machinery
+import hashlib
+import time
+import math
+import argparse
+import socket
+import tempfile
+import shutil
+import zipfile
+import zlib
+import gzip
+import bz2
+import lzma
+import struct
+import heapq
+import itertools
 import threading
-import requests
+import multiprocessing
+import mmap
+import select
+import ctypes
+import ctypes.util
 import subprocess
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
-from matplotlib.figure import Figure
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-import tkinter.messagebox as msgbox
-import matplotlib.gridspec as gridspec
+
+# The dashboard packages are optional so the engine and CLI also run on
+# headless servers that only have the standard library. matplotlib is by far
+# the slowest to import, so it is only loaded once the dashboard window is up
+# (load_chart_modules), and requests only when checking for updates.
+try:
+    import customtkinter as ctk
+    import tkinter.messagebox as msgbox
+except ImportError:
+    ctk = None
+Figure = Wedge = FigureCanvasTkAgg = gridspec = mdates = None
+
+def load_chart_modules():
+    global Figure, Wedge, FigureCanvasTkAgg, gridspec, mdates
+    if Figure is not None:
+        return
+    from matplotlib.figure import Figure as figure_class
+    from matplotlib.patches import Wedge
+    from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+    import matplotlib.gridspec as gridspec
+    import matplotlib.dates as mdates
+    # Assigned last: other threads take a set Figure to mean everything is loaded
+    Figure = figure_class
 
 # --- Configuration & Constants ---
 CURRENT_VERSION = "2.1.1"
 CTK_THEME = "dark-blue"
+CHART_DEBOUNCE_MS = 150
 REPO_OWNER = "EchoTools"
 REPO_NAME = "EchoVR-Windows-Hosts-Resources"
-ctk.set_appearance_mode("Dark")
-ctk.set_default_color_theme(CTK_THEME)
 
-# --- Path Handling for PyInstaller ---
-# This block detects if we are running as a compiled exe or a script
-IS_FROZEN = getattr(sys, 'frozen', False)
+# --- Path Handling for PyInstaller ---
+# This block detects if we are running as a compiled exe or a script
+IS_FROZEN = getattr(sys, 'frozen', False)
+
+if IS_FROZEN:
+    # If compiled, use the directory of the executable
+    BASE_DIR = os.path.dirname(sys.executable)
+    APP_FILE = sys.executable
+    APP_EXT = ".exe"
+else:
+    # If running as a script, use the directory of the script file
+    BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+    APP_FILE = os.path.abspath(__file__)
+    APP_EXT = ".py"
+
+# Directory Paths
+LOG_DIR = os.path.join(BASE_DIR, "_local", "r14logs")
+LOG_DIR_OLD = os.path.join(LOG_DIR, "old")
+STATS_DIR = os.path.join(BASE_DIR, "dashboard", "stats")
+TEMP_DIR = os.path.join(BASE_DIR, "dashboard", "temp")
+ECHO_EXE = os.path.join(BASE_DIR, "bin", "win10", "echovr.exe")
+
+LOG_DIRS = (LOG_DIR, LOG_DIR_OLD)
+
+# Stats file names (inside a stats directory)
+LEGACY_LEVELS_TXT = "levels.txt"
+LEGACY_PLAYERS_TXT = "players.txt"
+LEGACY_ERRORS_TXT = "errors.txt"
+LEGACY_PROCESSED_JSON = "processed_logs.json"
+IMPORT_MANIFEST_JSON = "import_manifest.json"
+ROLLUPS_JSON = "rollups.json"
+PRESENCE_BIN = "presence.bin"
+ROLLUPS_JOURNAL = "rollups.journal"
+DICTIONARY_JSON = "dictionary.json"
+SHARD_JSON = "shard.json"
+METRICS_JSON = "metrics.json"
+METRICS_PROM = "metrics.prom"
+SNAPSHOT_JSON = "snapshot.json"
+DEDUPE_JSON = "dedupe.json"
+DEDUPE_KEYS = "dedupe.keys"
+DEDUPE_BLOOM = "dedupe.bloom"
+SEGMENTS_JSON = "segments.json"
+
+# Storage Maintenance (see "compact")
+COMPACT_AFTER_DAYS = 31   # day segments of months older than this are merged into one file per month
+RAW_RETENTION_DAYS = None # raw events older than this are dropped by "compact"; None keeps everything
+
+# Hex Mappings
+LEVEL_MAP = {
+    "0xD09AFD15B1C75C04": "Lobby",
+    "0x576ED3F8428EBC4B": "Arena",
+    "0xDF5CA7B7DFA383D4": "Fission",
+    "0x43E2DA7A0C623A19": "Surge",
+    "0x43E2DA7914642604": "Dyson",
+    "0x42670F2BED45703C": "Combustion"
+}
+
+GAMETYPE_MAP = {
+    "0x042D9CF9CFDDCF76": ("Public", "Lobby"),
+    "0x305D6E37C1589C45": ("Private", "Lobby"),
+    "0xCB60A4DE7E1CAF73": ("Public", "Arena"),
+    "0x09990965F4DB8C03": ("Private", "Arena"),
+    "0x3D5C3976578A321A": ("Public", "Combat"),
+    "0x33BBF6842DF97A3F": ("Private", "Combat")
+}
+
+# Error Signatures
+KNOWN_ERRORS = [
+    "Unable to find MiniDumpWriteDump",
+    "[NETGAME] Service status request failed: 400 Bad Request",
+    "[NETGAME] Service status request failed: 404 Not Found",
+    "[TCP CLIENT] [R14NETCLIENT] connection to ws:///login",
+    "[TCP CLIENT] [R14NETCLIENT] connection to failed",
+    "[TCP CLIENT] [R14NETCLIENT] connection to established",
+    "[TCP CLIENT] [R14NETCLIENT] connection to restored",
+    "[TCP CLIENT] [R14NETCLIENT] connection to closed",
+    "[TCP CLIENT] [R14NETCLIENT] Lost connection (okay) to peer",
+    "[NETGAME] Service status request failed: 502 Bad Gateway",
+    "[NETGAME] Service status request failed: 0 Unknown"
+]
+
+# Error Legend Aliases
+ERROR_ALIASES = {
+    "Unable to find MiniDumpWriteDump": "Unable to find MiniDumpWriteDump",
+    "[NETGAME] Service status request failed: 400 Bad Request": "400 Bad Request [NETGAME]",
+    "[NETGAME] Service status request failed: 404 Not Found": "404 Not Found [NETGAME]",
+    "[TCP CLIENT] [R14NETCLIENT] connection to ws:///login": "R14 Login Connection Error [TCP]",
+    "[TCP CLIENT] [R14NETCLIENT] connection to failed": "R14 Connection Failed [TCP]",
+    "[TCP CLIENT] [R14NETCLIENT] connection to established": "R14 Connection Established [TCP]",
+    "[TCP CLIENT] [R14NETCLIENT] connection to restored": "R14 Connection Restored [TCP]",
+    "[TCP CLIENT] [R14NETCLIENT] connection to closed": "R14 Connection Closed [TCP]",
+    "[TCP CLIENT] [R14NETCLIENT] Lost connection (okay) to peer": "R14 Lost Peer Connection [TCP]",
+    "[NETGAME] Service status request failed: 502 Bad Gateway": "502 Bad Gateway [NETGAME]",
+    "[NETGAME] Service status request failed: 0 Unknown": "0 Unknown [NETGAME]"
+}
+
+# Errors the dashboard timeline can be limited to (matched like `query --error`)
+TIMELINE_ERROR_FILTERS = {
+    "All Errors": None,
+    "NETGAME Status Failures": "Service status request failed",
+    **{alias: alias for alias in ERROR_ALIASES.values()},
+}
+
+# --- Time Helpers ---
+# Timestamps are stored as "wall clock" epoch seconds: the naive local date/time
+# from the log treated as if it were UTC. This keeps comparisons identical to the
+# old naive datetime math (datetime.now() - log time) without timezone surprises.
+EPOCH = datetime(1970, 1, 1)
+TIME_PATTERN = re.compile(r'\[(\d{2}):(\d{2}):(\d{2})\]')
+
+def to_epoch(dt):
+    return int((dt - EPOCH).total_seconds())
+
+def from_epoch(ts):
+    return EPOCH + timedelta(seconds=ts)
+
+def range_start(delta):
+    """First epoch second inside "the last <delta>", matching now - log time <= delta."""
+    return math.ceil(((datetime.now() - delta) - EPOCH).total_seconds())
+
+def time_slice(ts, since=None, until=None):
+    """Index range [i, j) of the sorted timestamp array that falls in [since, until)."""
+    i = 0 if since is None else bisect_left(ts, since)
+    j = len(ts) if until is None else bisect_left(ts, until)
+    return i, max(i, j)
+
+def line_epoch(day_epoch, line):
+    """Combine the file's date with the first [HH:MM:SS] stamp in the line."""
+    match = TIME_PATTERN.search(line)
+    if not match:
+        return day_epoch
+    h, m, s = match.groups()
+    return day_epoch + int(h) * 3600 + int(m) * 60 + int(s)
+
+# --- Line Classifier ---
+# Every marker we care about (session start, player join, error signatures) is
+# folded into one prefix-trie regex, so the import loop does a single scan per
+# line and shared prefixes like "[NETGAME] " are only tested once no matter how
+# many error signatures are configured.
+SESSION_MARKER = "[NETLOBBY] Starting session"
+JOIN_MARKER = "[NETGAME] User '"
+JOIN_PATTERN = re.compile(r"\[NETGAME\] User '(.*?)' participating")
+GAMETYPE_PATTERN = re.compile(r'gametype (0x[0-9A-F]+)')
+LEVEL_PATTERN = re.compile(r'level (0x[0-9A-F]+)')
+# With template mining on, lines holding one of these that match no signature
+# above are kept as "problem" lines (see Template Mining). Word tails like
+# "rror" cover error / Error in one marker; every extra leading character
+# slows the byte scan down, so the list is kept short.
+PROBLEM_MARKERS = ["rror", "ERROR", "fail", "Fail", "FAIL", "arning", "WARN", "xception", "unable", "Unable",
+                   "imed out", "imeout", "refused", "denied", "nvalid", "crash", "Crash"]
+# Leading [date] [time]: stamps, and tokens holding a digit (ports, IDs,
+# counts) other than component tags like [R14NETSERVER]
+LOG_PREFIX_PATTERN = re.compile(r'^(?:\[[\d:/. -]*\]:?\s*)+')
+VARIABLE_TOKEN_PATTERN = re.compile(r'(?<!\S)(?!\[[A-Z][A-Z0-9_]*\]:?(?!\S))\S*\d\S*')
+TEMPLATE_WILDCARD = "<*>"
+TEMPLATE_MAX_TOKENS = 40
+
+def build_trie_pattern(words):
+    """Build a regex source that matches any of the literal words, factored as a trie."""
+    trie = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[""] = True
+
+    def build(node):
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        if len(branches) == 1 and "" not in node:
+            return branches[0]
+        group = "(?:" + "|".join(branches) + ")"
+        # A word ending here is still allowed to continue into a longer one
+        return group + "?" if "" in node else group
+
+    return build(trie)
+
+def problem_message(line):
+    """A problem line without its time stamps, variable tokens masked as <*>."""
+    message = VARIABLE_TOKEN_PATTERN.sub(TEMPLATE_WILDCARD, LOG_PREFIX_PATTERN.sub("", line, count=1))
+    return " ".join(message.split()[:TEMPLATE_MAX_TOKENS])
+
+class LineClassifier:
+    SESSION = "session"
+    JOIN = "join"
+    ERROR = "error"
+    PROBLEM = "problem"
+
+    def __init__(self, signatures=KNOWN_ERRORS, mine=False):
+        self.signatures = list(signatures)
+        self.problem_markers = set(PROBLEM_MARKERS) if mine else set()
+        source = build_trie_pattern([SESSION_MARKER, JOIN_MARKER] + self.signatures + sorted(self.problem_markers))
+        self.pattern = re.compile(source)
+        # Same markers as raw bytes, for scanning log files without decoding them
+        self.byte_pattern = re.compile(source.encode('utf-8'))
+
+    def classify(self, line):
+        """Return (kind, value) for an interesting line, or None to ignore it.
+
+        session -> (gametype hex, level hex), join -> username, error -> signature,
+        problem -> masked message (only when mining)
+        """
+        pos = 0
+        problem = False
+        while True:
+            match = self.pattern.search(line, pos)
+            if match is None:
+                return (self.PROBLEM, problem_message(line)) if problem else None
+            marker = match.group()
+            if marker == SESSION_MARKER:
+                gt_match = GAMETYPE_PATTERN.search(line)
+                lvl_match = LEVEL_PATTERN.search(line)
+                if gt_match and lvl_match:
+                    return self.SESSION, (gt_match.group(1), lvl_match.group(1))
+            elif marker == JOIN_MARKER:
+                join_match = JOIN_PATTERN.match(line, match.start())
+                if join_match:
+                    return self.JOIN, join_match.group(1)
+            elif marker in self.problem_markers:
+                # Keep looking: a known signature later in the line wins
+                problem = True
+            else:
+                return self.ERROR, marker
+            pos = match.end()
+
+LINE_CLASSIFIER = LineClassifier()
+MINING_CLASSIFIER = LineClassifier(mine=True)
+
+# --- Metrics ---
+# Timing spans and counters for the import, query and drawing phases, plus
+# per-file scan stats from the last import. Saved as metrics.json and in the
+# Prometheus text format (metrics.prom, for a node_exporter textfile collector).
+# Totals carry on from the saved file, so they keep growing across runs like
+# Prometheus counters should.
+class Metrics:
+    def __init__(self, path=None):
+        self.lock = threading.Lock()
+        self.spans = {}
+        self.counters = {}
+        self.files = []
+        self.updated = None
+        if path and os.path.exists(path):
+            self.load(path)
+
+    def load(self, path):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return # Diagnostics only; start over rather than fail
+        self.spans = data.get("spans", {})
+        self.counters = data.get("counters", {})
+        self.files = data.get("files", [])
+        self.updated = data.get("updated")
+
+    @contextmanager
+    def span(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - started)
+
+    def add_time(self, name, seconds):
+        with self.lock:
+            span = self.spans.setdefault(name, {"count": 0, "seconds": 0.0, "max_seconds": 0.0})
+            span["count"] += 1
+            span["seconds"] += seconds
+            span["max_seconds"] = max(span["max_seconds"], seconds)
+            self.updated = time.time()
+
+    def count(self, name, n=1):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def start_import(self):
+        with self.lock:
+            self.files = []
+
+    def add_file(self, result):
+        """Record a scan result's per-file stats (and their share of the totals)."""
+        stats = result.get("metrics")
+        if not stats:
+            return
+        # Worker time, so with several workers these add up to more than wall time
+        self.add_time("import.read", stats["read_s"])
+        self.add_time("import.classify", stats["classify_s"])
+        for key in ("lines", "bytes", "matches", "events"):
+            self.count(f"import.{key}", stats[key])
+        self.count("import.files")
+        if not result["ok"]:
+            self.count("import.failed_files")
+        with self.lock:
+            self.files.append(dict(stats, path=result["path"], ok=result["ok"]))
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                "updated": self.updated,
+                "spans": {name: dict(span) for name, span in self.spans.items()},
+                "counters": dict(self.counters),
+                "files": [dict(f) for f in self.files],
+            }
+
+    def save(self, stats_dir, host):
+        snapshot = self.snapshot()
+        snapshot["host"] = host
+        write_json_atomic(os.path.join(stats_dir, METRICS_JSON), snapshot)
+        tmp_path = os.path.join(stats_dir, METRICS_PROM + ".tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(prometheus_text(snapshot))
+        os.replace(tmp_path, os.path.join(stats_dir, METRICS_PROM))
+
+def prometheus_label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def prometheus_text(snapshot):
+    """Render a metrics snapshot (see Metrics.snapshot) in the Prometheus text format."""
+    host = prometheus_label(snapshot.get("host") or "")
+    out = []
+    def family(name, kind, help_text, samples):
+        out.append(f"# HELP echovr_tracker_{name} {help_text}")
+        out.append(f"# TYPE echovr_tracker_{name} {kind}")
+        for labels, value in samples:
+            labels = ",".join([f'host="{host}"'] + [f'{k}="{prometheus_label(v)}"' for k, v in labels])
+            out.append(f"echovr_tracker_{name}{{{labels}}} {value}")
+
+    spans = sorted(snapshot["spans"].items())
+    family("span_seconds_total", "counter", "Time spent in each phase.", [((("span", n),), s["seconds"]) for n, s in spans])
+    family("span_count_total", "counter", "Times each phase ran.", [((("span", n),), s["count"]) for n, s in spans])
+    family("span_max_seconds", "gauge", "Slowest single run of each phase.", [((("span", n),), s["max_seconds"]) for n, s in spans])
+    family("events_total", "counter", "Import counters (lines, bytes, marker matches, events, files).",
+           [((("counter", n),), v) for n, v in sorted(snapshot["counters"].items())])
+    for key, help_text in (("lines", "Lines read"), ("bytes", "Bytes read"), ("matches", "Marker matches"),
+                           ("events", "Events stored"), ("read_s", "Seconds opening/reading"), ("classify_s", "Seconds classifying")):
+        family(f"file_{key}", "gauge", f"{help_text} per file in the last import.",
+               [((("file", f["path"]),), f[key]) for f in snapshot["files"]])
+    return "\n".join(out) + "\n"
+
+def format_metrics(snapshot):
+    """Plain-text report for the Diagnostics window and the metrics command."""
+    lines = []
+    if snapshot.get("updated"):
+        lines.append(f"Updated: {datetime.fromtimestamp(snapshot['updated']).strftime('%Y-%m-%d %H:%M:%S')}")
+    lines.append(f"{'Phase':<22}{'Runs':>7}{'Total s':>10}{'Max s':>9}")
+    for name, span in sorted(snapshot["spans"].items(), key=lambda item: item[1]["seconds"], reverse=True):
+        lines.append(f"{name:<22}{span['count']:>7}{span['seconds']:>10.3f}{span['max_seconds']:>9.3f}")
+    if snapshot["counters"]:
+        lines.append("")
+        for name, n in sorted(snapshot["counters"].items()):
+            lines.append(f"{name:<22}{n:>17}")
+    if snapshot["files"]:
+        lines.append("")
+        lines.append(f"{'Last import':<34}{'Lines':>10}{'MB':>8}{'Matches':>9}{'Events':>8}{'Secs':>7}")
+        for f in snapshot["files"]:
+            name = os.path.basename(f["path"])[:33]
+            secs = f["read_s"] + f["classify_s"]
+            lines.append(f"{name:<34}{f['lines']:>10}{f['bytes'] / 1e6:>8.1f}{f['matches']:>9}{f['events']:>8}{secs:>7.2f}")
+    return "\n".join(lines)
+
+# --- Columnar Event Store ---
+# Each table is stored as one binary file per column, kept sorted by timestamp
+# so time ranges are found with a binary search. Strings are interned to small
+# integer codes through dictionary.json so readers get typed arrays back instead
+# of re-parsing log text.
+STORE_TABLES = {
+    "levels": (("ts", "q"), ("level", "H"), ("gametype", "H")),
+    "players": (("ts", "q"), ("player", "I")),
+    "errors": (("ts", "q"), ("error", "H")),
+    # Reconstructed intervals, keyed by their start time
+    "matches": (("ts", "q"), ("end", "q"), ("level", "H"), ("gametype", "H")),
+    "visits": (("ts", "q"), ("end", "q"), ("player", "I")),
+}
+DICTIONARY_KINDS = ("level", "gametype", "error", "player")
+# Rows per read when streaming a table out (e.g. CSV export)
+EXPORT_CHUNK_ROWS = 65536
+
+def write_json_atomic(path, data):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+class EventStore:
+    def __init__(self, stats_dir=STATS_DIR):
+        self.stats_dir = stats_dir
+        self.dictionary_path = os.path.join(stats_dir, DICTIONARY_JSON)
+        self.dicts = {kind: [] for kind in DICTIONARY_KINDS}
+        self.codes = {kind: {} for kind in DICTIONARY_KINDS}
+        self.segments = {}
+        self.starts = {}
+        self.dropped_before = {}
+        # Whether the dictionary changed since it was saved
+        self.dictionary_dirty = False
+        self.load_dictionary()
+        self.load_segments()
+        self.split_flat_tables()
+
+    # --- Dictionary ---
+    def load_dictionary(self):
+        if not os.path.exists(self.dictionary_path):
+            return
+        with open(self.dictionary_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        for kind in DICTIONARY_KINDS:
+            values = data.get(kind, [])
+            self.dicts[kind] = values
+            self.codes[kind] = {v: i for i, v in enumerate(values)}
+        self.dictionary_dirty = False
+
+    def save_dictionary(self):
+        if self.dictionary_dirty or not os.path.exists(self.dictionary_path):
+            write_json_atomic(self.dictionary_path, self.dicts)
+            self.dictionary_dirty = False
+
+    def intern(self, kind, value):
+        code = self.codes[kind].get(value)
+        if code is None:
+            code = len(self.dicts[kind])
+            self.dicts[kind].append(value)
+            self.codes[kind][value] = code
+            self.dictionary_dirty = True
+        return code
+
+    def lookup(self, kind, code):
+        return self.dicts[kind][code]
+
+    def rename(self, kind, code, value):
+        """Change the string behind a code (mined templates generalise over time)."""
+        old = self.dicts[kind][code]
+        if self.codes[kind].get(old) == code:
+            del self.codes[kind][old]
+        self.dicts[kind][code] = value
+        self.codes[kind].setdefault(value, code)
+        self.dictionary_dirty = True
+
+    # --- Segments ---
+    # A table is a folder of segments, each holding the rows of one day (or one
+    # month, once compacted) as a file per column, plus segments.json listing
+    # them in time order with their [lo, hi) period and row count. Row numbers
+    # run across the segments in that order, as if the table were one file.
+    def table_dir(self, table):
+        return os.path.join(self.stats_dir, table)
+
+    def segments_path(self, table):
+        return os.path.join(self.table_dir(table), SEGMENTS_JSON)
+
+    def segment_path(self, table, name, column):
+        return os.path.join(self.table_dir(table), f"{name}.{column}.bin")
+
+    def table_paths(self, table):
+        """Files whose (size, mtime) change whenever the table does."""
+        return [self.segments_path(table)]
+
+    def load_segments(self, table=None):
+        for table in ([table] if table else STORE_TABLES):
+            path = self.segments_path(table)
+            data = {}
+            if os.path.exists(path):
+                with open(path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            self.set_segments(table, data.get("segments", []), data.get("dropped_before"))
+
+    def set_segments(self, table, segments, dropped_before=None):
+        self.segments[table] = segments
+        self.dropped_before[table] = dropped_before
+        self.starts[table] = prefix_sums(segment["rows"] for segment in segments)
+
+    def save_segments(self, table, segments, dropped_before=None):
+        os.makedirs(self.table_dir(table), exist_ok=True)
+        dropped_before = dropped_before or self.dropped_before[table]
+        data = {"segments": segments}
+        if dropped_before is not None:
+            data["dropped_before"] = dropped_before
+        write_json_atomic(self.segments_path(table), data)
+        self.set_segments(table, segments, dropped_before)
+
+    def split_flat_tables(self):
+        """One-time move of single-file tables (*.bin next to dictionary.json) into segments."""
+        for table, columns in STORE_TABLES.items():
+            paths = [os.path.join(self.stats_dir, f"{table}.{column}.bin") for column, _ in columns]
+            if self.segments[table] or not os.path.exists(paths[0]):
+                continue
+            rows = min(os.path.getsize(path) // array(typecode).itemsize if os.path.exists(path) else 0
+                       for path, (_, typecode) in zip(paths, columns))
+            data = {}
+            for path, (column, typecode) in zip(paths, columns):
+                data[column] = array(typecode)
+                if rows:
+                    with open(path, 'rb') as f:
+                        data[column].fromfile(f, rows)
+                    if sys.byteorder == "big":
+                        data[column].byteswap()
+            self.append(table, data)
+            for path in paths:
+                if os.path.exists(path):
+                    os.remove(path)
+
+    def covering_segment(self, segments, ts):
+        """Position of the segment whose period holds ts, or None."""
+        k = bisect_right([segment["lo"] for segment in segments], ts) - 1
+        if k >= 0 and ts < segments[k]["hi"]:
+            return k
+        return None
+
+    # --- Columns ---
+    def row_count(self, table):
+        return self.starts[table][-1]
+
+    def has_data(self):
+        return any(self.row_count(table) > 0 for table in STORE_TABLES)
+
+    def append(self, table, columns):
+        """Add rows given as {column: sequence}, keeping the table sorted by time.
+
+        New data normally lands after everything stored and is a plain append to
+        the segment of its day; back-filled history is merged in by rewriting
+        the segments from the one it lands in. The dictionary is saved first so
+        every stored code always resolves.
+        Returns the first row that was (re)written, or None if there was nothing to add.
+        """
+        n = len(columns["ts"])
+        if n == 0:
+            return None
+        self.save_dictionary()
+        rows = self.row_count(table)
+        batch = self.sort_rows(table, columns)
+        segments = [dict(segment) for segment in self.segments[table]]
+        first = len(segments)
+        start = rows
+        if rows and self.read_column(table, "ts", rows - 1, 1)[0] > batch["ts"][0]:
+            first = self.covering_segment(segments, batch["ts"][0])
+            if first is None:
+                first = bisect_right([segment["lo"] for segment in segments], batch["ts"][0])
+            start = self.starts[table][first]
+            merged = {column: self.read_column(table, column, start, rows - start) for column, _ in STORE_TABLES[table]}
+            for column, values in merged.items():
+                values.extend(batch[column])
+            batch = self.sort_rows(table, merged)
+            for segment in segments[first:]:
+                segment["rows"] = 0
+                segment.pop("max_end", None)
+
+        # Rows go to the segment whose period holds them, else to a new day segment
+        ts = batch["ts"]
+        i = 0
+        while i < len(ts):
+            k = self.covering_segment(segments, ts[i])
+            if k is None:
+                name, lo, hi = day_period(ts[i])
+                k = bisect_right([segment["lo"] for segment in segments], lo)
+                segments.insert(k, {"name": name, "lo": lo, "hi": hi, "rows": 0})
+            segment = segments[k]
+            j = bisect_left(ts, segment["hi"], i)
+            self.write_segment(table, segment["name"], {column: values[i:j] for column, values in batch.items()}, segment["rows"])
+            if "end" in batch:
+                # Latest end of the segment's intervals, so range reads know
+                # which older segments still reach into the range
+                segment["max_end"] = max(max(batch["end"][i:j]), segment.get("max_end", 0) if segment["rows"] else 0)
+            segment["rows"] += j - i
+            i = j
+        self.save_segments(table, segments)
+        return start
+
+    def write_segment(self, table, name, columns, start=0):
+        """Write rows after the first <start> rows of a segment's column files."""
+        os.makedirs(self.table_dir(table), exist_ok=True)
+        for column, typecode in STORE_TABLES[table]:
+            path = self.segment_path(table, name, column)
+            # Cut back to <start> rows (this also drops any partial tail left by
+            # an interrupted write)
+            itemsize = array(typecode).itemsize
+            if os.path.exists(path) and os.path.getsize(path) != start * itemsize:
+                with open(path, 'r+b') as f:
+                    f.truncate(start * itemsize)
+            data = columns[column]
+            if sys.byteorder == "big":
+                data = array(typecode, data)
+                data.byteswap()
+            with open(path, 'ab') as f:
+                data.tofile(f)
+
+    def remove_segment(self, table, name):
+        for column, _ in STORE_TABLES[table]:
+            path = self.segment_path(table, name, column)
+            if os.path.exists(path):
+                os.remove(path)
+
+    def replace(self, table, columns):
+        """Rewrite a whole table with the given rows."""
+        old = self.segments[table]
+        self.save_segments(table, [])
+        for segment in old:
+            self.remove_segment(table, segment["name"])
+        self.append(table, columns)
+
+    def sort_rows(self, table, columns):
+        """Return the columns as typed arrays ordered by ts (stable)."""
+        ts = columns["ts"]
+        order = sorted(range(len(ts)), key=ts.__getitem__)
+        return {
+            column: array(typecode, (columns[column][i] for i in order))
+            for column, typecode in STORE_TABLES[table]
+        }
+
+    def read_column(self, table, column, start, count):
+        """Rows [start, start + count) of a column, read from the segments they span."""
+        typecode = dict(STORE_TABLES[table])[column]
+        data = array(typecode)
+        starts = self.starts[table]
+        k = bisect_right(starts, start) - 1
+        end = start + count
+        while start < end:
+            take = min(end, starts[k + 1]) - start
+            with open(self.segment_path(table, self.segments[table][k]["name"], column), 'rb') as f:
+                f.seek((start - starts[k]) * data.itemsize)
+                data.fromfile(f, take)
+            start += take
+            k += 1
+        if sys.byteorder == "big":
+            data.byteswap()
+        return data
+
+    def read_rows(self, table, rows):
+        """{column: array} of the given rows (sorted row numbers), one seek per run
+        of neighbouring rows and one open per segment and column."""
+        starts = self.starts[table]
+        runs = [] # (segment, first row in the segment, count)
+        n = 0
+        while n < len(rows):
+            k = bisect_right(starts, rows[n]) - 1
+            m = n + 1
+            while m < len(rows) and rows[m] == rows[m - 1] + 1 and rows[m] < starts[k + 1]:
+                m += 1
+            runs.append((k, rows[n] - starts[k], m - n))
+            n = m
+        out = {}
+        for column, typecode in STORE_TABLES[table]:
+            data = out[column] = array(typecode)
+            for k, group in itertools.groupby(runs, key=lambda run: run[0]):
+                with open(self.segment_path(table, self.segments[table][k]["name"], column), 'rb') as f:
+                    for _, offset, count in group:
+                        f.seek(offset * data.itemsize)
+                        data.fromfile(f, count)
+            if sys.byteorder == "big":
+                data.byteswap()
+        return out
+
+    def iter_rows(self, table, since=None, until=None, chunk_rows=EXPORT_CHUNK_ROWS):
+        """Yield {column: array} chunks of the rows in [since, until), reading only
+        the segments whose period overlaps the range."""
+        for k, segment in enumerate(self.segments[table]):
+            if (since is not None and segment["hi"] <= since) or (until is not None and segment["lo"] >= until):
+                continue
+            first = self.starts[table][k]
+            ts = self.read_column(table, "ts", first, segment["rows"])
+            i, j = time_slice(ts, since, until)
+            for pos in range(first + i, first + j, chunk_rows):
+                count = min(chunk_rows, first + j - pos)
+                yield {column: self.read_column(table, column, pos, count) for column, _ in STORE_TABLES[table]}
+
+    def read_range(self, table, since=None, until=None, overlapping=False):
+        """Rows with ts in [since, until), read from the segments that overlap the
+        range only. With overlapping, rows of an interval table (ts, end) that
+        start before since are included too if their segment's intervals may
+        still be running at since. Returns (number of the first row, {column: array})."""
+        segments = self.segments[table]
+        starts = self.starts[table]
+        k = 0
+        if since is not None:
+            if overlapping:
+                # Segments written before max_end was recorded count as still running
+                while k < len(segments) and segments[k].get("max_end", since) < since:
+                    k += 1
+            else:
+                while k < len(segments) and segments[k]["hi"] <= since:
+                    k += 1
+        end = len(segments)
+        if until is not None:
+            end = max(k, bisect_left([segment["lo"] for segment in segments], until))
+        first = starts[k]
+        ts = self.read_column(table, "ts", first, starts[end] - first)
+        i, j = time_slice(ts, None if overlapping else since, until)
+        columns = {"ts": ts[i:j]}
+        for column, _ in STORE_TABLES[table][1:]:
+            columns[column] = self.read_column(table, column, first + i, j - i)
+        return first + i, columns
+
+    def first_ts(self, table):
+        return self.read_column(table, "ts", 0, 1)[0] if self.row_count(table) else None
+
+    def last_ts(self, table):
+        rows = self.row_count(table)
+        return self.read_column(table, "ts", rows - 1, 1)[0] if rows else None
+
+    def load(self, table):
+        """Return {column: array} for every row of the table, sorted by ts."""
+        rows = self.row_count(table)
+        return {column: self.read_column(table, column, 0, rows) for column, _ in STORE_TABLES[table]}
+
+    # --- Compaction & Retention ---
+    def compact(self, table, before):
+        """Merge the day segments of every month that ends by <before> into one
+        segment for the month. Row order is unchanged. Returns the segments removed."""
+        segments = self.segments[table]
+        starts = self.starts[table]
+        # One pass over the segments (months are runs of neighbours, as segments
+        # are in time order); segments.json is only rewritten once all month
+        # files exist, and the day files are removed after that
+        compacted = []
+        old = []
+        k = 0
+        while k < len(segments):
+            name, lo, hi = month_period(segments[k]["lo"])
+            end = k
+            while end < len(segments) and segments[end]["lo"] < hi:
+                end += 1
+            if hi > before or (end - k == 1 and segments[k]["name"] == name):
+                compacted += segments[k:end]
+                k = end
+                continue
+            rows = starts[end] - starts[k]
+            month = {column: self.read_column(table, column, starts[k], rows) for column, _ in STORE_TABLES[table]}
+            tmp_name = name + ".tmp"
+            self.write_segment(table, tmp_name, month)
+            for column, _ in STORE_TABLES[table]:
+                os.replace(self.segment_path(table, tmp_name, column), self.segment_path(table, name, column))
+            segment = {"name": name, "lo": lo, "hi": hi, "rows": rows}
+            if "end" in month and rows:
+                segment["max_end"] = max(month["end"])
+            compacted.append(segment)
+            old += [segment["name"] for segment in segments[k:end] if segment["name"] != name]
+            k = end
+        if not old and compacted == segments:
+            return 0
+        self.save_segments(table, compacted)
+        for name in old:
+            self.remove_segment(table, name)
+        return len(segments) - len(compacted)
+
+    def expired(self, table, cutoff):
+        """The segments that end by cutoff (a prefix, as segments are in time order)."""
+        return [segment for segment in self.segments[table] if segment["hi"] <= cutoff]
+
+    def drop_before(self, table, cutoff):
+        """Delete the segments that end by cutoff; returns the number of rows removed."""
+        old = self.expired(table, cutoff)
+        if not old:
+            return 0
+        self.save_segments(table, self.segments[table][len(old):], old[-1]["hi"])
+        for segment in old:
+            self.remove_segment(table, segment["name"])
+        return sum(segment["rows"] for segment in old)
+
+def day_period(ts):
+    """Name and [lo, hi) epochs of the day segment holding ts."""
+    lo = ts - ts % DAY
+    return from_epoch(lo).strftime("%Y-%m-%d"), lo, lo + DAY
+
+def month_period(ts):
+    """Name and [lo, hi) epochs of the month segment holding ts."""
+    dt = from_epoch(ts)
+    lo = datetime(dt.year, dt.month, 1)
+    hi = datetime(dt.year + dt.month // 12, dt.month % 12 + 1, 1)
+    return lo.strftime("%Y-%m"), to_epoch(lo), to_epoch(hi)
+
+def migrate_legacy_stats(store):
+    """One-time conversion of the old levels.txt / players.txt / errors.txt files."""
+    legacy = [
+        (LEGACY_LEVELS_TXT, "levels", LineClassifier.SESSION),
+        (LEGACY_PLAYERS_TXT, "players", LineClassifier.JOIN),
+        (LEGACY_ERRORS_TXT, "errors", LineClassifier.ERROR),
+    ]
+    for filename, table, kind in legacy:
+        filepath = os.path.join(store.stats_dir, filename)
+        if not os.path.exists(filepath):
+            continue
+        columns = {column: [] for column, _ in STORE_TABLES[table]}
+        with open(filepath, 'r', encoding='utf-8', errors='ignore') as f:
+            for line in f:
+                parts = line.split('|', 1)
+                if len(parts) < 2: continue
+                try:
+                    day_epoch = to_epoch(datetime.strptime(parts[0].strip(), "%Y-%m-%d"))
+                except ValueError:
+                    continue
+                log_part = parts[1].strip()
+                ts = line_epoch(day_epoch, log_part)
+
+                event = LINE_CLASSIFIER.classify(log_part)
+                if event is None or event[0] != kind: continue
+                if kind == LineClassifier.SESSION:
+                    gt_hex, lvl_hex = event[1]
+                    columns["level"].append(store.intern("level", lvl_hex))
+                    columns["gametype"].append(store.intern("gametype", gt_hex))
+                elif kind == LineClassifier.JOIN:
+                    columns["player"].append(store.intern("player", event[1]))
+                else:
+                    columns["error"].append(store.intern("error", event[1]))
+                columns["ts"].append(ts)
+
+        store.append(table, columns)
+        os.replace(filepath, filepath + ".migrated")
+
+# --- Rollups ---
+# Hourly and daily event counts kept up to date by the import, so a range query
+# sums a few hundred buckets and only touches raw events for the partial hours at
+# the edges of the range. Unique players can't be summed, so each bucket also
+# keeps a bitmap of the player IDs seen in it: a range is the OR of its buckets.
+HOUR = 3600
+DAY = 86400
+ROLLUP_WIDTHS = {"hour": HOUR, "day": DAY}
+# Which coded columns of each table are counted per bucket
+ROLLUP_COLUMNS = {"levels": ("level", "gametype"), "errors": ("error",)}
+
+def split_range(since, until):
+    """Cover [since, until) with ("raw"|"hour"|"day", lo, hi) pieces; None bounds are open."""
+    pieces = []
+    lo, hi = since, until
+    if lo is not None and hi is not None and lo >= hi:
+        return pieces
+    tail = []
+    for kind, width in (("raw", HOUR), ("hour", DAY)):
+        if lo is not None and lo % width:
+            edge = lo - lo % width + width
+            if hi is not None and hi <= edge:
+                if lo < hi:
+                    pieces.append((kind, lo, hi))
+                return pieces + tail
+            pieces.append((kind, lo, edge))
+            lo = edge
+        if hi is not None and hi % width:
+            edge = hi - hi % width
+            tail.insert(0, (kind, edge, hi))
+            hi = edge
+    if lo is None or hi is None or lo < hi:
+        pieces.append(("day", lo, hi))
+    return pieces + tail
+
+def bitmap_from_codes(codes):
+    """Pack a set of player IDs into an int with bit <id> set."""
+    if not codes:
+        return 0
+    bits = bytearray(max(codes) // 8 + 1)
+    for code in codes:
+        bits[code >> 3] |= 1 << (code & 7)
+    return int.from_bytes(bits, "little")
+
+def bitmap_codes(bitmap):
+    """The player IDs set in a bitmap."""
+    codes = []
+    for i, byte in enumerate(bitmap.to_bytes((bitmap.bit_length() + 7) // 8, "little")):
+        while byte:
+            low = byte & -byte
+            codes.append(i * 8 + low.bit_length() - 1)
+            byte ^= low
+    return codes
+
+def popcount(bitmap):
+    return bin(bitmap).count("1")
+
+# presence.bin is one zlib stream of records: width kind (0 = hour, 1 = day),
+# bucket start, bitmap length, then the little-endian bitmap bytes
+PRESENCE_RECORD = struct.Struct("<BqI")
+
+# Follow mode saves after every few new lines, so files that grow with the
+# history (rollups, index postings) aren't rewritten each time: the changes are
+# appended to a journal next to them instead, which is folded back in with one
+# full rewrite once it reaches half their size. A torn journal record left by an
+# interrupted save ends the replay; the row counts then don't match the store
+# and the engine rebuilds.
+JOURNAL_MIN_BYTES = 1 << 20
+
+def journal_full(journal_path, base_paths):
+    size = os.path.getsize(journal_path) if os.path.exists(journal_path) else 0
+    base = sum(os.path.getsize(path) for path in base_paths if os.path.exists(path))
+    return size >= max(JOURNAL_MIN_BYTES, base // 2)
+
+def decode_bucket(bucket):
+    return {column: {int(code): n for code, n in counts.items()} for column, counts in bucket.items()}
+
+# All-time session totals, so the all-time session stats (and snapshot.json)
+# don't load every visit and match: summed as rows are added, with the peak of
+# players online at once worked out again over just the span of the new visits
+# ("window"). "rows" are the store row counts they were taken from; they are
+# counted again from the store when those don't match (e.g. after retention).
+SESSION_TABLES = ("visits", "matches")
+
+def new_sessions():
+    return {"rows": {table: 0 for table in SESSION_TABLES}, "visit_seconds": 0, "first_visit": None,
+            "last_end": None, "peak": 0, "window": None, "match_seconds": 0}
+
+class Rollups:
+    def __init__(self, stats_dir=STATS_DIR):
+        self.path = os.path.join(stats_dir, ROLLUPS_JSON)
+        self.presence_path = os.path.join(stats_dir, PRESENCE_BIN)
+        self.journal_path = os.path.join(stats_dir, ROLLUPS_JOURNAL)
+        self.buckets = {name: {} for name in ROLLUP_WIDTHS}
+        self.presence = {name: {} for name in ROLLUP_WIDTHS}
+        # Store row counts the rollups were built from, to detect a stale file
+        self.rows = {}
+        self.sessions = new_sessions()
+        # Bucket starts changed since the last save; None = rewrite everything
+        self.dirty = None
+        # Sorted bucket starts per (buckets/presence, width), see starts()
+        self.sorted_starts = {}
+        self.load()
+
+    def paths(self):
+        return [self.path, self.presence_path, self.journal_path]
+
+    def load(self):
+        self.load_presence()
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        self.rows = data.get("rows", {})
+        # Rollups saved before the session totals existed count them again on the next import
+        self.sessions = data.get("sessions", new_sessions())
+        for name in ROLLUP_WIDTHS:
+            self.buckets[name] = {int(start): decode_bucket(bucket) for start, bucket in data.get(name, {}).items()}
+        self.replay_journal()
+        self.dirty = {name: set() for name in ROLLUP_WIDTHS}
+
+    def replay_journal(self):
+        """Apply the records saved since rollups.json was last rewritten: one JSON
+        line each with the row counts and the new value of every changed bucket."""
+        if not os.path.exists(self.journal_path):
+            return
+        with open(self.journal_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    break
+                self.rows = record["rows"]
+                self.sessions = record.get("sessions", self.sessions)
+                for name in ROLLUP_WIDTHS:
+                    for start, bucket in record["buckets"][name].items():
+                        self.buckets[name][int(start)] = decode_bucket(bucket)
+                    for start, bitmap in record["presence"][name].items():
+                        self.presence[name][int(start)] = int(bitmap, 16)
+
+    def load_presence(self):
+        self.presence = {name: {} for name in ROLLUP_WIDTHS}
+        if not os.path.exists(self.presence_path):
+            return
+        with open(self.presence_path, 'rb') as f:
+            data = zlib.decompress(f.read())
+        names = list(ROLLUP_WIDTHS)
+        pos = 0
+        while pos < len(data):
+            kind, start, length = PRESENCE_RECORD.unpack_from(data, pos)
+            pos += PRESENCE_RECORD.size
+            self.presence[names[kind]][start] = int.from_bytes(data[pos:pos + length], "little")
+            pos += length
+
+    def save(self):
+        if self.dirty is None or not os.path.exists(self.path) or journal_full(self.journal_path, self.paths()[:2]):
+            self.save_all()
+        else:
+            record = {
+                "rows": self.rows,
+                "sessions": self.sessions,
+                "buckets": {name: {start: self.buckets[name][start] for start in starts if start in self.buckets[name]}
+                            for name, starts in self.dirty.items()},
+                "presence": {name: {start: format(self.presence[name][start], "x") for start in starts if start in self.presence[name]}
+                             for name, starts in self.dirty.items()},
+            }
+            with open(self.journal_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record) + "\n")
+        self.dirty = {name: set() for name in ROLLUP_WIDTHS}
+
+    def save_all(self):
+        # The journal goes first, so an interrupted save leaves stale row counts
+        # (and a rebuild) rather than old changes replayed over new files
+        if os.path.exists(self.journal_path):
+            os.remove(self.journal_path)
+        # Bitmaps next: rollups.json holds the row counts that mark both as current
+        records = []
+        for kind, name in enumerate(ROLLUP_WIDTHS):
+            for start, bitmap in self.presence[name].items():
+                raw = bitmap.to_bytes((bitmap.bit_length() + 7) // 8, "little")
+                records.append(PRESENCE_RECORD.pack(kind, start, len(raw)))
+                records.append(raw)
+        tmp_path = self.presence_path + ".tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(zlib.compress(b"".join(records)))
+        os.replace(tmp_path, self.presence_path)
+
+        data = {"rows": self.rows, "sessions": self.sessions}
+        data.update(self.buckets)
+        write_json_atomic(self.path, data)
+
+    def add(self, table, columns):
+        if table == "players":
+            for name, width in ROLLUP_WIDTHS.items():
+                seen = {}
+                for ts, player in zip(columns["ts"], columns["player"]):
+                    seen.setdefault(ts - ts % width, set()).add(player)
+                presence = self.presence[name]
+                for start, codes in seen.items():
+                    presence[start] = presence.get(start, 0) | bitmap_from_codes(codes)
+                if self.dirty is not None:
+                    self.dirty[name].update(seen)
+        if table in ROLLUP_COLUMNS:
+            for name, width in ROLLUP_WIDTHS.items():
+                buckets = self.buckets[name]
+                for i, ts in enumerate(columns["ts"]):
+                    start = ts - ts % width
+                    if self.dirty is not None:
+                        self.dirty[name].add(start)
+                    bucket = buckets.setdefault(start, {})
+                    for column in ROLLUP_COLUMNS[table]:
+                        counts = bucket.setdefault(column, {})
+                        code = columns[column][i]
+                        counts[code] = counts.get(code, 0) + 1
+        if table in SESSION_TABLES:
+            self.add_sessions(table, columns)
+        self.rows[table] = self.rows.get(table, 0) + len(columns["ts"])
+
+    def add_sessions(self, table, columns):
+        sessions = self.sessions
+        sessions["rows"][table] += len(columns["ts"])
+        if table == "matches":
+            sessions["match_seconds"] += sum(columns["end"]) - sum(columns["ts"])
+            return
+        # Only visits with a length count as online (as in ConcurrencyProfile)
+        spans = [(start, end) for start, end in zip(columns["ts"], columns["end"]) if end > start]
+        if not spans:
+            return
+        sessions["visit_seconds"] += sum(end - start for start, end in spans)
+        self.add_visit_span(min(start for start, _ in spans), max(end for _, end in spans))
+
+    def add_visit_span(self, lo, hi):
+        """Widen the visit times and the peak window to cover new visits in [lo, hi)."""
+        sessions = self.sessions
+        sessions["first_visit"] = lo if sessions["first_visit"] is None else min(sessions["first_visit"], lo)
+        sessions["last_end"] = hi if sessions["last_end"] is None else max(sessions["last_end"], hi)
+        if sessions["window"] is not None:
+            lo, hi = min(lo, sessions["window"][0]), max(hi, sessions["window"][1])
+        sessions["window"] = [lo, hi]
+
+    def sessions_current(self, store):
+        return self.sessions["window"] is None and all(
+            self.sessions["rows"][table] == store.row_count(table) for table in SESSION_TABLES)
+
+    def update_sessions(self, store):
+        """Bring the session totals up to date with the store: count them again if
+        its rows changed under them, then work out the peak over the new visits."""
+        if any(self.sessions["rows"][table] != store.row_count(table) for table in SESSION_TABLES):
+            self.sessions = new_sessions()
+            for table in SESSION_TABLES:
+                self.add_sessions(table, store.load(table))
+        sessions = self.sessions
+        if sessions["window"] is not None:
+            # Only levels inside the window can have risen
+            lo, hi = sessions["window"]
+            _, visits = store.read_range("visits", lo, hi, overlapping=True)
+            sessions["peak"] = max(sessions["peak"], ConcurrencyProfile(visits["ts"], visits["end"]).peak(lo, hi))
+            sessions["window"] = None
+
+    def is_current(self, store):
+        # Rollups written before presence bitmaps existed need one rebuild
+        if self.rows.get("players") and not os.path.exists(self.presence_path):
+            return False
+        return all(self.rows.get(table, 0) == store.row_count(table) for table in STORE_TABLES)
+
+    def rebuild(self, store):
+        self.buckets = {name: {} for name in ROLLUP_WIDTHS}
+        self.presence = {name: {} for name in ROLLUP_WIDTHS}
+        self.rows = {}
+        self.sessions = new_sessions()
+        self.dirty = None
+        for table in STORE_TABLES:
+            self.add(table, store.load(table))
+        self.update_sessions(store)
+
+    def merge(self, other, remap):
+        """Add another store's rollups, with its codes translated through remap[column]."""
+        self.dirty = None
+        for name in ROLLUP_WIDTHS:
+            buckets = self.buckets[name]
+            for start, other_bucket in other.buckets[name].items():
+                bucket = buckets.setdefault(start, {})
+                for column, other_counts in other_bucket.items():
+                    counts = bucket.setdefault(column, {})
+                    for code, n in other_counts.items():
+                        code = remap[column][code]
+                        counts[code] = counts.get(code, 0) + n
+            presence = self.presence[name]
+            for start, other_bitmap in other.presence[name].items():
+                codes = [remap["player"][code] for code in bitmap_codes(other_bitmap)]
+                presence[start] = presence.get(start, 0) | bitmap_from_codes(codes)
+        for table, rows in other.rows.items():
+            self.rows[table] = self.rows.get(table, 0) + rows
+        # Visits of different stores overlap, so the peak is worked out again
+        # over the span of the other's (see update_sessions)
+        sessions, theirs = self.sessions, other.sessions
+        for table in SESSION_TABLES:
+            sessions["rows"][table] += theirs["rows"][table]
+        sessions["visit_seconds"] += theirs["visit_seconds"]
+        sessions["match_seconds"] += theirs["match_seconds"]
+        if theirs["first_visit"] is not None:
+            self.add_visit_span(theirs["first_visit"], theirs["last_end"])
+
+    def query(self, view, since=None, until=None):
+        """Counts per coded column ({"level": Counter, "gametype": ..., "error": ...}) in [since, until).
+
+        view(name, lo, hi) supplies the raw rows used for partial hours at the
+        edges, as (columns, i, j, first) like StatsModel.view.
+        """
+        totals = {column: Counter() for columns in ROLLUP_COLUMNS.values() for column in columns}
+        for kind, lo, hi in split_range(since, until):
+            if kind == "raw":
+                for table, columns in ROLLUP_COLUMNS.items():
+                    rows, i, j, _ = view(table, lo, hi)
+                    for column in columns:
+                        totals[column].update(rows[column][i:j])
+                continue
+            buckets = self.buckets[kind]
+            for start in self.starts(buckets, kind, lo, hi):
+                for column, counts in buckets[start].items():
+                    totals[column].update(counts)
+        return totals
+
+    def unique_players(self, view, since=None, until=None):
+        """Number of distinct player IDs seen in [since, until)."""
+        bitmap = 0
+        edge_players = set()
+        for kind, lo, hi in split_range(since, until):
+            if kind == "raw":
+                rows, i, j, _ = view("players", lo, hi)
+                edge_players.update(rows["player"][i:j])
+                continue
+            presence = self.presence[kind]
+            for start in self.starts(presence, kind, lo, hi):
+                bitmap |= presence[start]
+        return popcount(bitmap | bitmap_from_codes(edge_players))
+
+    def starts(self, buckets, kind, lo, hi):
+        """Starts of the buckets (a bucket or presence dict of width kind) in [lo, hi).
+
+        Buckets are only ever added, so the sorted starts are kept until the
+        dict grows or is replaced."""
+        key = (kind, buckets is self.presence[kind])
+        cached = self.sorted_starts.get(key)
+        if cached is None or cached[0] is not buckets or len(cached[1]) != len(buckets):
+            cached = self.sorted_starts[key] = (buckets, sorted(buckets))
+        starts = cached[1]
+        i = 0 if lo is None else bisect_left(starts, lo)
+        j = len(starts) if hi is None else bisect_left(starts, hi)
+        return starts[i:j]
+
+# --- Secondary Indexes ---
+# Postings lists: the row numbers holding each code of a coded column, so a
+# lookup by player / level / gametype / error touches only the matching rows.
+# Tables stay sorted by time, so rows are normally only appended; when
+# back-filled history is merged in, postings from the merge point on are cut
+# and re-added. Each file is a header (rows indexed, code count), a count per
+# code and then the row numbers grouped by code. Updates since it was written
+# are journaled (see journal_full) as records of a first row, a row count and
+# the codes of those rows.
+INDEXED_COLUMNS = {"players": ("player",), "levels": ("level", "gametype"), "errors": ("error",)}
+INDEX_HEADER = struct.Struct("<QI")
+INDEX_RECORD = struct.Struct("<QQ")
+
+class SecondaryIndex:
+    def __init__(self, stats_dir=STATS_DIR):
+        self.stats_dir = stats_dir
+        self.postings = {(table, column): {} for table, columns in INDEXED_COLUMNS.items() for column in columns}
+        self.rows = {}
+        # Per column, (first row, codes) updates not saved yet
+        self.pending = {key: [] for key in self.postings}
+        self.full = False
+        self.load()
+
+    def path(self, table, column):
+        return os.path.join(self.stats_dir, f"{table}.{column}.idx")
+
+    def journal_path(self, table, column):
+        return self.path(table, column) + ".journal"
+
+    def paths(self):
+        return [path for key in self.postings for path in (self.path(*key), self.journal_path(*key))]
+
+    def load(self):
+        """Read the headers; the postings themselves are read on first use."""
+        for table, column in self.postings:
+            rows = 0
+            path = self.path(table, column)
+            if os.path.exists(path):
+                with open(path, 'rb') as f:
+                    rows, _ = INDEX_HEADER.unpack(f.read(INDEX_HEADER.size))
+            for first, count, _ in self.journal_records((table, column), codes=False):
+                rows = first + count
+            self.postings[table, column] = None
+            self.rows[table, column] = rows
+            self.pending[table, column] = []
+        self.full = False
+
+    def journal_records(self, key, codes=True):
+        """Yield (first, count, codes or None) for each complete journal record."""
+        path = self.journal_path(*key)
+        if not os.path.exists(path):
+            return
+        with open(path, 'rb') as f:
+            while True:
+                header = f.read(INDEX_RECORD.size)
+                if len(header) < INDEX_RECORD.size:
+                    return
+                first, count = INDEX_RECORD.unpack(header)
+                if not codes:
+                    if len(f.read(4 * count)) < 4 * count:
+                        return
+                    yield first, count, None
+                    continue
+                values = array('I')
+                try:
+                    values.fromfile(f, count)
+                except EOFError:
+                    return
+                if sys.byteorder == "big":
+                    values.byteswap()
+                yield first, count, values
+
+    def get(self, key):
+        """{code: array of row numbers} of one indexed column."""
+        if self.postings[key] is None:
+            postings = {}
+            path = self.path(*key)
+            if os.path.exists(path):
+                with open(path, 'rb') as f:
+                    data = f.read()
+                _, code_count = INDEX_HEADER.unpack_from(data)
+                counts = array('I', data[INDEX_HEADER.size:INDEX_HEADER.size + 4 * code_count])
+                ids = array('I', data[INDEX_HEADER.size + 4 * code_count:])
+                if sys.byteorder == "big":
+                    counts.byteswap()
+                    ids.byteswap()
+                pos = 0
+                for code, count in enumerate(counts):
+                    if count:
+                        postings[code] = ids[pos:pos + count]
+                        pos += count
+            for first, _, codes in self.journal_records(key):
+                add_postings(postings, first, codes)
+            for first, codes in self.pending[key]:
+                add_postings(postings, first, codes)
+            self.postings[key] = postings
+        return self.postings[key]
+
+    def save(self):
+        for key in self.postings:
+            path = self.path(*key)
+            if self.full or (self.pending[key] and (not os.path.exists(path) or journal_full(self.journal_path(*key), [path]))):
+                self.save_postings(key, self.get(key))
+            elif self.pending[key]:
+                with open(self.journal_path(*key), 'ab') as f:
+                    for first, codes in self.pending[key]:
+                        f.write(INDEX_RECORD.pack(first, len(codes)))
+                        codes = array('I', codes)
+                        if sys.byteorder == "big":
+                            codes.byteswap()
+                        codes.tofile(f)
+            self.pending[key] = []
+        self.full = False
+
+    def save_postings(self, key, postings):
+        # The journal goes first: if we stop half way the header's row count is
+        # stale and the engine rebuilds, rather than replaying old records
+        if os.path.exists(self.journal_path(*key)):
+            os.remove(self.journal_path(*key))
+        code_count = max(postings) + 1 if postings else 0
+        counts = array('I', (len(postings.get(code, ())) for code in range(code_count)))
+        ids = array('I')
+        for code in range(code_count):
+            ids.extend(postings.get(code, ()))
+        if sys.byteorder == "big":
+            counts.byteswap()
+            ids.byteswap()
+        path = self.path(*key)
+        with open(path + ".tmp", 'wb') as f:
+            f.write(INDEX_HEADER.pack(self.rows.get(key, 0), code_count))
+            counts.tofile(f)
+            ids.tofile(f)
+        os.replace(path + ".tmp", path)
+
+    def is_current(self, store):
+        return all(self.rows.get(key, 0) == store.row_count(key[0]) for key in self.postings)
+
+    def update(self, store, table, start):
+        """Index the rows from start to the end of the table (after EventStore.append).
+        Postings that haven't been read stay on disk; the update is only queued."""
+        if table not in INDEXED_COLUMNS:
+            return
+        total = store.row_count(table)
+        for column in INDEXED_COLUMNS[table]:
+            key = (table, column)
+            first = min(start, self.rows.get(key, 0))
+            codes = store.read_column(table, column, first, total - first)
+            self.pending[key].append((first, codes))
+            if self.postings[key] is not None:
+                add_postings(self.postings[key], first, codes)
+            self.rows[key] = total
+
+    def rebuild(self, store):
+        self.postings = {key: {} for key in self.postings}
+        self.pending = {key: [] for key in self.postings}
+        self.rows = {}
+        self.full = True
+        for table in INDEXED_COLUMNS:
+            self.update(store, table, 0)
+
+    def lookup(self, table, column, codes):
+        """Sorted row numbers holding any of the codes."""
+        postings = self.get((table, column))
+        lists = [postings.get(code) for code in codes]
+        lists = [ids for ids in lists if ids]
+        if len(lists) == 1:
+            return lists[0]
+        return array('I', heapq.merge(*lists))
+
+def add_postings(postings, first, codes):
+    """Replace the postings of rows from first on with rows first, first + 1, ... holding codes."""
+    for ids in postings.values():
+        if ids and ids[-1] >= first:
+            del ids[bisect_left(ids, first):]
+    for row, code in enumerate(codes, first):
+        ids = postings.get(code)
+        if ids is None:
+            ids = postings[code] = array('I')
+        ids.append(row)
+
+# --- Duplicate Filter ---
+# Keys (event_key) of every event imported so far, so the same event read from
+# two files, or again after the import manifest was lost, is stored only once.
+# A Bloom filter over the stored keys answers "new" for almost every key in
+# memory; the rare "maybe" is settled exactly against the sorted keys on disk.
+# Keys added since the last save are held in a set. dedupe.keys holds sorted
+# runs of little-endian 64-bit keys, one run appended per save, and runs are
+# merged pairwise as they grow so a lookup only bisects a few of them.
+BLOOM_BITS_PER_KEY = 10
+BLOOM_HASHES = 5 # ~1% false positives at 10 bits per key
+BLOOM_MIN_KEYS = 1 << 16
+# Saves only rewrite the pages of dedupe.bloom that gained bits
+BLOOM_PAGE_BYTES = 4096
+DEDUPE_CHUNK_KEYS = 65536
+
+class KeyRun:
+    """Read-only sequence view of dedupe.keys, so bisect can search it on disk."""
+    def __init__(self, f, count):
+        self.f = f
+        self.count = count
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, i):
+        self.f.seek(i * 8)
+        return int.from_bytes(self.f.read(8), 'little')
+
+class DuplicateFilter:
+    def __init__(self, stats_dir=STATS_DIR):
+        self.path = os.path.join(stats_dir, DEDUPE_JSON)
+        self.keys_path = os.path.join(stats_dir, DEDUPE_KEYS)
+        self.bloom_path = os.path.join(stats_dir, DEDUPE_BLOOM)
+        self.file = None
+        self.load()
+
+    def load(self):
+        self.close()
+        self.pending = set()
+        data = {}
+        if os.path.exists(self.path):
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        self.runs = data.get("runs", [])
+        size = os.path.getsize(self.keys_path) if os.path.exists(self.keys_path) else 0
+        if sum(self.runs) * 8 != size:
+            # Interrupted save: start over (the engine re-seeds what it can)
+            self.runs = []
+        self.count = sum(self.runs)
+        # The Bloom filter is only read once keys are checked (an import)
+        self.saved = data
+        self.bits = None
+
+    def load_bloom(self):
+        if self.bits is not None:
+            return
+        capacity = self.saved.get("capacity", 0)
+        if (capacity and self.saved.get("bloom_keys") == self.count and os.path.exists(self.bloom_path)
+                and os.path.getsize(self.bloom_path) == self.bloom_bytes(capacity)):
+            with open(self.bloom_path, 'rb') as f:
+                self.bits = bytearray(f.read())
+            self.capacity = capacity
+            self.dirty_pages = set()
+        else:
+            self.build_bloom(max(BLOOM_MIN_KEYS, 2 * self.count))
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+    # --- Bloom Filter ---
+    def bloom_bytes(self, capacity):
+        return capacity * BLOOM_BITS_PER_KEY // 8
+
+    def build_bloom(self, capacity):
+        self.capacity = capacity
+        self.bits = bytearray(self.bloom_bytes(capacity))
+        # None: the whole file is rewritten on the next save
+        self.dirty_pages = None
+        self.set_bits(self.iter_keys(0, self.count))
+
+    def set_bits(self, keys):
+        # Double hashing; the keys are already uniform 64-bit hashes
+        bits = self.bits
+        nbits = len(bits) * 8
+        pages = self.dirty_pages if self.dirty_pages is not None else set()
+        for key in keys:
+            h1 = key & 0xFFFFFFFF
+            h2 = (key >> 32) | 1
+            for i in range(BLOOM_HASHES):
+                p = (h1 + i * h2) % nbits
+                bits[p >> 3] |= 1 << (p & 7)
+                pages.add((p >> 3) // BLOOM_PAGE_BYTES)
+
+    # --- Keys ---
+    def iter_keys(self, start, end):
+        if end <= start:
+            return
+        with open(self.keys_path, 'rb') as f:
+            f.seek(start * 8)
+            for pos in range(start, end, DEDUPE_CHUNK_KEYS):
+                chunk = array('Q')
+                chunk.fromfile(f, min(DEDUPE_CHUNK_KEYS, end - pos))
+                if sys.byteorder == "big":
+                    chunk.byteswap()
+                yield from chunk
+
+    def on_disk(self, key):
+        if not self.count:
+            return False
+        if self.file is None:
+            self.file = open(self.keys_path, 'rb')
+        keys = KeyRun(self.file, self.count)
+        start = 0
+        for length in self.runs:
+            i = bisect_left(keys, key, start, start + length)
+            if i < start + length and keys[i] == key:
+                return True
+            start += length
+        return False
+
+    def add(self, key):
+        """Remember the key; returns False if it was added before (a duplicate)."""
+        if key in self.pending:
+            return False
+        if self.count and self.maybe_on_disk(key) and self.on_disk(key):
+            return False
+        self.pending.add(key)
+        return True
+
+    def maybe_on_disk(self, key):
+        # Same bit positions as set_bits()
+        self.load_bloom()
+        bits = self.bits
+        nbits = len(bits) * 8
+        h1 = key & 0xFFFFFFFF
+        h2 = (key >> 32) | 1
+        for i in range(BLOOM_HASHES):
+            p = (h1 + i * h2) % nbits
+            if not bits[p >> 3] & (1 << (p & 7)):
+                return False
+        return True
+
+    def save(self):
+        """Append the keys added since the last save as a new sorted run."""
+        self.load_bloom()
+        if self.pending:
+            self.close()
+            run = array('Q', sorted(self.pending))
+            if sys.byteorder == "big":
+                run.byteswap()
+            mode = 'r+b' if os.path.exists(self.keys_path) else 'wb'
+            with open(self.keys_path, mode) as f:
+                f.truncate(self.count * 8)
+                f.seek(self.count * 8)
+                run.tofile(f)
+            self.runs.append(len(run))
+            self.count += len(run)
+            if self.count > self.capacity:
+                self.pending = set()
+                self.build_bloom(2 * self.count)
+            else:
+                self.set_bits(self.pending)
+                self.pending = set()
+            while len(self.runs) > 1 and self.runs[-1] * 2 >= self.runs[-2]:
+                self.merge_tail()
+        if self.dirty_pages is None or not os.path.exists(self.bloom_path) or os.path.getsize(self.bloom_path) != len(self.bits):
+            with open(self.bloom_path + ".tmp", 'wb') as f:
+                f.write(self.bits)
+            os.replace(self.bloom_path + ".tmp", self.bloom_path)
+        elif self.dirty_pages:
+            # In place: bits are only ever set, so a partly written update can
+            # only add false positives, which are settled against the keys anyway
+            with open(self.bloom_path, 'r+b') as f:
+                for page in sorted(self.dirty_pages):
+                    f.seek(page * BLOOM_PAGE_BYTES)
+                    f.write(self.bits[page * BLOOM_PAGE_BYTES:(page + 1) * BLOOM_PAGE_BYTES])
+        self.dirty_pages = set()
+        write_json_atomic(self.path, {"runs": self.runs, "capacity": self.capacity, "bloom_keys": self.count})
+
+    def merge_tail(self):
+        """Merge the last two runs into one."""
+        second = self.count - self.runs[-1]
+        first = second - self.runs[-2]
+        tmp_path = self.keys_path + ".tmp"
+        with open(tmp_path, 'wb') as out:
+            chunk = array('Q')
+            for key in heapq.merge(self.iter_keys(first, second), self.iter_keys(second, self.count)):
+                chunk.append(key)
+                if len(chunk) >= DEDUPE_CHUNK_KEYS:
+                    self.write_keys(out, chunk)
+                    chunk = array('Q')
+            self.write_keys(out, chunk)
+        with open(self.keys_path, 'r+b') as f, open(tmp_path, 'rb') as merged:
+            f.truncate(first * 8)
+            f.seek(first * 8)
+            shutil.copyfileobj(merged, f)
+        os.remove(tmp_path)
+        self.runs[-2:] = [self.runs[-2] + self.runs[-1]]
+
+    def write_keys(self, f, keys):
+        if sys.byteorder == "big":
+            keys.byteswap()
+        keys.tofile(f)
+
+    def seed(self, store):
+        """Key the joins and visits stored before the filter existed, dropping
+        any repeats among them. Other events can't be keyed after the fact."""
+        for table, kind in (("players", "J"), ("visits", "V")):
+            rows = store.load(table)
+            keep = [
+                i for i, (ts, player) in enumerate(zip(rows["ts"], rows["player"]))
+                if self.add(event_key(kind, ts, store.lookup("player", player)))
+            ]
+            if len(keep) < len(rows["ts"]):
+                store.replace(table, {column: [rows[column][i] for i in keep] for column, _ in STORE_TABLES[table]})
+        self.save()
+
+# --- Sessions ---
+# The logs only say when a session starts and when a player joins. A server
+# process hosts one session at a time, so a session runs until the next
+# "Starting session" in the same log (or the log's last line), and a player who
+# joined is counted as present until that session ends; there is no leave line.
+class SessionTracker:
+    """Streaming state machine turning one log's starts and joins into intervals.
+
+    State still open when an import stops reading a live log is kept in the
+    import manifest (to_state) and handed back on the next import.
+    """
+    def __init__(self, state=None):
+        state = state or {}
+        self.match = state.get("match") # [start, gametype hex, level hex]
+        self.players = dict(state.get("players", {})) # name -> join time
+        self.last = state.get("last")
+        self.matches = [] # (start, end, gametype hex, level hex)
+        self.visits = [] # (join, end, name)
+
+    def seen(self, ts):
+        self.last = ts if self.last is None else max(self.last, ts)
+
+    def start_session(self, ts, gt_hex, lvl_hex):
+        self.close(ts)
+        self.match = [ts, gt_hex, lvl_hex]
+        self.seen(ts)
+
+    def join(self, ts, name):
+        # A rejoin within the same session keeps the first join time
+        self.players.setdefault(name, ts)
+        self.seen(ts)
+
+    def close(self, end):
+        if self.match is not None:
+            start, gt_hex, lvl_hex = self.match
+            self.matches.append((start, max(start, end), gt_hex, lvl_hex))
+        for name, joined in self.players.items():
+            self.visits.append((joined, max(joined, end), name))
+        self.match = None
+        self.players = {}
+
+    def finish(self, last_ts=None):
+        if last_ts is not None:
+            self.seen(last_ts)
+        if self.last is not None:
+            self.close(self.last)
+
+    def to_state(self):
+        if self.match is None and not self.players:
+            return None
+        return {"match": self.match, "players": self.players, "last": self.last}
+
+def prefix_sums(values):
+    """sums[i] = total of the first i values, so any slice total is sums[j] - sums[i]."""
+    sums = array('q', [0])
+    total = 0
+    for value in values:
+        total += value
+        sums.append(total)
+    return sums
+
+# Peaks over a bounded range: the maxima of blocks of this many steps are kept
+# in a sparse table (maxima of 1, 2, 4, ... blocks), so a range costs two table
+# lookups plus a scan of the partial blocks at its ends
+PEAK_BLOCK_STEPS = 64
+
+class ConcurrencyProfile:
+    """Sweep-line step function of how many intervals are open at once.
+
+    levels[i] holds from times[i] until times[i + 1]; areas[i] is the integral
+    (interval-seconds) from times[0] up to times[i], so averages over any range
+    are two lookups.
+    """
+    def __init__(self, starts, ends):
+        deltas = Counter()
+        for start, end in zip(starts, ends):
+            if end > start:
+                deltas[start] += 1
+                deltas[end] -= 1
+        self.times = array('q', sorted(deltas))
+        self.levels = array('q')
+        self.areas = array('q')
+        level = area = 0
+        prev = None
+        for t in self.times:
+            if prev is not None:
+                area += level * (t - prev)
+            level += deltas[t]
+            self.levels.append(level)
+            self.areas.append(area)
+            prev = t
+        # Highest level from each step onwards, for ranges that run up to now
+        self.peaks_after = array('q', self.levels)
+        for i in range(len(self.peaks_after) - 2, -1, -1):
+            self.peaks_after[i] = max(self.peaks_after[i], self.peaks_after[i + 1])
+        blocks = array('q', (max(self.levels[b:b + PEAK_BLOCK_STEPS]) for b in range(0, len(self.levels), PEAK_BLOCK_STEPS)))
+        self.block_peaks = [blocks]
+        width = 1
+        while 2 * width <= len(blocks):
+            prev = self.block_peaks[-1]
+            self.block_peaks.append(array('q', (max(prev[b], prev[b + width]) for b in range(len(prev) - width))))
+            width *= 2
+
+    def integral_to(self, t):
+        i = bisect_right(self.times, t) - 1
+        if i < 0:
+            return 0
+        return self.areas[i] + self.levels[i] * (t - self.times[i])
+
+    def peak(self, lo=None, hi=None):
+        """Most intervals open at once in [lo, hi)."""
+        i = max(bisect_right(self.times, lo) - 1, 0) if lo is not None else 0
+        if hi is None:
+            return self.peaks_after[i] if i < len(self.times) else 0
+        return self.range_peak(i, bisect_left(self.times, hi))
+
+    def range_peak(self, i, j):
+        """Highest of levels[i:j]."""
+        first, last = -(-i // PEAK_BLOCK_STEPS), j // PEAK_BLOCK_STEPS # whole blocks
+        if first >= last:
+            return max(self.levels[i:j], default=0)
+        k = (last - first).bit_length() - 1
+        table = self.block_peaks[k]
+        return max(table[first], table[last - (1 << k)],
+                   max(self.levels[i:first * PEAK_BLOCK_STEPS], default=0),
+                   max(self.levels[last * PEAK_BLOCK_STEPS:j], default=0))
+
+    def average(self, lo, hi):
+        if hi <= lo:
+            return 0.0
+        return (self.integral_to(hi) - self.integral_to(lo)) / (hi - lo)
+
+# --- Template Mining ---
+# Problem lines (warnings / errors no signature matches) are clustered into
+# templates as they are imported, Drain style: a fixed-depth tree keyed by the
+# token count and the first TEMPLATE_DEPTH tokens leads to a short list of
+# templates, and a line joins the most similar one, whose differing tokens turn
+# into <*>. Work per line is constant and the tree and template count are
+# capped. Each template is an "error" dictionary entry, so its rows live in the
+# errors table next to the known signatures. Mining is opt-in (import/follow
+# --templates), and the errors total only counts the known signatures.
+TEMPLATES_JSON = "templates.json"
+MINE_TEMPLATES = False
+TEMPLATE_DEPTH = 2
+TEMPLATE_SIMILARITY = 0.5
+TEMPLATE_MAX_CHILDREN = 100
+TEMPLATE_MAX_CLUSTERS = 1000
+# Catch-all once TEMPLATE_MAX_CLUSTERS templates exist
+TEMPLATE_OVERFLOW = "Other unrecognised problems"
+# Dashboard: templates shown as their own slice of the errors pie
+TEMPLATE_CHART_SLICES = 5
+TEMPLATE_LABEL_CHARS = 40
+
+def template_label(template):
+    """Short legend name for a mined template."""
+    if len(template) > TEMPLATE_LABEL_CHARS:
+        template = template[:TEMPLATE_LABEL_CHARS - 1] + "\u2026"
+    return "~ " + template
+
+def template_similarity(template, tokens):
+    """(share of tokens equal to the template's, number of <*> in it)."""
+    same = params = 0
+    for a, b in zip(template, tokens):
+        if a == TEMPLATE_WILDCARD:
+            params += 1
+        elif a == b:
+            same += 1
+    return same / len(tokens), params
+
+class TemplateMiner:
+    """Templates found so far, saved as templates.json.
+
+    Each template is {"code", "tokens", "path", "count", "first", "last"}:
+    its error dictionary code, the tree path it is filed under, and how often /
+    first / last it was stored.
+    """
+    def __init__(self, stats_dir=STATS_DIR):
+        self.path = os.path.join(stats_dir, TEMPLATES_JSON)
+        self.templates = []
+        self.tree = {}
+        self.load()
+
+    def load(self):
+        self.templates = []
+        self.tree = {}
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'r', encoding='utf-8') as f:
+            self.templates = json.load(f).get("templates", [])
+        for i, template in enumerate(self.templates):
+            if template["path"]:
+                self.leaf(template["path"]).append(i)
+
+    def save(self):
+        write_json_atomic(self.path, {"templates": self.templates})
+
+    def leaf(self, path):
+        node = self.tree
+        for key in path[:-1]:
+            node = node.setdefault(key, {})
+        return node.setdefault(path[-1], [])
+
+    def route(self, tokens):
+        """Tree path for a line: [token count, first tokens...], where a token
+        with no room left under its parent goes to the <*> branch."""
+        path = [len(tokens)]
+        node = self.tree.get(len(tokens), {})
+        for token in tokens[:TEMPLATE_DEPTH]:
+            if token not in node and len(node) >= TEMPLATE_MAX_CHILDREN:
+                token = TEMPLATE_WILDCARD
+            path.append(token)
+            node = node.get(token, {})
+        return path
+
+    def add(self, message, store):
+        """Template for a masked problem message, created or generalised as needed."""
+        tokens = message.split()
+        path = self.route(tokens)
+        leaf = self.leaf(path)
+        best, best_score = None, None
+        for i in leaf:
+            score = template_similarity(self.templates[i]["tokens"], tokens)
+            if best_score is None or score > best_score:
+                best, best_score = i, score
+        if best is not None and best_score[0] >= TEMPLATE_SIMILARITY:
+            template = self.templates[best]
+            merged = [a if a == b else TEMPLATE_WILDCARD for a, b in zip(template["tokens"], tokens)]
+            if merged != template["tokens"]:
+                template["tokens"] = merged
+                store.rename("error", template["code"], " ".join(merged))
+            return template
+        if len(self.templates) >= TEMPLATE_MAX_CLUSTERS:
+            # Full: the closest template in the leaf, else the catch-all
+            if best is not None:
+                return self.templates[best]
+            return self.overflow(store)
+        leaf.append(len(self.templates))
+        return self.new_template(store, tokens, path)
+
+    def overflow(self, store):
+        for template in self.templates:
+            if not template["path"]:
+                return template
+        return self.new_template(store, [TEMPLATE_OVERFLOW], [])
+
+    def new_template(self, store, tokens, path):
+        template = {"code": store.intern("error", " ".join(tokens)), "tokens": tokens, "path": path,
+                    "count": 0, "first": None, "last": None}
+        self.templates.append(template)
+        return template
+
+    def record(self, template, ts):
+        template["count"] += 1
+        if template["first"] is None or ts < template["first"]:
+            template["first"] = ts
+        if template["last"] is None or ts > template["last"]:
+            template["last"] = ts
+
+# --- Log Import ---
+# Log files are scanned in worker processes. Each worker returns its events with
+# file-local string codes; the parent maps them onto the store dictionary in file
+# order (so codes are deterministic) and writes them in large batches.
+IMPORT_WORKERS = os.cpu_count() or 1
+IMPORT_BATCH_ROWS = 200000
+HEAD_HASH_BYTES = 4096
+# End of a finished log searched for its last timestamp (closes open sessions)
+TAIL_BYTES = 4096
+# Files untouched for this long are treated as finished and read to EOF
+FILE_IDLE_SECONDS = 600
+# A stamp this far before the previous one means the log passed midnight
+ROLLOVER_SECONDS = 12 * 3600
+# Rotated archives are decompressed as a stream in chunks of this size. Their
+# manifest offsets count decompressed bytes, so a log that was read while live
+# and later compressed into old/ is recognised and resumed where it stopped.
+COMPRESSED_LOG_OPENERS = {".gz": gzip.open, ".bz2": bz2.open, ".xz": lzma.open}
+STREAM_CHUNK_BYTES = 1 << 20
+
+def find_log_files(log_dirs=LOG_DIRS):
+    files = []
+    for log_dir in log_dirs:
+        files += glob.glob(os.path.join(log_dir, "*.log"))
+        for ext in COMPRESSED_LOG_OPENERS:
+            files += glob.glob(os.path.join(log_dir, "*.log" + ext))
+    return sorted(files)
+
+def is_compressed_log(filepath):
+    return os.path.splitext(filepath)[1] in COMPRESSED_LOG_OPENERS
+
+def open_log(filepath):
+    """Binary file object over the (decompressed) log text."""
+    opener = COMPRESSED_LOG_OPENERS.get(os.path.splitext(filepath)[1], open)
+    return opener(filepath, 'rb')
+
+def log_name(filepath):
+    """File name without folder or compression suffix; stays the same when a log
+    is moved to old/ or compressed."""
+    name = os.path.basename(filepath)
+    if is_compressed_log(name):
+        name = os.path.splitext(name)[0]
+    return name
+
+def event_key(*parts):
+    """64-bit identity of an event for the duplicate filter.
+
+    Joins and visits are keyed by (time, player) wherever they were logged.
+    Session starts and errors are keyed by log name and line offset, because
+    identical lines in the same second are separate events; matches by log
+    name and start.
+    """
+    data = "\x1f".join(map(str, parts)).encode('utf-8')
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), 'little')
+
+def get_file_day_epoch(filepath):
+    """Epoch of midnight on the date in the file name ([MM-DD-YYYY]), else its mtime."""
+    filename = os.path.basename(filepath)
+    try:
+        match = re.search(r'\[(\d{2}-\d{2}-\d{4})\]', filename)
+        if match:
+            file_date = datetime.strptime(match.group(1), "%m-%d-%Y")
+        else:
+            file_date = datetime.fromtimestamp(os.path.getmtime(filepath))
+    except Exception:
+        file_date = datetime.now()
+    return to_epoch(datetime(file_date.year, file_date.month, file_date.day))
+
+def iter_marked_lines(buf, byte_pattern, start=0, end=None, base=0):
+    """Yield (offset, decoded line) for the lines of buf[start:end] that contain
+    a marker; offset is where the line starts in buf, plus base.
+
+    Works directly on bytes (e.g. an mmap) so the ~99% of lines that never match
+    are never decoded, split or copied.
+    """
+    if end is None:
+        end = len(buf)
+    pos = start
+    while pos < end:
+        match = byte_pattern.search(buf, pos, end)
+        if match is None:
+            return
+        line_start = buf.rfind(b'\n', pos, match.start()) + 1 or pos
+        line_end = buf.find(b'\n', match.end(), end)
+        if line_end == -1:
+            line_end = end
+        yield base + line_start, buf[line_start:line_end].decode('utf-8', errors='ignore').strip()
+        pos = line_end + 1
+
+def iter_stream_marked_lines(f, byte_pattern, chunk_size=STREAM_CHUNK_BYTES, stats=None, last_bytes=None):
+    """iter_marked_lines over a file object read chunk by chunk (whole lines only).
+
+    Offsets count from the start of the stream. If given, stats["lines"] and
+    stats["bytes"] are increased by what was read and the bytearray last_bytes
+    ends up holding the end of the data.
+    """
+    tail = b""
+    chunk = b""
+    pos = f.tell()
+    while True:
+        data = f.read(chunk_size)
+        if not data:
+            break
+        if stats is not None:
+            stats["lines"] += data.count(b'\n')
+            stats["bytes"] += len(data)
+        chunk = tail + data
+        base = pos - len(tail)
+        pos += len(data)
+        cut = chunk.rfind(b'\n') + 1
+        yield from iter_marked_lines(chunk, byte_pattern, 0, cut, base)
+        tail = chunk[cut:]
+    if last_bytes is not None:
+        last_bytes[:] = chunk[-TAIL_BYTES:]
+    if tail:
+        if stats is not None:
+            stats["lines"] += 1
+        yield from iter_marked_lines(tail, byte_pattern, base=pos - len(tail))
+
+def last_stamp(data):
+    """Seconds into the day of the last [HH:MM:SS] stamp in the given bytes, or None."""
+    stamps = TIME_PATTERN.findall(data.decode('utf-8', errors='ignore'))
+    if not stamps:
+        return None
+    h, m, s = stamps[-1]
+    return int(h) * 3600 + int(m) * 60 + int(s)
+
+class LogClock:
+    """Epochs of one log's [HH:MM:SS] stamps, on top of the date in its name.
+
+    Logs run past midnight, so a stamp more than ROLLOVER_SECONDS before the
+    previous one moves the clock on to the next day. A scan resuming part way
+    through a log starts from the stamp before its offset.
+    """
+    def __init__(self, day_epoch, last=None):
+        self.day_epoch = day_epoch
+        self.last = last # seconds into the day of the latest stamp
+
+    def at(self, seconds):
+        if self.last is not None and seconds < self.last - ROLLOVER_SECONDS:
+            self.day_epoch += DAY
+        self.last = seconds
+        return self.day_epoch + seconds
+
+    def line_epoch(self, line):
+        match = TIME_PATTERN.search(line)
+        if not match:
+            return self.day_epoch + (self.last or 0)
+        h, m, s = match.groups()
+        return self.at(int(h) * 3600 + int(m) * 60 + int(s))
+
+def count_lines(buf, start, end, chunk_size=STREAM_CHUNK_BYTES):
+    """Newline count of buf[start:end], without copying it all at once."""
+    lines = 0
+    for pos in range(start, end, chunk_size):
+        lines += buf[pos:min(pos + chunk_size, end)].count(b'\n')
+    return lines
+
+def scan_log_file(task):
+    """Classify the unread part of one log file (runs in a worker process).
+
+    task is (filepath, start offset, day epoch or None, open session state or
+    None) as planned by ImportManifest, plus whether to collect problem lines
+    for template mining.
+    """
+    filepath, start, day_epoch, open_state, mine = task
+    classifier = MINING_CLASSIFIER if mine else LINE_CLASSIFIER
+    if day_epoch is None:
+        day_epoch = get_file_day_epoch(filepath)
+    result = {
+        "path": filepath,
+        "ok": True,
+        "day": day_epoch,
+        "offset": start,
+        "stat": None,
+        "head": None,
+        "strings": {kind: [] for kind in DICTIONARY_KINDS},
+        "levels": {"ts": array('q'), "level": array('I'), "gametype": array('I')},
+        "players": {"ts": array('q'), "player": array('I')},
+        "errors": {"ts": array('q'), "error": array('I')},
+        "matches": {"ts": array('q'), "end": array('q'), "level": array('I'), "gametype": array('I')},
+        "visits": {"ts": array('q'), "end": array('q'), "player": array('I')},
+        # Duplicate-filter key of every row above, per table (see event_key)
+        "keys": {table: array('Q') for table in STORE_TABLES},
+        # Problem lines for the template miner: distinct masked messages, and
+        # per line its time, message number and duplicate-filter key
+        "messages": [],
+        "problems": {"ts": array('q'), "message": array('I'), "key": array('Q')},
+        # Session / players still open when the readable data ran out
+        "open": None,
+        # Per-file instrumentation: marker hits vs. lines that became events
+        "metrics": {"lines": 0, "bytes": 0, "matches": 0, "events": 0, "read_s": 0.0, "classify_s": 0.0},
+    }
+    stats = result["metrics"]
+    local_codes = {kind: {} for kind in DICTIONARY_KINDS}
+
+    def local_code(kind, value):
+        code = local_codes[kind].get(value)
+        if code is None:
+            code = local_codes[kind][value] = len(result["strings"][kind])
+            result["strings"][kind].append(value)
+        return code
+
+    levels, players, errors = result["levels"], result["players"], result["errors"]
+    keys = result["keys"]
+    problems = result["problems"]
+    messages = {}
+    name = log_name(filepath)
+    sessions = SessionTracker(open_state)
+    clock = LogClock(day_epoch)
+
+    def add_lines(lines):
+        started = time.perf_counter()
+        for offset, line in lines:
+            if not line: continue
+            stats["matches"] += 1
+
+            # One scan decides session / player join / error / ignore
+            event = classifier.classify(line)
+            if event is None: continue
+            kind, value = event
+            stats["events"] += 1
+
+            ts = clock.line_epoch(line)
+            if kind == LineClassifier.SESSION:
+                gt_hex, lvl_hex = value
+                levels["ts"].append(ts)
+                levels["level"].append(local_code("level", lvl_hex))
+                levels["gametype"].append(local_code("gametype", gt_hex))
+                keys["levels"].append(event_key("S", name, offset))
+                sessions.start_session(ts, gt_hex, lvl_hex)
+            elif kind == LineClassifier.JOIN:
+                players["ts"].append(ts)
+                players["player"].append(local_code("player", value))
+                keys["players"].append(event_key("J", ts, value))
+                sessions.join(ts, value)
+            elif kind == LineClassifier.PROBLEM:
+                if value not in messages:
+                    messages[value] = len(result["messages"])
+                    result["messages"].append(value)
+                problems["ts"].append(ts)
+                problems["message"].append(messages[value])
+                problems["key"].append(event_key("E", name, offset))
+                sessions.seen(ts)
+            else:
+                errors["ts"].append(ts)
+                errors["error"].append(local_code("error", value))
+                keys["errors"].append(event_key("E", name, offset))
+                sessions.seen(ts)
+        stats["classify_s"] += time.perf_counter() - started
+
+    def add_intervals(finished, tail):
+        # A finished log closes whatever is still open at its last line
+        if finished:
+            seconds = last_stamp(tail)
+            sessions.finish(clock.at(seconds) if seconds is not None else None)
+        else:
+            result["open"] = sessions.to_state()
+        # Where the clock got to, for the next scan of this log
+        result["day"] = clock.day_epoch
+        matches, visits = result["matches"], result["visits"]
+        for start_ts, end_ts, gt_hex, lvl_hex in sessions.matches:
+            matches["ts"].append(start_ts)
+            matches["end"].append(end_ts)
+            matches["level"].append(local_code("level", lvl_hex))
+            matches["gametype"].append(local_code("gametype", gt_hex))
+            keys["matches"].append(event_key("M", name, start_ts, gt_hex, lvl_hex))
+        for join_ts, end_ts, player in sessions.visits:
+            visits["ts"].append(join_ts)
+            visits["end"].append(end_ts)
+            visits["player"].append(local_code("player", player))
+            keys["visits"].append(event_key("V", join_ts, player))
+
+    started = time.perf_counter()
+    if is_compressed_log(filepath):
+        # Archives are complete, so they are always read to the end. Reading
+        # and decompressing happen inside the scan, so they count as classify time.
+        try:
+            st = os.stat(filepath)
+            result["stat"] = (st.st_size, st.st_mtime_ns)
+            with open_log(filepath) as f:
+                result["head"] = hash_head(f.read(HEAD_HASH_BYTES))
+                f.seek(max(0, start - TAIL_BYTES))
+                before = f.read(start - f.tell())
+                clock.last = last_stamp(before)
+                stats["read_s"] = time.perf_counter() - started
+                last_bytes = bytearray()
+                add_lines(iter_stream_marked_lines(f, classifier.byte_pattern, stats=stats, last_bytes=last_bytes))
+                result["offset"] = f.tell()
+            # Resumed at the end (read while live, then compressed): the last
+            # line is before the offset
+            add_intervals(True, bytes(last_bytes) or before)
+        except (OSError, EOFError, lzma.LZMAError):
+            # Damaged or still being written: drop what was read, retry next time
+            result["ok"] = False
+            result["stat"] = None
+        return result
+
+    try:
+        with open(filepath, 'rb') as f:
+            st = os.fstat(f.fileno())
+            result["stat"] = (st.st_size, st.st_mtime_ns)
+            if st.st_size == 0:
+                result["open"] = open_state
+                return result # mmap can't map an empty file
+            buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        result["ok"] = False
+        return result
+
+    with buf:
+        result["head"] = hash_head(buf)
+        # A log that is still being written may end in a partial line; leave it
+        # for the next import unless the file has gone quiet.
+        end = len(buf)
+        finished = time.time() - st.st_mtime >= FILE_IDLE_SECONDS
+        if not finished:
+            end = buf.rfind(b'\n', start) + 1 or start
+        result["offset"] = max(start, end)
+        stats["bytes"] = max(0, end - start)
+        stats["lines"] = count_lines(buf, start, end)
+        stats["read_s"] = time.perf_counter() - started
+        clock.last = last_stamp(buf[max(0, start - TAIL_BYTES):start])
+        add_lines(iter_marked_lines(buf, classifier.byte_pattern, start, end))
+        add_intervals(finished, buf[max(0, end - TAIL_BYTES):end])
+
+    return result
+
+def hash_head(buf, length=HEAD_HASH_BYTES):
+    """Identity hash of the first bytes of a log, used to recognise it after it grows or moves."""
+    head = buf[:length]
+    return len(head), hashlib.sha1(head).hexdigest()
+
+def read_head_hash(filepath, length=HEAD_HASH_BYTES):
+    with open_log(filepath) as f:
+        return hash_head(f.read(length), length)
+
+class ImportManifest:
+    """Per-file import progress keyed by path.
+
+    Each entry records the size/mtime seen at the last import, a hash of the file
+    head and the byte offset consumed so far. Unchanged files are skipped with a
+    single stat, grown files are resumed from their offset, and a file that was
+    moved (e.g. rotated into old/) is recognised by its head hash.
+    """
+    def __init__(self, stats_dir=STATS_DIR, log_dirs=LOG_DIRS):
+        self.path = os.path.join(stats_dir, IMPORT_MANIFEST_JSON)
+        self.legacy_path = os.path.join(stats_dir, LEGACY_PROCESSED_JSON)
+        self.log_dirs = log_dirs
+        self.entries = {}
+        self.load()
+
+    def load(self):
+        if os.path.exists(self.path):
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.entries = json.load(f)
+        elif os.path.exists(self.legacy_path):
+            self.migrate_processed_list()
+
+    def save(self):
+        write_json_atomic(self.path, self.entries)
+
+    def migrate_processed_list(self):
+        """Seed from the old processed_logs.json list; those files count as fully read."""
+        try:
+            with open(self.legacy_path, 'r') as f:
+                processed = set(json.load(f))
+        except Exception:
+            return
+        for filepath in find_log_files(self.log_dirs):
+            if os.path.basename(filepath) not in processed:
+                continue
+            st = os.stat(filepath)
+            head_len, head = read_head_hash(filepath)
+            self.entries[filepath] = {
+                "size": st.st_size, "mtime": st.st_mtime_ns, "head_len": head_len, "head": head,
+                "offset": st.st_size, "day": get_file_day_epoch(filepath),
+            }
+        self.save()
+        os.replace(self.legacy_path, self.legacy_path + ".migrated")
+
+    def plan(self, filepaths):
+        """Return scan tasks (filepath, start offset, day epoch, open sessions) for files with unread data."""
+        tasks = []
+        orphans = None
+        for filepath in filepaths:
+            try:
+                st = os.stat(filepath)
+            except OSError:
+                continue
+            entry = self.entries.get(filepath)
+            # A log that has gone quiet gets one more pass to close what it left
+            # open: its last session, or a final line without a newline
+            idle = time.time() - st.st_mtime >= FILE_IDLE_SECONDS and not is_compressed_log(filepath)
+            if entry is not None and entry["size"] == st.st_size and entry["mtime"] == st.st_mtime_ns:
+                if idle and (entry.get("open") or entry["offset"] < st.st_size):
+                    tasks.append((filepath, entry["offset"], entry["day"], entry.get("open")))
+                continue # Unchanged since last import, not even opened
+
+            if entry is None:
+                # Unknown path: maybe a file we already read that has since moved
+                if orphans is None:
+                    orphans = self.orphans()
+                old_path = self.find_moved(orphans, filepath, st)
+                if old_path is not None:
+                    entry = self.entries[filepath] = self.entries.pop(old_path)
+            elif not self.same_file(entry, filepath, st):
+                entry = None # Replaced by a different file, read it from the start
+
+            if entry is None:
+                tasks.append((filepath, 0, get_file_day_epoch(filepath), None))
+            elif entry["offset"] < st.st_size or is_compressed_log(filepath) or (idle and entry.get("open")):
+                tasks.append((filepath, entry["offset"], entry["day"], entry.get("open")))
+            else:
+                # Touched but nothing new to read
+                entry["size"], entry["mtime"] = st.st_size, st.st_mtime_ns
+        # Oldest first, so imported rows mostly land after what is already stored
+        tasks.sort(key=lambda task: (task[2], task[0]))
+        return tasks
+
+    def orphans(self):
+        """Entries whose file is gone, by (head_len, head) so a moved file is one lookup."""
+        orphans = {}
+        for path, entry in self.entries.items():
+            if not os.path.exists(path):
+                orphans.setdefault((entry["head_len"], entry["head"]), []).append(path)
+        return orphans
+
+    def find_moved(self, orphans, filepath, st):
+        """Take the orphan that filepath is (by its head hash) out of orphans and return its path."""
+        if not orphans:
+            return None
+        # Heads are hashed at the length read at the time, shorter for small files
+        lengths = sorted({head_len for head_len, _ in orphans}, reverse=True)
+        try:
+            with open_log(filepath) as f:
+                buf = f.read(lengths[0])
+        except (OSError, EOFError, lzma.LZMAError):
+            return None
+        for length in lengths:
+            key = hash_head(buf, length)
+            for old_path in orphans.get(key, ()):
+                if self.holds_offset(self.entries[old_path], filepath, st):
+                    orphans[key].remove(old_path)
+                    if not orphans[key]:
+                        del orphans[key]
+                    return old_path
+        return None
+
+    def holds_offset(self, entry, filepath, st):
+        """Whether the file is long enough to be the one entry read up to its offset."""
+        # Offsets of archives are in decompressed bytes, not comparable to st_size
+        return st.st_size >= entry["offset"] or is_compressed_log(filepath)
+
+    def same_file(self, entry, filepath, st):
+        if not self.holds_offset(entry, filepath, st):
+            return False
+        try:
+            return read_head_hash(filepath, entry["head_len"]) == (entry["head_len"], entry["head"])
+        except (OSError, EOFError, lzma.LZMAError):
+            return False
+
+    def update(self, result):
+        if result["stat"] is None:
+            return
+        size, mtime = result["stat"]
+        head_len, head = result["head"] or (0, hashlib.sha1(b"").hexdigest())
+        entry = self.entries[result["path"]] = {
+            "size": size, "mtime": mtime, "head_len": head_len, "head": head,
+            "offset": result["offset"], "day": result["day"],
+        }
+        if result.get("open"):
+            entry["open"] = result["open"]
+
+def workers_can_import():
+    """Whether worker processes can get at scan_log_file. It is pickled by
+    module name, so that name must resolve in this process (not so for a module
+    loaded with spec_from_file_location and left out of sys.modules) and, unless
+    workers are forked, be importable from sys.path in theirs."""
+    name = scan_log_file.__module__
+    if getattr(sys.modules.get(name), "scan_log_file", None) is not scan_log_file:
+        return False
+    # Spawned workers re-run the main script themselves
+    if name == "__main__" or multiprocessing.get_start_method() == "fork":
+        return True
+    return importlib.machinery.PathFinder.find_spec(name.partition(".")[0]) is not None
+
+def scan_log_files(tasks, workers=IMPORT_WORKERS):
+    """Yield scan results in the same order as tasks; in this process if
+    workers couldn't load this module."""
+    if workers <= 1 or len(tasks) <= 1 or not workers_can_import():
+        yield from map(scan_log_file, tasks)
+        return
+    with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as pool:
+        yield from pool.map(scan_log_file, tasks)
+
+class ImportWriter:
+    """Maps scan results onto the store dictionary and buffers rows into large writes.
+
+    Manifest progress is only recorded once the matching rows are on disk.
+    Problem lines go through the template miner, if given, into the errors table.
+    """
+    def __init__(self, store, manifest, rollups, index, dedupe, miner=None, batch_rows=IMPORT_BATCH_ROWS, metrics=None):
+        self.store = store
+        self.manifest = manifest
+        self.rollups = rollups
+        self.index = index
+        self.dedupe = dedupe
+        self.miner = miner
+        self.metrics = metrics or Metrics()
+        self.batch_rows = batch_rows
+        self.pending = 0
+        self.buffers = {}
+        self.finished = []
+        # First row (re)written per table over all flushes, for StatsModel.apply_append
+        self.starts = {}
+        self.reset()
+
+    def reset(self):
+        self.pending = 0
+        self.finished = []
+        self.buffers = {
+            table: {column: array(typecode) for column, typecode in columns}
+            for table, columns in STORE_TABLES.items()
+        }
+
+    def add(self, result):
+        self.finished.append(result)
+        self.metrics.add_file(result)
+        if not result["ok"]:
+            return
+        remap = {
+            kind: [self.store.intern(kind, value) for value in values]
+            for kind, values in result["strings"].items()
+        }
+        for table, columns in STORE_TABLES.items():
+            rows = result[table]
+            # Drop events already imported from another file or an earlier run
+            keep = [i for i, key in enumerate(result["keys"][table]) if self.dedupe.add(key)]
+            if len(keep) < len(rows["ts"]):
+                self.metrics.count("import.duplicates", len(rows["ts"]) - len(keep))
+                rows = {column: [rows[column][i] for i in keep] for column, _ in columns}
+            for column, _ in columns:
+                if column in remap:
+                    # Coded columns are named after their dictionary kind
+                    codes = remap[column]
+                    self.buffers[table][column].extend(codes[c] for c in rows[column])
+                else:
+                    self.buffers[table][column].extend(rows[column])
+            self.pending += len(rows["ts"])
+        if self.miner is not None and result["messages"]:
+            self.add_problems(result)
+        if self.pending >= self.batch_rows:
+            self.flush()
+
+    def add_problems(self, result):
+        # One miner call per distinct message; rows just pick up its template
+        templates = [self.miner.add(message, self.store) for message in result["messages"]]
+        problems = result["problems"]
+        errors = self.buffers["errors"]
+        kept = 0
+        for ts, message, key in zip(problems["ts"], problems["message"], problems["key"]):
+            if not self.dedupe.add(key):
+                continue
+            template = templates[message]
+            errors["ts"].append(ts)
+            errors["error"].append(template["code"])
+            self.miner.record(template, ts)
+            kept += 1
+        if kept < len(problems["ts"]):
+            self.metrics.count("import.duplicates", len(problems["ts"]) - kept)
+        self.metrics.count("import.problem_lines", kept)
+        self.pending += kept
+
+    def flush(self):
+        if self.miner is not None:
+            # Templates may have been renamed without adding rows
+            self.store.save_dictionary()
+        for table, columns in self.buffers.items():
+            with self.metrics.span("import.write"):
+                start = self.store.append(table, columns)
+            if start is not None:
+                self.starts[table] = min(self.starts.get(table, start), start)
+                with self.metrics.span("import.index"):
+                    self.index.update(self.store, table, start)
+            with self.metrics.span("import.rollups"):
+                self.rollups.add(table, columns)
+        with self.metrics.span("import.index"):
+            self.index.save()
+        with self.metrics.span("import.rollups"):
+            self.rollups.update_sessions(self.store)
+            self.rollups.save()
+        with self.metrics.span("import.dedupe"):
+            self.dedupe.save()
+        if self.miner is not None:
+            with self.metrics.span("import.templates"):
+                self.miner.save()
+        with self.metrics.span("import.manifest"):
+            for result in self.finished:
+                self.manifest.update(result)
+            self.manifest.save()
+        self.reset()
+
+# --- Log Watching ---
+# Follow mode waits for the log folders to change, then runs the normal
+# incremental import, which only reads what was appended since the manifest
+# offsets. On Linux the wait uses inotify (through ctypes, no extra packages);
+# elsewhere, or if inotify is unavailable, the folders are polled.
+FOLLOW_POLL_SECONDS = 2.0
+# Dashboard / CLI updates in follow mode happen at most this often
+FOLLOW_UPDATE_SECONDS = 5.0
+# Import anyway after this long without changes, so logs that went quiet get
+# their open sessions closed (see FILE_IDLE_SECONDS)
+FOLLOW_RESCAN_SECONDS = 60.0
+# snapshot.json (what the dashboard shows while loading) is refreshed this often
+FOLLOW_SNAPSHOT_SECONDS = 300.0
+IN_MODIFY = 0x002
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_FROM = 0x040
+IN_MOVED_TO = 0x080
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+def inotify_watch(dirs):
+    """An inotify file descriptor watching the given folders for log writes, renames and deletes."""
+    libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+    fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+    if fd < 0:
+        raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+    mask = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+    for path in dirs:
+        if libc.inotify_add_watch(fd, os.fsencode(path), mask) < 0:
+            err = ctypes.get_errno()
+            os.close(fd)
+            raise OSError(err, f"inotify_add_watch failed for {path}")
+    return fd
+
+class LogWatcher:
+    def __init__(self, log_dirs=LOG_DIRS, poll_seconds=FOLLOW_POLL_SECONDS):
+        self.log_dirs = [path for path in log_dirs if os.path.isdir(path)]
+        self.poll_seconds = poll_seconds
+        self.fd = None
+        if sys.platform.startswith("linux") and self.log_dirs:
+            try:
+                self.fd = inotify_watch(self.log_dirs)
+            except (OSError, AttributeError):
+                self.fd = None # e.g. out of watches, or no inotify in this libc
+        self.snapshot = self.scan()
+
+    def scan(self):
+        return {path: file_signature(path) for path in find_log_files(self.log_dirs)}
+
+    def wait(self, timeout):
+        """Block until a log changed or timeout seconds passed; True if something changed."""
+        if self.fd is not None:
+            ready, _, _ = select.select([self.fd], [], [], timeout)
+            if not ready:
+                return False
+            # Drain the queued events; one import covers all of them
+            try:
+                while os.read(self.fd, 65536):
+                    pass
+            except BlockingIOError:
+                pass
+            return True
+        deadline = time.monotonic() + timeout
+        while True:
+            snapshot = self.scan()
+            if snapshot != self.snapshot:
+                self.snapshot = snapshot
+                return True
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            time.sleep(min(self.poll_seconds, remaining))
+
+    def close(self):
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+# --- In-Memory Stats Model ---
+def file_signature(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_size, st.st_mtime_ns
+
+class StatsModel:
+    """Stats loaded once and kept parsed in memory.
+
+    Every backing file is remembered by (size, mtime); a piece is only re-read
+    when its file changed, e.g. after an import from another process. Tables
+    are loaded whole the first time a query needs all of them; until then a
+    range query only reads the segments overlapping its range (see view).
+    """
+    def __init__(self, store, manifest, rollups, index, dedupe, templates):
+        self.store = store
+        self.manifest = manifest
+        self.rollups = rollups
+        self.index = index
+        self.dedupe = dedupe
+        self.templates = templates
+        self.signatures = {}
+        self.tables = {}
+        self.version = 0
+        self.derived = {}
+
+    def changed(self, key, paths):
+        signature = tuple(file_signature(path) for path in paths)
+        if self.signatures.get(key) == signature:
+            return False
+        self.signatures[key] = signature
+        return True
+
+    def adopt(self, key, paths):
+        """Record the current signature of files this process just wrote itself."""
+        self.signatures[key] = tuple(file_signature(path) for path in paths)
+
+    def refresh(self):
+        """Reload whatever changed on disk since the last call."""
+        reloaded = False
+        if self.changed("dictionary", [self.store.dictionary_path]):
+            self.store.load_dictionary()
+            reloaded = True
+        if self.changed("manifest", [self.manifest.path]):
+            self.manifest.load()
+        if self.changed("rollups", self.rollups.paths()):
+            self.rollups.load()
+            reloaded = True
+        if self.changed("index", self.index.paths()):
+            self.index.load()
+        if self.changed("dedupe", [self.dedupe.path]):
+            self.dedupe.load()
+        if self.changed("templates", [self.templates.path]):
+            self.templates.load()
+        for table in STORE_TABLES:
+            if self.changed(table, self.store.table_paths(table)):
+                self.store.load_segments(table)
+                # Loaded again when next needed
+                self.tables.pop(table, None)
+                reloaded = True
+        if reloaded:
+            self.version += 1
+            self.derived = {}
+
+    def adopt_written(self):
+        """After this process imported, keep its in-memory rollups/manifest/dictionary/index/filter/templates."""
+        self.adopt("dictionary", [self.store.dictionary_path])
+        self.adopt("manifest", [self.manifest.path])
+        self.adopt("rollups", self.rollups.paths())
+        self.adopt("index", self.index.paths())
+        self.adopt("dedupe", [self.dedupe.path])
+        self.adopt("templates", [self.templates.path])
+
+    def apply_append(self, starts):
+        """Bring loaded tables up to date after this process wrote them from row
+        starts[table] on, reading only the new rows instead of reloading."""
+        for table, start in starts.items():
+            rows = self.tables.get(table)
+            if rows is None:
+                continue
+            start = min(start, len(rows["ts"]))
+            total = self.store.row_count(table)
+            # New arrays rather than in-place growth: readers may hold the old ones
+            self.tables[table] = {
+                column: rows[column][:start] + self.store.read_column(table, column, start, total - start)
+                for column, _ in STORE_TABLES[table]
+            }
+            self.adopt(table, self.store.table_paths(table))
+        if starts:
+            self.version += 1
+            self.derived = {}
+
+    def table(self, name):
+        """Every row of a table, loaded on first use."""
+        if name not in self.tables:
+            self.tables[name] = self.store.load(name)
+        return self.tables[name]
+
+    def loaded(self, name):
+        return name in self.tables
+
+    def view(self, name, since=None, until=None, overlapping=False):
+        """Rows of a table in [since, until) as (columns, i, j, first): rows i..j-1
+        of the columns, where index k is row first + k of the table. Slices the
+        loaded table if there is one, else reads just the overlapping segments
+        (see EventStore.read_range) without keeping them."""
+        if name in self.tables or (since is None and until is None):
+            rows = self.table(name)
+            i, j = time_slice(rows["ts"], since, until)
+            return rows, (0 if overlapping else i), j, 0
+        first, rows = self.store.read_range(name, since, until, overlapping)
+        return rows, 0, len(rows["ts"]), first
+
+    def has_data(self):
+        # Merged fleet shards carry data without ever importing logs themselves
+        return len(self.manifest.entries) > 0 or self.store.has_data()
+
+    def cached(self, key, compute):
+        """Memoize a value derived from the loaded data until the next reload."""
+        if key not in self.derived:
+            self.derived[key] = compute()
+        return self.derived[key]
+
+    def oldest_ts(self):
+        def compute():
+            # Tables are sorted, so the oldest row of each is its first
+            oldest = [ts for ts in map(self.store.first_ts, STORE_TABLES) if ts is not None]
+            if any(self.store.dropped_before.values()):
+                # Raw events were dropped by retention; the daily rollups reach further back
+                oldest += [min(days) for days in (self.rollups.buckets["day"], self.rollups.presence["day"]) if days]
+            return min(oldest) if oldest else None
+        return self.cached("oldest", compute)
+
+    def newest_ts(self, names=STORE_TABLES):
+        newest = [ts for ts in map(self.store.last_ts, names) if ts is not None]
+        return max(newest) if newest else None
+
+# --- Shards ---
+# A stats directory doubles as a per-host shard: shard.json names the host, and
+# the binary columns, dictionary and rollups are all that is needed to rebuild a
+# fleet-wide view. Counts merge by addition; players merge exactly because every
+# shard's player IDs are re-interned by name into the fleet dictionary.
+def read_shard_info(stats_dir):
+    path = os.path.join(stats_dir, SHARD_JSON)
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def shard_files(stats_dir):
+    names = [DICTIONARY_JSON, ROLLUPS_JSON, PRESENCE_BIN, ROLLUPS_JOURNAL, SHARD_JSON]
+    for table, columns in STORE_TABLES.items():
+        path = os.path.join(stats_dir, table, SEGMENTS_JSON)
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                segments = json.load(f)["segments"]
+            names.append(f"{table}/{SEGMENTS_JSON}")
+            names += [f"{table}/{segment['name']}.{column}.bin" for segment in segments for column, _ in columns]
+    return [name for name in names if os.path.exists(os.path.join(stats_dir, name))]
+
+def pack_shard(stats_dir, out_path):
+    """Zip up the files a fleet merge needs (no logs, CSVs or import state)."""
+    with zipfile.ZipFile(out_path, 'w', zipfile.ZIP_DEFLATED) as zf:
+        for name in shard_files(stats_dir):
+            zf.write(os.path.join(stats_dir, name), name)
+    return out_path
+
+def merge_shards(sources, out_dir):
+    """Combine shard directories or packed .zip shards into a fresh stats dir at out_dir."""
+    if not os.path.exists(out_dir):
+        os.makedirs(out_dir)
+    # Start from an empty store so re-running a merge never double counts
+    for name in shard_files(out_dir) + [DEDUPE_JSON, DEDUPE_KEYS, DEDUPE_BLOOM]:
+        if os.path.exists(os.path.join(out_dir, name)):
+            os.remove(os.path.join(out_dir, name))
+
+    fleet = EventStore(out_dir)
+    fleet_rollups = Rollups(out_dir)
+    merged = {table: {column: array(typecode) for column, typecode in columns} for table, columns in STORE_TABLES.items()}
+    hosts = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for i, source in enumerate(sources):
+            shard_dir = source
+            if zipfile.is_zipfile(source):
+                shard_dir = os.path.join(tmp, str(i))
+                with zipfile.ZipFile(source) as zf:
+                    zf.extractall(shard_dir)
+            info = read_shard_info(shard_dir)
+            hosts.append(info.get("host_id") or os.path.basename(os.path.normpath(source)))
+
+            shard = EventStore(shard_dir)
+            remap = {kind: [fleet.intern(kind, value) for value in shard.dicts[kind]] for kind in DICTIONARY_KINDS}
+            for table, columns in STORE_TABLES.items():
+                rows = shard.load(table)
+                for column, _ in columns:
+                    if column in remap:
+                        codes = remap[column]
+                        merged[table][column].extend(codes[c] for c in rows[column])
+                    else:
+                        merged[table][column].extend(rows[column])
+
+            shard_rollups = Rollups(shard_dir)
+            if not shard_rollups.is_current(shard):
+                shard_rollups.rebuild(shard)
+            fleet_rollups.merge(shard_rollups, remap)
+
+    # One sorted write per table instead of merging shard by shard
+    for table, columns in merged.items():
+        fleet.append(table, columns)
+    fleet.save_dictionary()
+    fleet_rollups.update_sessions(fleet)
+    fleet_rollups.save()
+    # Indexes aren't shipped in shards; build the fleet's from the merged tables
+    fleet_index = SecondaryIndex(out_dir)
+    fleet_index.rebuild(fleet)
+    fleet_index.save()
+    write_json_atomic(os.path.join(out_dir, SHARD_JSON), {"host_id": "fleet", "hosts": hosts})
+    return hosts
+
+# --- Stats Engine ---
+# Import, query and export with no GUI dependencies. The dashboard and the CLI
+# are both thin clients of this class.
+RANGE_OPTIONS = {
+    "Last Hour": timedelta(hours=1),
+    "Last 24h": timedelta(hours=24),
+    "Last 30d": timedelta(days=30),
+    "All Time": None,
+}
+RANGE_UNITS = {"m": "minutes", "h": "hours", "d": "days", "w": "weeks"}
+# Time-series bins; weeks start on Monday (1970-01-05 is the first one)
+WEEK = 7 * DAY
+WEEK_ORIGIN = 4 * DAY
+TIMELINE_BINS = {"hour": HOUR, "day": DAY, "week": WEEK}
+# "auto" picks the narrowest bin that keeps a timeline to about this many points
+TIMELINE_TARGET_BINS = 200
+# Level / gametype names as small categorical codes: an index into these lists,
+# whose last entry stands for IDs missing from LEVEL_MAP / GAMETYPE_MAP
+LEVEL_NAMES = list(LEVEL_MAP.values()) + ["Unknown"]
+GAMETYPE_NAMES = list(GAMETYPE_MAP.values()) + [("Unknown", "Unknown")]
+
+def parse_range(text):
+    """Turn a dashboard label ("Last 24h"), a span ("90m", "24h", "30d", "2w") or
+    "all" into a timedelta (None meaning all time)."""
+    if text in RANGE_OPTIONS:
+        return RANGE_OPTIONS[text]
+    text = text.strip().lower()
+    if text in ("all", "all time"):
+        return None
+    match = re.fullmatch(r'(\d+)\s*([mhdw])', text)
+    if not match:
+        raise ValueError(f"Unrecognised range '{text}' (use e.g. 1h, 24h, 30d or all)")
+    return timedelta(**{RANGE_UNITS[match.group(2)]: int(match.group(1))})
+
+def parse_time(text):
+    """Epoch for an ISO date or date/time ("2024-05-01", "2024-05-01 18:30")."""
+    try:
+        return to_epoch(datetime.fromisoformat(text.strip()))
+    except ValueError:
+        raise ValueError(f"Unrecognised date/time '{text}' (use e.g. 2024-05-01 or 2024-05-01T18:30)") from None
+
+def bin_floor(ts, width):
+    """Start of the hour / day / week bin holding ts."""
+    origin = WEEK_ORIGIN if width == WEEK else 0
+    return ts - (ts - origin) % width
+
+def pick_bin(span):
+    for name, width in TIMELINE_BINS.items():
+        if span <= width * TIMELINE_TARGET_BINS:
+            return name
+    return "week"
+
+def read_snapshot(stats_dir):
+    """All-time dashboard data saved by the last import (see write_snapshot), or None."""
+    try:
+        with open(os.path.join(stats_dir, SNAPSHOT_JSON), 'r', encoding='utf-8') as f:
+            snapshot = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if snapshot.get("version") != CURRENT_VERSION:
+        return None
+    data = snapshot["summary"]
+    for key in ("since", "until", "sessions_since"):
+        data[key] = datetime.fromisoformat(data[key]) if data.get(key) else None
+    data["timeline"] = snapshot["timeline"]
+    return data
+
+# Query filters and the dictionary kind (= coded column) each one matches on
+QUERY_FILTERS = {"player": "player", "level": "level", "gametype": "gametype", "mode": "gametype", "error": "error"}
+
+class StatsEngine:
+    def __init__(self, base_dir=BASE_DIR, stats_dir=None, mine_templates=MINE_TEMPLATES):
+        self.base_dir = base_dir
+        self.mine_templates = mine_templates
+        log_dir = os.path.join(base_dir, "_local", "r14logs")
+        self.log_dirs = (log_dir, os.path.join(log_dir, "old"))
+        self.stats_dir = stats_dir or os.path.join(base_dir, "dashboard", "stats")
+        if not os.path.exists(self.stats_dir):
+            os.makedirs(self.stats_dir)
+
+        self.store = EventStore(self.stats_dir)
+        migrate_legacy_stats(self.store)
+        self.dedupe = DuplicateFilter(self.stats_dir)
+        if not self.dedupe.count and (self.store.row_count("players") or self.store.row_count("visits")):
+            # Stats from before the filter existed (or a damaged key file)
+            self.dedupe.seed(self.store)
+        self.manifest = ImportManifest(self.stats_dir, self.log_dirs)
+        self.rollups = Rollups(self.stats_dir)
+        if not self.rollups.is_current(self.store):
+            self.rollups.rebuild(self.store)
+            self.rollups.save()
+        self.index = SecondaryIndex(self.stats_dir)
+        if not self.index.is_current(self.store):
+            self.index.rebuild(self.store)
+            self.index.save()
+        self.templates = TemplateMiner(self.stats_dir)
+        self.model = StatsModel(self.store, self.manifest, self.rollups, self.index, self.dedupe, self.templates)
+        self.model.refresh()
+        # The dashboard queries from a worker thread while imports may run on another
+        self.lock = threading.RLock()
+        self.metrics = Metrics(os.path.join(self.stats_dir, METRICS_JSON))
+        self.shard = read_shard_info(self.stats_dir)
+        if not self.shard:
+            self.set_host_id(socket.gethostname())
+
+    def set_host_id(self, host_id):
+        self.shard["host_id"] = host_id
+        write_json_atomic(os.path.join(self.stats_dir, SHARD_JSON), self.shard)
+
+    def has_data(self):
+        return self.model.has_data()
+
+    # --- Import ---
+    def import_logs(self, workers=IMPORT_WORKERS, progress=None, snapshot=True):
+        """Import everything new under the log dirs; returns the number of files read.
+        snapshot=False skips rewriting snapshot.json (follow mode does it itself)."""
+        with self.lock, self.metrics.span("import.total"):
+            self.metrics.start_import()
+            # Pick up anything another process wrote before we append to it
+            self.refresh()
+            with self.metrics.span("import.discover"):
+                tasks = [task + (self.mine_templates,) for task in self.manifest.plan(find_log_files(self.log_dirs))]
+            total_files = len(tasks)
+
+            if total_files == 0:
+                self.manifest.save()
+                self.model.adopt_written()
+                if progress: progress(1.0)
+                return 0
+
+            miner = self.templates if self.mine_templates else None
+            writer = ImportWriter(self.store, self.manifest, self.rollups, self.index, self.dedupe, miner, metrics=self.metrics)
+            count = 0
+            for result in scan_log_files(tasks, workers):
+                # Unreadable files are skipped and retried next time
+                writer.add(result)
+                count += 1
+                if progress: progress(count / total_files)
+            writer.flush()
+            self.model.apply_append(writer.starts)
+            self.model.adopt_written()
+            if snapshot:
+                with self.metrics.span("import.snapshot"):
+                    self.write_snapshot()
+        self.save_metrics()
+        return total_files
+
+    def follow(self, on_update=None, stop=None, interval=FOLLOW_UPDATE_SECONDS, workers=1):
+        """Keep importing as the logs grow until stop (a threading.Event) is set.
+
+        on_update() is called after imports that found new data, at most once
+        every interval seconds (changes in between are coalesced). The start-up
+        snapshot is rewritten at most every FOLLOW_SNAPSHOT_SECONDS and on stop.
+        """
+        watcher = LogWatcher(self.log_dirs)
+        stale_snapshot = False
+        try:
+            self.import_logs(workers)
+            last_import = last_update = last_snapshot = time.monotonic()
+            if on_update:
+                on_update()
+            dirty = False
+            while not (stop is not None and stop.is_set()):
+                # Short waits so a stop request is noticed quickly
+                changed = watcher.wait(min(FOLLOW_POLL_SECONDS, interval))
+                now = time.monotonic()
+                if changed or now - last_import >= FOLLOW_RESCAN_SECONDS:
+                    with self.metrics.span("follow.import"):
+                        imported = self.import_logs(workers, snapshot=False) > 0
+                    dirty |= imported
+                    stale_snapshot |= imported
+                    last_import = now
+                if dirty and on_update and now - last_update >= interval:
+                    on_update()
+                    last_update = now
+                    dirty = False
+                if stale_snapshot and now - last_snapshot >= FOLLOW_SNAPSHOT_SECONDS:
+                    self.write_snapshot()
+                    last_snapshot = now
+                    stale_snapshot = False
+        finally:
+            watcher.close()
+            if stale_snapshot:
+                self.write_snapshot()
+
+    def compact(self, keep_days=RAW_RETENTION_DAYS, compact_days=COMPACT_AFTER_DAYS):
+        """Merge the day segments of months older than compact_days into month
+        segments and, with keep_days, drop raw events from before that many days
+        ago (whole days/months at a time). Summary counts keep the dropped
+        history through the rollups. Returns {"merged", "dropped"}."""
+        with self.lock:
+            self.refresh()
+            now = to_epoch(datetime.now())
+            dropped = {}
+            if keep_days is not None:
+                cutoff = now - keep_days * DAY
+                dropped = {table: sum(segment["rows"] for segment in self.store.expired(table, cutoff)) for table in STORE_TABLES}
+            if any(dropped.values()):
+                # Rollups first: if we stop half way, the next start sees them as
+                # stale and rebuilds them from the raw rows that are still there
+                for table, rows in dropped.items():
+                    self.rollups.rows[table] = self.rollups.rows.get(table, 0) - rows
+                self.rollups.save()
+                for table in STORE_TABLES:
+                    self.store.drop_before(table, cutoff)
+                # Session totals only cover the visits and matches that are kept
+                self.rollups.update_sessions(self.store)
+                self.rollups.save()
+                # Row numbers moved, so the postings are rebuilt
+                self.index.rebuild(self.store)
+                self.index.save()
+            merged = sum(self.store.compact(table, now - compact_days * DAY) for table in STORE_TABLES)
+            self.refresh()
+            if self.has_data():
+                self.write_snapshot()
+        return {"merged": merged, "dropped": sum(dropped.values())}
+
+    def save_metrics(self):
+        self.metrics.save(self.stats_dir, self.shard.get("host_id"))
+
+    def write_snapshot(self):
+        """Save the all-time summary and timeline, which the dashboard paints on
+        start-up while the stats themselves are still loading."""
+        with self.lock:
+            summary = summary_json(self.summary(), "all")
+            timeline = self.timeline()
+        write_json_atomic(os.path.join(self.stats_dir, SNAPSHOT_JSON),
+                          {"version": CURRENT_VERSION, "summary": summary, "timeline": timeline})
+
+    # --- Queries ---
+    # The helpers below read the in-memory model as is; summary() and
+    # export_csv() refresh it from disk first.
+    def refresh(self):
+        with self.metrics.span("query.refresh"):
+            self.model.refresh()
+
+    def oldest(self):
+        """Oldest date/time across all stored events."""
+        oldest = self.model.oldest_ts()
+        return from_epoch(oldest) if oldest is not None else None
+
+    def range_counts(self, since=None, until=None):
+        """Per-code level / gametype / error counts from the rollups."""
+        with self.metrics.span("query.range_counts"):
+            return self.rollups.query(self.model.view, since=since, until=until)
+
+    def categories(self, kind):
+        """array('B') taking a level / gametype dictionary code to its index in
+        LEVEL_NAMES / GAMETYPE_NAMES."""
+        mapping, names = (LEVEL_MAP, LEVEL_NAMES) if kind == "level" else (GAMETYPE_MAP, GAMETYPE_NAMES)
+        def compute():
+            index = {hex_id: i for i, hex_id in enumerate(mapping)}
+            return array('B', (index.get(value, len(names) - 1) for value in self.store.dicts[kind]))
+        return self.model.cached(("categories", kind), compute)
+
+    def category_counts(self, kind, counts):
+        """Fold {dictionary code: n} into a list of totals in LEVEL_NAMES /
+        GAMETYPE_NAMES order (a weighted bincount over the categorical codes)."""
+        categories = self.categories(kind)
+        totals = [0] * len(LEVEL_NAMES if kind == "level" else GAMETYPE_NAMES)
+        for code, n in counts.items():
+            totals[categories[code]] += n
+        return totals
+
+    def count_players(self, since=None, until=None):
+        """Unique players seen in the range, from the presence bitmaps."""
+        with self.metrics.span("query.players"):
+            if since is None and until is None:
+                return self.model.cached("players_all_time", lambda: self.rollups.unique_players(self.model.view))
+            return self.rollups.unique_players(self.model.view, since=since, until=until)
+
+    def concurrency_profile(self, since=None, until=None):
+        """Profile of the visits; just those reaching into [since, until) while
+        the visits table isn't loaded."""
+        if self.model.loaded("visits") or (since is None and until is None):
+            visits = self.model.table("visits")
+            return self.model.cached("concurrency", lambda: ConcurrencyProfile(visits["ts"], visits["end"]))
+        visits, _, _, _ = self.model.view("visits", since, until, overlapping=True)
+        return ConcurrencyProfile(visits["ts"], visits["end"])
+
+    def session_stats(self, since=None, until=None):
+        """Peak / average players online at once and average match length in the range.
+
+        These only cover the visits and matches that retention kept (see compact):
+        a range reaching back past them starts where they do, given as
+        "sessions_since" (else None), and one wholly before them has None for each."""
+        with self.metrics.span("query.sessions"):
+            kept = max(filter(None, (self.store.dropped_before[table] for table in SESSION_TABLES)), default=None)
+            clamped = kept is not None and (since is None or since < kept)
+            if clamped:
+                if until is not None and until <= kept:
+                    return {"peak_players": None, "avg_players": None, "avg_match_minutes": None, "sessions_since": None}
+                since = kept
+            # A range holding every kept visit and match is answered by the rollups' totals
+            holds_all = until is None and (since is None or all(
+                ts is None or ts >= since for ts in map(self.store.first_ts, SESSION_TABLES)))
+            if holds_all and not self.model.loaded("visits") and self.rollups.sessions_current(self.store):
+                stats = self.all_time_session_stats(since)
+            else:
+                stats = self.range_session_stats(since, until)
+            stats["sessions_since"] = from_epoch(kept) if clamped else None
+            return stats
+
+    def range_session_stats(self, since, until):
+        profile = self.concurrency_profile(since, until)
+        hi = until if until is not None else to_epoch(datetime.now())
+        lo = since
+        if lo is None:
+            lo = profile.times[0] if profile.times else hi
+        matches, i, j, _ = self.model.view("matches", since, until)
+        played = j - i
+        if self.model.loaded("matches"):
+            durations = self.model.cached("match_durations", lambda: prefix_sums(e - s for s, e in zip(matches["ts"], matches["end"])))
+            duration = durations[j] - durations[i]
+        else:
+            duration = sum(matches["end"][i:j]) - sum(matches["ts"][i:j])
+        return {
+            "peak_players": profile.peak(since, until),
+            "avg_players": round(profile.average(lo, hi), 2),
+            "avg_match_minutes": round(duration / played / 60, 1) if played else 0.0,
+        }
+
+    def all_time_session_stats(self, since=None):
+        """range_session_stats() from since on, for a range that holds every kept
+        visit and match, from the rollups' session totals."""
+        sessions = self.rollups.sessions
+        now = to_epoch(datetime.now())
+        lo = since
+        if lo is None:
+            lo = sessions["first_visit"] if sessions["first_visit"] is not None else now
+        seconds = sessions["visit_seconds"]
+        if sessions["last_end"] is not None and sessions["last_end"] > now:
+            # Visits running past this clock only count up to now
+            visits, i, j, _ = self.model.view("visits", now, None, overlapping=True)
+            seconds -= sum(end - max(start, now) for start, end in zip(visits["ts"][i:j], visits["end"][i:j]) if end > max(start, now))
+        played = sessions["rows"]["matches"]
+        return {
+            "peak_players": sessions["peak"],
+            "avg_players": round(seconds / (now - lo), 2) if now > lo else 0.0,
+            "avg_match_minutes": round(sessions["match_seconds"] / played / 60, 1) if played else 0.0,
+        }
+
+    def template_list(self):
+        """All mined templates, most frequent first: {"template", "count", "first", "last"}."""
+        with self.lock:
+            self.refresh()
+            templates = [
+                {"template": self.store.lookup("error", t["code"]), "count": t["count"], "first": t["first"], "last": t["last"]}
+                for t in self.templates.templates
+            ]
+        return sorted(templates, key=lambda t: t["count"], reverse=True)
+
+    def error_counts(self, range_counts):
+        counts = {k: 0 for k in KNOWN_ERRORS}
+        for code, n in range_counts["error"].items():
+            err = self.store.lookup("error", code)
+            if err in counts:
+                counts[err] += n
+        return counts
+
+    def known_error_codes(self):
+        known = set(KNOWN_ERRORS)
+        return {code for code, err in enumerate(self.store.dicts["error"]) if err in known}
+
+    def template_counts(self, range_counts):
+        """Counts of the mined templates (every error that isn't a known signature)."""
+        known = set(KNOWN_ERRORS)
+        counts = {}
+        for code, n in range_counts["error"].items():
+            err = self.store.lookup("error", code)
+            if err not in known and n:
+                counts[err] = counts.get(err, 0) + n
+        return counts
+
+    def summary(self, delta=None, since=None, until=None):
+        """Everything the dashboard shows for "the last <delta>", or for [since, until)
+        given as epochs (None = all time / open-ended)."""
+        with self.lock, self.metrics.span("query.summary"):
+            self.refresh()
+            if since is None and delta is not None:
+                since = range_start(delta)
+            range_counts = self.range_counts(since, until)
+
+            level_totals = self.category_counts("level", range_counts["level"])
+            levels = {name: n for name, n in zip(LEVEL_NAMES, level_totals) if n}
+
+            gametypes = {"Public": 0, "Private": 0}
+            modes = {}
+            for (type_name, mode_name), n in zip(GAMETYPE_NAMES, self.category_counts("gametype", range_counts["gametype"])):
+                if not n:
+                    continue
+                if type_name in gametypes:
+                    gametypes[type_name] += n
+                modes[mode_name] = modes.get(mode_name, 0) + n
+
+            # The range starts at the cutoff, or at the oldest data if that is later
+            oldest = self.oldest()
+            display_since = oldest
+            if oldest is not None and since is not None:
+                display_since = max(oldest, from_epoch(since))
+
+            error_types = self.error_counts(range_counts)
+            templates = self.template_counts(range_counts)
+            return {
+                "since": display_since,
+                "until": from_epoch(until) if until is not None else None,
+                "players": self.count_players(since, until),
+                "games": sum(range_counts["level"].values()),
+                "errors": sum(error_types.values()),
+                "levels": levels,
+                "gametypes": gametypes,
+                "modes": modes,
+                "error_types": error_types,
+                "templates": templates,
+                **self.session_stats(since, until),
+            }
+
+    # --- Time Series ---
+    # Games and errors per bin are summed from the hourly / daily rollup buckets
+    # (raw rows only for partial hours at the ends of the range), and unique
+    # players per bin come from their presence bitmaps, so a timeline never
+    # loads a whole table.
+    def timeline(self, since=None, until=None, bin_name="auto", error=None):
+        """Games hosted, unique players and errors per hour / day / week in [since, until).
+
+        Returns {"bin", "starts", "games", "players", "errors"}; error limits the
+        error counts to matching signatures (see filter_codes)."""
+        with self.lock, self.metrics.span("query.timeline"):
+            self.refresh()
+            lo = since if since is not None else self.model.oldest_ts()
+            hi = until
+            if hi is None:
+                # Up to now, or past the newest event if the logs run ahead of this clock
+                newest = self.model.newest_ts(("levels", "players", "errors"))
+                hi = max(to_epoch(datetime.now()), newest if newest is not None else 0) + 1
+            if lo is None or hi <= lo:
+                return {"bin": bin_name, "starts": [], "games": [], "players": [], "errors": []}
+            if bin_name == "auto":
+                bin_name = pick_bin(hi - lo)
+            if bin_name not in TIMELINE_BINS:
+                raise ValueError(f"Unknown bin '{bin_name}' (use auto, {', '.join(TIMELINE_BINS)})")
+            width = TIMELINE_BINS[bin_name]
+            starts = list(range(bin_floor(lo, width), hi, width))
+            edges = [lo] + starts[1:] + [hi]
+            counts = [self.rollups.query(self.model.view, a, b) for a, b in zip(edges, edges[1:])]
+            # Without a filter, the known signatures as in summary
+            codes = self.known_error_codes() if error is None else self.filter_codes("error", error)
+            return {
+                "bin": bin_name,
+                "starts": starts,
+                "games": [sum(c["level"].values()) for c in counts],
+                "players": [self.bin_players(a, b, width) for a, b in zip(edges, edges[1:])],
+                "errors": [sum(n for code, n in c["error"].items() if code in codes) for c in counts],
+            }
+
+    def bin_players(self, lo, hi, width):
+        presence = self.rollups.presence
+        if hi - lo == width and width == HOUR and lo % HOUR == 0:
+            return popcount(presence["hour"].get(lo, 0))
+        if hi - lo == width and lo % DAY == 0:
+            bitmap = 0
+            for day in range(lo, hi, DAY):
+                bitmap |= presence["day"].get(day, 0)
+            return popcount(bitmap)
+        # Partial bins at the ends of the range
+        return self.rollups.unique_players(self.model.view, lo, hi)
+
+    # --- Ad-hoc Queries ---
+    def filter_codes(self, name, value):
+        """Dictionary codes a filter value matches: a player name, a level / gametype /
+        mode name or hex ID, or part of an error signature (all case-insensitive)."""
+        kind = QUERY_FILTERS[name]
+        if name == "player" and value in self.store.codes["player"]:
+            return {self.store.codes["player"][value]}
+        value = value.strip().lower()
+        codes = set()
+        for code, item in enumerate(self.store.dicts[kind]):
+            if name == "player":
+                hit = item.lower() == value
+            elif name == "level":
+                hit = value in (item.lower(), LEVEL_MAP.get(item, "Unknown").lower())
+            elif name == "gametype":
+                hit = value in (item.lower(), GAMETYPE_MAP.get(item, ("Unknown", "Unknown"))[0].lower())
+            elif name == "mode":
+                hit = value == GAMETYPE_MAP.get(item, ("Unknown", "Unknown"))[1].lower()
+            else:
+                hit = value in item.lower() or value in ERROR_ALIASES.get(item, "").lower()
+            if hit:
+                codes.add(code)
+        return codes
+
+    def query_rows(self, table, since=None, until=None, **filters):
+        """Rows of a table in [since, until) that pass every filter, as (columns,
+        first, row numbers); row r is at index r - first of the columns. A lookup
+        without a range that the indexes answer reads just the matched rows, so
+        there the columns hold only those and the row numbers are 0, 1, ..."""
+        if table not in STORE_TABLES:
+            raise ValueError(f"Unknown table '{table}' (use one of {', '.join(STORE_TABLES)})")
+        columns = [column for column, _ in STORE_TABLES[table]]
+        filters = [(name, value) for name, value in filters.items() if value is not None]
+        for name, _ in filters:
+            if QUERY_FILTERS[name] not in columns:
+                raise ValueError(f"{table} can't be filtered by {name}")
+        indexed = INDEXED_COLUMNS.get(table, ())
+        if (since is None and until is None and filters and not self.model.loaded(table)
+                and all(QUERY_FILTERS[name] in indexed for name, _ in filters)):
+            selected = self.match_rows(table, None, 0, 0, self.store.row_count(table), filters)
+            return self.store.read_rows(table, selected), 0, range(len(selected))
+        rows, i, j, first = self.model.view(table, since, until)
+        return rows, first, self.match_rows(table, rows, first, first + i, first + j, filters)
+
+    def match_rows(self, table, rows, first, i, j, filters):
+        """Row numbers in [i, j) that pass every filter: from the indexes where
+        the column has one, else by scanning rows (row r at index r - first)."""
+        selected = None
+        for name, value in filters:
+            column = QUERY_FILTERS[name]
+            codes = self.filter_codes(name, value)
+            if column in INDEXED_COLUMNS.get(table, ()):
+                with self.metrics.span("query.index"):
+                    postings = self.index.lookup(table, column, codes)
+                    matched = postings[bisect_left(postings, i):bisect_left(postings, j)]
+            else:
+                # Interval tables aren't indexed; scan the (much shorter) range
+                values = rows[column]
+                matched = [row for row in range(i, j) if values[row - first] in codes]
+            if selected is None:
+                selected = matched
+            else:
+                matched = set(matched)
+                selected = [row for row in selected if row in matched]
+            if not selected:
+                return []
+        return range(i, j) if selected is None else selected
+
+    def describe_row(self, table, rows, row):
+        out = {}
+        for column, _ in STORE_TABLES[table]:
+            value = rows[column][row]
+            if column in ("ts", "end"):
+                out["time" if column == "ts" else "end"] = from_epoch(value).strftime("%Y-%m-%d %H:%M:%S")
+            elif column == "level":
+                out["level"] = LEVEL_MAP.get(self.store.lookup("level", value), "Unknown")
+            elif column == "gametype":
+                out["type"], out["mode"] = GAMETYPE_MAP.get(self.store.lookup("gametype", value), ("Unknown", "Unknown"))
+            else:
+                out[column] = self.store.lookup(column, value)
+        return out
 
-if IS_FROZEN:
-    # If compiled, use the directory of the executable
-    BASE_DIR = os.path.dirname(sys.executable)
-    APP_FILE = sys.executable
-    APP_EXT = ".exe"
-else:
-    # If running as a script, use the directory of the script file
-    BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-    APP_FILE = os.path.abspath(__file__)
-    APP_EXT = ".py"
+    def query(self, table, since=None, until=None, limit=None, newest_first=False, **filters):
+        """Matching rows of a table as an iterator of dicts, oldest first unless
+        newest_first. Filters: player, level, gametype, mode, error (see filter_codes).
+        Bad tables / filters raise ValueError here rather than mid-stream."""
+        with self.lock, self.metrics.span("query.adhoc"):
+            self.refresh()
+            rows, first, selected = self.query_rows(table, since, until, **filters)
+        if newest_first:
+            selected = reversed(selected)
+        if limit is not None:
+            selected = itertools.islice(selected, limit)
+        # The model swaps in new arrays when it reloads, so these stay valid
+        return (self.describe_row(table, rows, row - first) for row in selected)
 
-# Directory Paths
-LOG_DIR = os.path.join(BASE_DIR, "_local", "r14logs")
-LOG_DIR_OLD = os.path.join(LOG_DIR, "old")
-STATS_DIR = os.path.join(BASE_DIR, "dashboard", "stats")
-TEMP_DIR = os.path.join(BASE_DIR, "dashboard", "temp")
-ECHO_EXE = os.path.join(BASE_DIR, "bin", "win10", "echovr.exe")
+    def query_fields(self, table):
+        """Keys of the dicts query() yields for a table (CSV header)."""
+        fields = []
+        for column, _ in STORE_TABLES[table]:
+            fields.extend({"ts": ["time"], "gametype": ["type", "mode"]}.get(column, [column]))
+        return fields
 
-# File Paths
-LEVELS_TXT = os.path.join(STATS_DIR, "levels.txt")
-PLAYERS_TXT = os.path.join(STATS_DIR, "players.txt")
-ERRORS_TXT = os.path.join(STATS_DIR, "errors.txt")
-PROCESSED_LOGS_JSON = os.path.join(STATS_DIR, "processed_logs.json")
+    # --- Export ---
+    # Rows are streamed from the column files in fixed-size chunks straight into
+    # the CSV writers, so memory use doesn't grow with the length of the history.
+    def export_csv(self, out_dir=None, delta=None, compress=False, since=None, until=None):
+        """Write levels.csv, players.csv, errors.csv and templates.csv (.csv.gz if
+        compress) for the last <delta> or [since, until) (None = everything);
+        returns the output directory."""
+        with self.lock:
+            self.refresh()
+            out_dir = out_dir or self.stats_dir
+            if not os.path.exists(out_dir):
+                os.makedirs(out_dir)
+            if since is None and delta is not None:
+                since = range_start(delta)
+            with self.metrics.span("export.levels"):
+                self.process_levels_csv(out_dir, since, compress, until)
+            with self.metrics.span("export.players"):
+                self.process_players_csv(out_dir, since, compress, until)
+            with self.metrics.span("export.errors"):
+                self.process_errors_csv(out_dir, since, compress, until)
+        self.save_metrics()
+        return out_dir
 
-# Hex Mappings
-LEVEL_MAP = {
-    "0xD09AFD15B1C75C04": "Lobby",
-    "0x576ED3F8428EBC4B": "Arena",
-    "0xDF5CA7B7DFA383D4": "Fission",
-    "0x43E2DA7A0C623A19": "Surge",
-    "0x43E2DA7914642604": "Dyson",
-    "0x42670F2BED45703C": "Combustion"
-}
+    def open_csv(self, out_dir, name, compress):
+        csv_path = os.path.join(out_dir, name)
+        if compress:
+            return gzip.open(csv_path + ".gz", 'wt', newline='')
+        return open(csv_path, 'w', newline='')
 
-GAMETYPE_MAP = {
-    "0x042D9CF9CFDDCF76": ("Public", "Lobby"),
-    "0x305D6E37C1589C45": ("Private", "Lobby"),
-    "0xCB60A4DE7E1CAF73": ("Public", "Arena"),
-    "0x09990965F4DB8C03": ("Private", "Arena"),
-    "0x3D5C3976578A321A": ("Public", "Combat"),
-    "0x33BBF6842DF97A3F": ("Private", "Combat")
-}
+    def process_levels_csv(self, out_dir, since=None, compress=False, until=None):
+        names = {}
+        with self.open_csv(out_dir, "levels.csv", compress) as f:
+            writer = csv.writer(f)
+            writer.writerow(["Date", "Time", "Gametype", "Gamemode", "Level"])
+            for rows in self.store.iter_rows("levels", since, until):
+                for ts, lvl, gt in zip(rows["ts"], rows["level"], rows["gametype"]):
+                    if (lvl, gt) not in names:
+                        type_name, mode_name = GAMETYPE_MAP.get(self.store.lookup("gametype", gt), ("Unknown", "Unknown"))
+                        names[lvl, gt] = [type_name, mode_name, LEVEL_MAP.get(self.store.lookup("level", lvl), "Unknown")]
+                    dt = from_epoch(ts)
+                    writer.writerow([dt.strftime("%Y-%m-%d"), dt.strftime("%H:%M:%S")] + names[lvl, gt])
 
-# Error Signatures
-KNOWN_ERRORS = [
-    "Unable to find MiniDumpWriteDump",
-    "[NETGAME] Service status request failed: 400 Bad Request",
-    "[NETGAME] Service status request failed: 404 Not Found",
-    "[TCP CLIENT] [R14NETCLIENT] connection to ws:///login",
-    "[TCP CLIENT] [R14NETCLIENT] connection to failed",
-    "[TCP CLIENT] [R14NETCLIENT] connection to established",
-    "[TCP CLIENT] [R14NETCLIENT] connection to restored",
-    "[TCP CLIENT] [R14NETCLIENT] connection to closed",
-    "[TCP CLIENT] [R14NETCLIENT] Lost connection (okay) to peer",
-    "[NETGAME] Service status request failed: 502 Bad Gateway",
-    "[NETGAME] Service status request failed: 0 Unknown"
-]
+    def process_players_csv(self, out_dir, since=None, compress=False, until=None):
+        # Repeated joins (same player at the same moment) never reach the store
+        if not self.store.row_count("players"): return
+        with self.open_csv(out_dir, "players.csv", compress) as f:
+            writer = csv.writer(f)
+            writer.writerow(["Date", "Time", "Player"])
+            for rows in self.store.iter_rows("players", since, until):
+                for ts, player in zip(rows["ts"], rows["player"]):
+                    dt = from_epoch(ts)
+                    writer.writerow([dt.strftime("%Y-%m-%d"), dt.strftime("%H:%M:%S"), self.store.lookup("player", player)])
 
-# Error Legend Aliases
-ERROR_ALIASES = {
-    "Unable to find MiniDumpWriteDump": "Unable to find MiniDumpWriteDump",
-    "[NETGAME] Service status request failed: 400 Bad Request": "400 Bad Request [NETGAME]",
-    "[NETGAME] Service status request failed: 404 Not Found": "404 Not Found [NETGAME]",
-    "[TCP CLIENT] [R14NETCLIENT] connection to ws:///login": "R14 Login Connection Error [TCP]",
-    "[TCP CLIENT] [R14NETCLIENT] connection to failed": "R14 Connection Failed [TCP]",
-    "[TCP CLIENT] [R14NETCLIENT] connection to established": "R14 Connection Established [TCP]",
-    "[TCP CLIENT] [R14NETCLIENT] connection to restored": "R14 Connection Restored [TCP]",
-    "[TCP CLIENT] [R14NETCLIENT] connection to closed": "R14 Connection Closed [TCP]",
-    "[TCP CLIENT] [R14NETCLIENT] Lost connection (okay) to peer": "R14 Lost Peer Connection [TCP]",
-    "[NETGAME] Service status request failed: 502 Bad Gateway": "502 Bad Gateway [NETGAME]",
-    "[NETGAME] Service status request failed: 0 Unknown": "0 Unknown [NETGAME]"
-}
+    def process_errors_csv(self, out_dir, since=None, compress=False, until=None):
+        if not self.store.row_count("errors"): return
+        known = set(KNOWN_ERRORS)
+        # Mined templates in the range: code -> [count, first, last]
+        templates = {}
+        with self.open_csv(out_dir, "errors.csv", compress) as f:
+            writer = csv.writer(f)
+            writer.writerow(["Date", "Time", "Error"])
+            for rows in self.store.iter_rows("errors", since, until):
+                for ts, error in zip(rows["ts"], rows["error"]):
+                    dt = from_epoch(ts)
+                    err = self.store.lookup("error", error)
+                    writer.writerow([dt.strftime("%Y-%m-%d"), dt.strftime("%H:%M:%S"), err])
+                    if err not in known:
+                        seen = templates.setdefault(error, [0, ts, ts])
+                        seen[0] += 1
+                        seen[2] = ts
+        if not templates: return
+        with self.open_csv(out_dir, "templates.csv", compress) as f:
+            writer = csv.writer(f)
+            writer.writerow(["Template", "Count", "First Seen", "Last Seen"])
+            for code, (n, first, last) in sorted(templates.items(), key=lambda item: item[1][0], reverse=True):
+                writer.writerow([self.store.lookup("error", code), n,
+                                 from_epoch(first).strftime("%Y-%m-%d %H:%M:%S"), from_epoch(last).strftime("%Y-%m-%d %H:%M:%S")])
 
-class StatTrackerApp(ctk.CTk):
-    def __init__(self):
+# --- Dashboard ---
+# Without the GUI packages the class is still defined (on a plain object base)
+# so the module imports cleanly; main() refuses to open the window instead.
+class StatTrackerApp(ctk.CTk if ctk is not None else object):
+    def __init__(self, engine=None):
         super().__init__()
 
         # --- Startup Checks ---
-        if not os.path.exists(ECHO_EXE):
+        # An explicit engine (e.g. a merged fleet folder) doesn't need the game install
+        if engine is None and not os.path.exists(ECHO_EXE):
             # Detailed error message to help debug path issues
             msgbox.showerror(
                 "Error", 
@@ -115,21 +3449,20 @@ class StatTrackerApp(ctk.CTk):
             )
             sys.exit()
 
-        if not os.path.exists(STATS_DIR):
-            os.makedirs(STATS_DIR)
-        
         # Ensure Temp dir exists for updates
         if not os.path.exists(TEMP_DIR):
             os.makedirs(TEMP_DIR)
 
-        if not os.path.exists(PROCESSED_LOGS_JSON):
-            with open(PROCESSED_LOGS_JSON, 'w') as f:
-                json.dump([], f)
+        # The engine (which reads the stats) and matplotlib load on a background
+        # thread; until then the window shows the snapshot of the last import
+        self.engine = None
+        stats_dir = engine.stats_dir if engine is not None else STATS_DIR
+        self.snapshot = read_snapshot(stats_dir)
 
         # --- Window Setup ---
         self.title(f"EchoVR Server Stat Tracker v{CURRENT_VERSION}")
-        self.geometry("1200x700")
-        self.minsize(1200, 700)
+        self.geometry("1200x760")
+        self.minsize(1200, 760)
         
         self.grid_columnconfigure(1, weight=1)
         self.grid_rowconfigure(0, weight=1)
@@ -137,20 +3470,21 @@ class StatTrackerApp(ctk.CTk):
         # --- Left Panel (Controls) ---
         self.sidebar_frame = ctk.CTkFrame(self, width=200, corner_radius=0)
         self.sidebar_frame.grid(row=0, column=0, sticky="nsew")
-        self.sidebar_frame.grid_rowconfigure(8, weight=1) # Spacer row
+        self.sidebar_frame.grid_rowconfigure(11, weight=1) # Spacer row
 
         self.logo_label = ctk.CTkLabel(self.sidebar_frame, text="Server Stat Tracker", font=ctk.CTkFont(size=20, weight="bold"))
         self.logo_label.grid(row=0, column=0, padx=20, pady=(20, 10))
 
         # Button Label Logic (Initial)
         btn_text = "Import Log Data"
-        if self.check_data_exists():
+        if self.snapshot is not None:
             btn_text = "Refresh Log Data"
 
-        self.import_btn = ctk.CTkButton(self.sidebar_frame, text=btn_text, command=self.start_import_thread)
+        # Buttons that need the engine stay disabled until it has loaded
+        self.import_btn = ctk.CTkButton(self.sidebar_frame, text=btn_text, command=self.start_import_thread, state="disabled")
         self.import_btn.grid(row=1, column=0, padx=20, pady=10)
 
-        self.export_btn = ctk.CTkButton(self.sidebar_frame, text="Export to .csv", command=self.export_csv)
+        self.export_btn = ctk.CTkButton(self.sidebar_frame, text="Export to .csv", command=self.export_csv, state="disabled")
         self.export_btn.grid(row=2, column=0, padx=20, pady=10)
 
         # Update Button
@@ -159,25 +3493,52 @@ class StatTrackerApp(ctk.CTk):
 
         self.filter_label = ctk.CTkLabel(self.sidebar_frame, text="Range:", anchor="w")
         self.filter_label.grid(row=4, column=0, padx=20, pady=(20, 0))
-        self.time_filter = ctk.CTkOptionMenu(self.sidebar_frame, values=["Last Hour", "Last 24h", "Last 30d", "All Time"], command=self.refresh_charts)
+        self.time_filter = ctk.CTkOptionMenu(self.sidebar_frame, values=list(RANGE_OPTIONS) + ["Custom"], command=self.refresh_charts)
         self.time_filter.set("All Time")
         self.time_filter.grid(row=5, column=0, padx=20, pady=10)
 
-        self.display_mode = ctk.CTkSwitch(self.sidebar_frame, text="Show Percentages", command=self.refresh_charts)
-        self.display_mode.grid(row=6, column=0, padx=20, pady=10)
+        # Custom range: either end may be left empty (open-ended)
+        self.custom_range_frame = ctk.CTkFrame(self.sidebar_frame, fg_color="transparent")
+        self.custom_range_frame.grid(row=6, column=0, padx=20, pady=0)
+        self.range_from = ctk.CTkEntry(self.custom_range_frame, width=160, placeholder_text="From (YYYY-MM-DD HH:MM)")
+        self.range_from.grid(row=0, column=0, pady=(0, 5))
+        self.range_to = ctk.CTkEntry(self.custom_range_frame, width=160, placeholder_text="To (YYYY-MM-DD HH:MM)")
+        self.range_to.grid(row=1, column=0)
+        for entry in (self.range_from, self.range_to):
+            entry.bind("<Return>", self.apply_custom_range)
+
+        # Timeline Options
+        self.timeline_bin = ctk.CTkOptionMenu(self.sidebar_frame, values=["Auto", "Hour", "Day", "Week"], command=self.refresh_charts)
+        self.timeline_bin.set("Auto")
+        self.timeline_bin.grid(row=7, column=0, padx=20, pady=(10, 5))
+        self.timeline_error = ctk.CTkOptionMenu(self.sidebar_frame, values=list(TIMELINE_ERROR_FILTERS), command=self.refresh_charts)
+        self.timeline_error.set("All Errors")
+        self.timeline_error.grid(row=8, column=0, padx=20, pady=5)
+
+        self.display_mode = ctk.CTkSwitch(self.sidebar_frame, text="Show Percentages", command=self.request_draw)
+        self.display_mode.grid(row=9, column=0, padx=20, pady=(10, 5))
+
+        # Follow mode: import as the logs grow and update the charts live
+        self.follow_switch = ctk.CTkSwitch(self.sidebar_frame, text="Follow Live", command=self.toggle_follow, state="disabled")
+        self.follow_switch.grid(row=10, column=0, padx=20, pady=(5, 10))
+        self.follow_stop = None
 
         # Status Area
-        self.status_label = ctk.CTkLabel(self.sidebar_frame, text="Checking data...", font=ctk.CTkFont(size=12), text_color="gray")
-        self.status_label.grid(row=7, column=0, padx=10, pady=(10, 0))
+        self.status_label = ctk.CTkLabel(self.sidebar_frame, text="Loading stats...", font=ctk.CTkFont(size=12), text_color="gray")
+        self.status_label.grid(row=11, column=0, padx=10, pady=(10, 0), sticky="n")
 
         # Bottom Section (Progress)
         self.progress_label = ctk.CTkLabel(self.sidebar_frame, text="", font=ctk.CTkFont(size=12))
-        self.progress_label.grid(row=9, column=0, padx=20, pady=(0, 0))
+        self.progress_label.grid(row=12, column=0, padx=20, pady=(0, 0))
         
         self.progress_bar = ctk.CTkProgressBar(self.sidebar_frame)
-        self.progress_bar.grid(row=10, column=0, padx=20, pady=(5, 20))
+        self.progress_bar.grid(row=13, column=0, padx=20, pady=(5, 20))
         self.progress_bar.set(0)
 
+        self.diagnostics_btn = ctk.CTkButton(self.sidebar_frame, text="Diagnostics", command=self.open_diagnostics, fg_color="transparent", border_width=1, state="disabled")
+        self.diagnostics_btn.grid(row=14, column=0, padx=20, pady=(0, 20))
+        self.diagnostics_window = None
+
         # --- Right Panel (Charts) ---
         self.charts_frame = ctk.CTkFrame(self)
         self.charts_frame.grid(row=0, column=1, padx=20, pady=20, sticky="nsew")
@@ -198,24 +3559,52 @@ class StatTrackerApp(ctk.CTk):
         self.error_count_label = ctk.CTkLabel(self.stats_header, text="Errors Encountered: 0", font=ctk.CTkFont(size=18, weight="bold"), text_color="#ff5555")
         self.error_count_label.grid(row=0, column=2)
 
-        # Chart Container
+        # Initial Load: header numbers from the snapshot now, charts once
+        # matplotlib is in, real data once the engine is
+        self.fig = None
+        self.chart_data = None
+        self.chart_generation = 0
+        self.pending_jobs = {}
+        if self.snapshot is not None:
+            self.chart_data = dict(self.snapshot, status=self.chart_status(self.snapshot, True, loading=True))
+            self.update_header(self.chart_data)
+        threading.Thread(target=self.load_dashboard, args=(engine,), daemon=True).start()
+
+    # --- Utilities ---
+    def check_data_exists(self):
+        return self.engine.has_data()
+
+    # --- Startup ---
+    def load_dashboard(self, engine):
+        """Background half of start-up: chart modules, then the engine."""
+        load_chart_modules()
+        self.after(0, self.build_chart_canvas)
+        try:
+            engine = engine or StatsEngine()
+            if self.snapshot is None and engine.has_data():
+                # Stats from before snapshots existed, or a merged fleet folder
+                engine.write_snapshot()
+        except Exception as e:
+            message = f"Could not load stats:\n{e}"
+            self.after(0, lambda: self.status_label.configure(text=message, text_color="#ff5555"))
+            return
+        self.after(0, self.engine_ready, engine)
+
+    def build_chart_canvas(self):
         self.fig = Figure(dpi=100)
         self.fig.patch.set_facecolor('#2b2b2b')
-        
+
         self.canvas = FigureCanvasTkAgg(self.fig, master=self.charts_frame)
         self.canvas.get_tk_widget().grid(row=1, column=0, sticky="nsew", padx=10, pady=10)
+        self.build_charts()
+        self.draw_charts()
 
-        # Initial Load
-        self.refresh_charts()
-
-    # --- Utilities ---
-    def check_data_exists(self):
-        try:
-            with open(PROCESSED_LOGS_JSON, 'r') as f:
-                data = json.load(f)
-                return len(data) > 0
-        except:
-            return False
+    def engine_ready(self, engine):
+        self.engine = engine
+        for widget in (self.import_btn, self.export_btn, self.follow_switch, self.diagnostics_btn):
+            widget.configure(state="normal")
+        self.import_btn.configure(text="Refresh Log Data" if self.check_data_exists() else "Import Log Data")
+        self.start_chart_compute()
 
     # --- Logic: Import ---
     def start_import_thread(self):
@@ -223,88 +3612,28 @@ class StatTrackerApp(ctk.CTk):
         threading.Thread(target=self.import_logs, daemon=True).start()
 
     def import_logs(self):
-        files = glob.glob(os.path.join(LOG_DIR, "*.log")) + glob.glob(os.path.join(LOG_DIR_OLD, "*.log"))
-        
-        if not os.path.exists(PROCESSED_LOGS_JSON):
-            processed_files = []
-        else:
-            with open(PROCESSED_LOGS_JSON, 'r') as f:
-                processed_files = json.load(f)
-
-        new_files = [f for f in files if os.path.basename(f) not in processed_files]
-        total_files = len(new_files)
-
-        if total_files == 0:
-            self.update_progress(1.0)
-            self.after(0, lambda: self.import_btn.configure(state="normal"))
-            return
-
-        count = 0
-        for filepath in new_files:
-            filename = os.path.basename(filepath)
-            
-            try:
-                match = re.search(r'\[(\d{2}-\d{2}-\d{4})\]', filename)
-                if match:
-                    date_str = match.group(1)
-                    file_date = datetime.strptime(date_str, "%m-%d-%Y")
-                else:
-                    file_date = datetime.fromtimestamp(os.path.getmtime(filepath))
-            except Exception:
-                 file_date = datetime.now()
-
-            date_prefix = file_date.strftime("%Y-%m-%d")
-
-            try:
-                with open(filepath, 'r', encoding='utf-8', errors='ignore') as f:
-                    lines = f.readlines()
-            except Exception:
-                processed_files.append(filename) # Skip unreadable but mark as done
-                continue
-
-            # Track seen player entries for this file to prevent duplicates
-            seen_joins = set()
-
-            for line in lines:
-                line = line.strip()
-                if not line: continue
-
-                if "[NETLOBBY] Starting session" in line:
-                    gt_match = re.search(r'gametype (0x[0-9A-F]+)', line)
-                    lvl_match = re.search(r'level (0x[0-9A-F]+)', line)
-                    if gt_match and lvl_match:
-                        self.append_to_file(LEVELS_TXT, f"{date_prefix} | {line}")
-
-                # OLD LOGIC: "Accepted 1 players..."
-                # NEW LOGIC: Look for username using standard EchoVR join syntax
-                # Typical syntax: [NETGAME] Player <NAME> joined
-                player_match = re.search(r"\[NETGAME\] User '(.*?)' participating", line)
-                if player_match:
-                     # Check if we've already seen this exact log line in this file
-                     if line in seen_joins:
-                         continue
-                     seen_joins.add(line)
-                     self.append_to_file(PLAYERS_TXT, f"{date_prefix} | {line}")
-
-                for error in KNOWN_ERRORS:
-                    if error in line:
-                         self.append_to_file(ERRORS_TXT, f"{date_prefix} | {line}")
-                         break
-
-            processed_files.append(filename)
-            count += 1
-            self.update_progress(count / total_files)
-
-        with open(PROCESSED_LOGS_JSON, 'w') as f:
-            json.dump(processed_files, f)
+        self.engine.import_logs(progress=self.update_progress)
 
         # Update button text on main thread
         self.after(0, lambda: self.import_btn.configure(state="normal", text="Refresh Log Data"))
         self.after(0, self.refresh_charts)
 
-    def append_to_file(self, filepath, text):
-        with open(filepath, 'a', encoding='utf-8') as f:
-            f.write(text + "\n")
+    # --- Logic: Follow Mode ---
+    def toggle_follow(self):
+        if self.follow_switch.get() == 1:
+            self.follow_stop = threading.Event()
+            self.import_btn.configure(state="disabled")
+            threading.Thread(target=self.follow_logs, args=(self.follow_stop,), daemon=True).start()
+        elif self.follow_stop is not None:
+            self.follow_stop.set()
+            self.follow_stop = None
+
+    def follow_logs(self, stop):
+        # Redraws are coalesced by engine.follow (at most every FOLLOW_UPDATE_SECONDS)
+        try:
+            self.engine.follow(on_update=lambda: self.after(0, self.refresh_charts), stop=stop)
+        finally:
+            self.after(0, lambda: self.import_btn.configure(state="normal", text="Refresh Log Data"))
 
     def update_progress(self, val):
         self.progress_bar.set(val)
@@ -321,6 +3650,7 @@ class StatTrackerApp(ctk.CTk):
     def check_for_updates(self):
         try:
             url = f"https://api.github.com/repos/{REPO_OWNER}/{REPO_NAME}/releases/latest"
+            import requests
             response = requests.get(url, timeout=10)
             response.raise_for_status()
             data = response.json()
@@ -368,6 +3698,7 @@ class StatTrackerApp(ctk.CTk):
             new_filename = f"StatTracker-New{APP_EXT}"
             new_filepath = os.path.join(BASE_DIR, new_filename)
             
+            import requests
             r = requests.get(url, stream=True)
             r.raise_for_status()
             
@@ -399,215 +3730,166 @@ del "%~f0"
             self.after(0, lambda: msgbox.showerror("Update Failed", f"An error occurred during update:\n{str(e)}"))
             self.after(0, lambda: self.update_btn.configure(state="normal", text="Check for Updates"))
 
+    # --- Diagnostics ---
+    def open_diagnostics(self):
+        """Timing / counter report for this session (and the last import)."""
+        if self.diagnostics_window is not None and self.diagnostics_window.winfo_exists():
+            self.diagnostics_window.focus()
+            self.refresh_diagnostics()
+            return
+        window = ctk.CTkToplevel(self)
+        window.title("Diagnostics")
+        window.geometry("720x480")
+        window.grid_columnconfigure(0, weight=1)
+        window.grid_rowconfigure(0, weight=1)
+        self.diagnostics_text = ctk.CTkTextbox(window, font=ctk.CTkFont(family="Consolas", size=12), wrap="none")
+        self.diagnostics_text.grid(row=0, column=0, sticky="nsew", padx=10, pady=10)
+        ctk.CTkButton(window, text="Refresh", command=self.refresh_diagnostics).grid(row=1, column=0, pady=(0, 10))
+        self.diagnostics_window = window
+        self.refresh_diagnostics()
+
+    def refresh_diagnostics(self):
+        self.diagnostics_text.configure(state="normal")
+        self.diagnostics_text.delete("1.0", "end")
+        self.diagnostics_text.insert("1.0", format_metrics(self.engine.metrics.snapshot()) or "No timings yet.")
+        self.diagnostics_text.configure(state="disabled")
+
     # --- Logic: Export ---
     def export_csv(self):
         try:
-            self.process_levels_csv()
-            self.process_players_csv()
-            self.process_errors_csv()
-            msgbox.showinfo("Success", f"Data exported to {STATS_DIR}")
+            since, until = self.get_filter_range()
+            out_dir = self.engine.export_csv(since=since, until=until)
+            msgbox.showinfo("Success", f"Data exported to {out_dir}")
         except Exception as e:
             msgbox.showerror("Error", str(e))
 
-    def process_levels_csv(self):
-        data = self.parse_levels(filter_range="All Time")
-        csv_path = os.path.join(STATS_DIR, "levels.csv")
-        with open(csv_path, 'w', newline='') as f:
-            writer = csv.writer(f)
-            writer.writerow(["Date", "Time", "Gametype", "Gamemode", "Level"])
-            for item in data:
-                writer.writerow([item['date'], item['time'], item['type'], item['mode'], item['level']])
-
-    def process_players_csv(self):
-        if not os.path.exists(PLAYERS_TXT): return
-        csv_path = os.path.join(STATS_DIR, "players.csv")
-        with open(PLAYERS_TXT, 'r') as f: lines = f.readlines()
-        
-        seen_entries = set() # Filter for CSV export to skip duplicates
-        
-        with open(csv_path, 'w', newline='') as f:
-            writer = csv.writer(f)
-            writer.writerow(["Date", "Time", "Player Log"])
-            for line in lines:
-                parts = line.split('|', 1)
-                if len(parts) < 2: continue
-                date_part = parts[0].strip()
-                log_part = parts[1].strip()
-                
-                # Check duplicate before writing
-                # We check the full log line content including the timestamp
-                if log_part in seen_entries:
-                    continue
-                seen_entries.add(log_part)
-
-                time_match = re.search(r'\[(\d{2}:\d{2}:\d{2})\]', log_part)
-                time_str = time_match.group(1) if time_match else "00:00:00"
-                # Export the raw log part so user can see which player joined
-                writer.writerow([date_part, time_str, log_part])
-
-    def process_errors_csv(self):
-        if not os.path.exists(ERRORS_TXT): return
-        csv_path = os.path.join(STATS_DIR, "errors.csv")
-        with open(ERRORS_TXT, 'r') as f: lines = f.readlines()
-        with open(csv_path, 'w', newline='') as f:
-            writer = csv.writer(f)
-            writer.writerow(["Date", "Time", "Error"])
-            for line in lines:
-                parts = line.split('|', 1)
-                if len(parts) < 2: continue
-                date_part = parts[0].strip()
-                log_part = parts[1].strip()
-                time_match = re.search(r'\[(\d{2}:\d{2}:\d{2})\]', log_part)
-                time_str = time_match.group(1) if time_match else "00:00:00"
-                writer.writerow([date_part, time_str, log_part])
-
     # --- Logic: Data Parsing ---
     def get_filter_delta(self):
-        selection = self.time_filter.get()
-        if selection == "Last Hour": return timedelta(hours=1)
-        if selection == "Last 24h": return timedelta(hours=24)
-        if selection == "Last 30d": return timedelta(days=30)
-        return None
+        return RANGE_OPTIONS.get(self.time_filter.get())
 
-    def is_within_time(self, date_str, time_str, delta):
-        if delta is None: return True
-        try:
-            full_dt = datetime.strptime(f"{date_str} {time_str}", "%Y-%m-%d %H:%M:%S")
-            return datetime.now() - full_dt <= delta
-        except:
-            return False
+    def get_filter_range(self):
+        """(since, until) epochs for the selected range; ValueError for a bad custom date."""
+        if self.time_filter.get() == "Custom":
+            since, until = self.range_from.get().strip(), self.range_to.get().strip()
+            return (parse_time(since) if since else None), (parse_time(until) if until else None)
+        delta = self.get_filter_delta()
+        return (range_start(delta) if delta is not None else None), None
 
-    def get_oldest_data_date(self):
-        """Find the oldest date/time across all data files."""
-        oldest_dt = None
-        
-        # Check all three data files
-        for filepath in [LEVELS_TXT, PLAYERS_TXT, ERRORS_TXT]:
-            if not os.path.exists(filepath):
-                continue
-            try:
-                with open(filepath, 'r') as f:
-                    for line in f:
-                        parts = line.split('|', 1)
-                        if len(parts) < 2: continue
-                        
-                        date_str = parts[0].strip()
-                        log_part = parts[1].strip()
-                        
-                        time_match = re.search(r'\[(\d{2}:\d{2}:\d{2})\]', log_part)
-                        time_str = time_match.group(1) if time_match else "00:00:00"
-                        
-                        try:
-                            full_dt = datetime.strptime(f"{date_str} {time_str}", "%Y-%m-%d %H:%M:%S")
-                            if oldest_dt is None or full_dt < oldest_dt:
-                                oldest_dt = full_dt
-                        except:
-                            continue
-            except:
-                continue
-        
-        return oldest_dt
+    def apply_custom_range(self, _=None):
+        self.time_filter.set("Custom")
+        self.refresh_charts()
 
-    def parse_levels(self, filter_range):
-        data = []
-        if not os.path.exists(LEVELS_TXT): return data
-        delta = self.get_filter_delta() if filter_range != "All Time" else None
-        with open(LEVELS_TXT, 'r') as f:
-            for line in f:
-                parts = line.split('|', 1)
-                if len(parts) < 2: continue
-                date_part = parts[0].strip()
-                log_part = parts[1].strip()
-                time_match = re.search(r'\[(\d{2}:\d{2}:\d{2})\]', log_part)
-                time_str = time_match.group(1) if time_match else "00:00:00"
+    # --- Logic: Visualization ---
+    # Range changes are debounced, the numbers are crunched on a worker thread and
+    # only the newest result is applied to charts that were built once at startup.
+    def refresh_charts(self, _=None):
+        self.debounce("refresh", self.start_chart_compute)
 
-                if not self.is_within_time(date_part, time_str, delta): continue
+    def request_draw(self):
+        self.debounce("draw", self.draw_charts)
 
-                gt_match = re.search(r'gametype (0x[0-9A-F]+)', log_part)
-                lvl_match = re.search(r'level (0x[0-9A-F]+)', log_part)
+    def debounce(self, key, fn):
+        job = self.pending_jobs.pop(key, None)
+        if job is not None:
+            self.after_cancel(job)
+        def run():
+            self.pending_jobs.pop(key, None)
+            fn()
+        self.pending_jobs[key] = self.after(CHART_DEBOUNCE_MS, run)
 
-                if gt_match and lvl_match:
-                    gt_hex = gt_match.group(1)
-                    lvl_hex = lvl_match.group(1)
-                    lvl_name = LEVEL_MAP.get(lvl_hex, "Unknown")
-                    type_name, mode_name = GAMETYPE_MAP.get(gt_hex, ("Unknown", "Unknown"))
-                    data.append({"date": date_part, "time": time_str, "type": type_name, "mode": mode_name, "level": lvl_name})
-        return data
+    def start_chart_compute(self):
+        if self.engine is None:
+            return # engine_ready computes the selected range
+        self.chart_generation += 1
+        generation = self.chart_generation
+        try:
+            since, until = self.get_filter_range()
+        except ValueError as e:
+            self.status_label.configure(text=str(e), text_color="#ff5555")
+            return
+        bin_name = self.timeline_bin.get().lower()
+        error = TIMELINE_ERROR_FILTERS[self.timeline_error.get()]
+        def work():
+            data = self.compute_chart_data(since, until, bin_name, error)
+            self.after(0, self.apply_chart_data, generation, data)
+        threading.Thread(target=work, daemon=True).start()
 
-    def count_players(self):
-        unique_players = set()
-        if not os.path.exists(PLAYERS_TXT): return 0
-        delta = self.get_filter_delta()
-        
-        with open(PLAYERS_TXT, 'r') as f:
-            for line in f:
-                parts = line.split('|', 1)
-                if len(parts) < 2: continue
-                date_part = parts[0].strip()
-                log_part = parts[1].strip()
-                
-                time_match = re.search(r'\[(\d{2}:\d{2}:\d{2})\]', log_part)
-                time_str = time_match.group(1) if time_match else "00:00:00"
-                
-                if self.is_within_time(date_part, time_str, delta):
-                    # Extract username from single quotes
-                    player_match = re.search(r"\[NETGAME\] User '(.*?)' participating", log_part)
-                    if player_match:
-                        username = player_match.group(1)
-                        unique_players.add(username)
-                        
-        return len(unique_players)
-
-    def parse_errors(self):
-        counts = {k: 0 for k in KNOWN_ERRORS}
-        if not os.path.exists(ERRORS_TXT): return counts
-        delta = self.get_filter_delta()
-        with open(ERRORS_TXT, 'r') as f:
-            for line in f:
-                parts = line.split('|', 1)
-                if len(parts) < 2: continue
-                date_part = parts[0].strip()
-                log_part = parts[1].strip()
-                time_match = re.search(r'\[(\d{2}:\d{2}:\d{2})\]', log_part)
-                time_str = time_match.group(1) if time_match else "00:00:00"
-                if not self.is_within_time(date_part, time_str, delta): continue
-                for err in KNOWN_ERRORS:
-                    if err in log_part:
-                        counts[err] += 1
-                        break
-        return counts
+    def apply_chart_data(self, generation, data):
+        # A newer range was picked while this one was computing
+        if generation != self.chart_generation:
+            return
+        self.chart_data = data
+        self.draw_charts()
 
-    # --- Logic: Visualization ---
-    def refresh_charts(self, _=None):
-        self.fig.clear()
-        
+    def compute_chart_data(self, since=None, until=None, bin_name="auto", error=None):
+        """Everything the dashboard shows for the given range, from the engine."""
+        data = self.engine.summary(since=since, until=until)
+        data["timeline"] = self.engine.timeline(since, until, bin_name, error)
+
+        data["status"] = self.chart_status(data, self.check_data_exists())
+        return data
+
+    def chart_status(self, data, has_data, loading=False):
+        """(text, color) for the status label."""
         # Determine Data Presence & Status Text
-        if not self.check_data_exists():
-            self.status_label.configure(text="Please import log data.", text_color="#ff5555")
+        if not has_data:
+            return ("Please import log data.", "#ff5555")
+        if data["since"] is None:
+            text = "Since: Unknown"
         else:
-            oldest_date = self.get_oldest_data_date()
-            if oldest_date is None:
-                self.status_label.configure(text="Since: Unknown", text_color="white")
-            else:
-                delta = self.get_filter_delta()
-                if delta:
-                    cutoff_time = datetime.now() - delta
-                    if cutoff_time < oldest_date:
-                        display_time = oldest_date
-                    else:
-                        display_time = cutoff_time
-                else:
-                    display_time = oldest_date
+            text = f"Since: {data['since'].strftime('%Y-%m-%d at %H:%M')}"
+        if data["until"] is not None:
+            text += f"\nUntil: {data['until'].strftime('%Y-%m-%d at %H:%M')}"
+        if loading:
+            text += "\n(last import, loading...)"
+        return (text, "white")
 
-                self.status_label.configure(text=f"Since: {display_time.strftime('%Y-%m-%d at %H:%M')}", text_color="white")
+    def build_charts(self):
+        """Create the axes and artists once; draw_charts only updates them."""
+        load_chart_modules()
+        # Layout Adjustment: Fixed sizing for 1200x700 window
+        self.fig.subplots_adjust(left=0.05, right=0.75, top=0.90, bottom=0.08, wspace=0.4, hspace=0.25)
 
-        level_data = self.parse_levels(self.time_filter.get())
-        player_count = self.count_players()
-        error_counts = self.parse_errors()
+        # Create separated GridSpecs
+        gs_top = gridspec.GridSpec(1, 4, figure=self.fig, 
+                                   width_ratios=[1, 0.5, 1, 0.5], 
+                                   bottom=0.60, top=0.93, left=0.05, right=0.75, wspace=0.4)
         
+        gs_middle = gridspec.GridSpec(1, 1, figure=self.fig, 
+                                      top=0.53, bottom=0.47, left=0.05, right=0.95)
+
+        gs_bottom = gridspec.GridSpec(1, 1, figure=self.fig, 
+                                      top=0.38, bottom=0.08, left=0.05, right=0.95)
+
+        self.levels_pie = PieChart(self.fig.add_subplot(gs_top[0, 0]), "Hosted Levels", "Levels", "No Level Data")  # Top Left Chart
+        self.errors_pie = PieChart(self.fig.add_subplot(gs_top[0, 2]), "Errors", "Errors", "No Errors")  # Top Right Chart
+        self.gametype_bar = GametypeBar(self.fig.add_subplot(gs_middle[0, 0]))  # Middle Chart (Wide)
+        self.timeline_chart = TimelineChart(self.fig.add_subplot(gs_bottom[0, 0]))  # Bottom Chart (Wide)
+
+        self.draw_requested = None
+        self.canvas.mpl_connect("draw_event", self.on_canvas_drawn)
+
+    def draw_charts(self, _=None):
+        """Update the charts from the last computed data; toggling percentages lands here without touching disk."""
+        data = self.chart_data
+        if data is None or self.fig is None:
+            return
+        if self.engine is None:
+            # Still loading: the snapshot, not worth timing
+            self.update_charts(data)
+            return
+        with self.engine.metrics.span("chart.draw"):
+            self.update_charts(data)
+
+    def update_header(self, data):
+        status_text, status_color = data["status"]
+        self.status_label.configure(text=status_text, text_color=status_color)
+
+        player_count = data["players"]
+
         # Calculate Stats
-        total_games = len(level_data)
-        total_errors = sum(error_counts.values())
+        total_games = data["games"]
+        total_errors = data["errors"]
 
         # Update Top Labels
         self.player_count_label.configure(text=f"Players Served: {player_count}")
@@ -620,97 +3902,399 @@ del "%~f0"
         else:
             self.error_count_label.configure(text_color="#ff5555") # Red
 
+    def update_charts(self, data):
+        self.update_header(data)
+        error_counts = data["error_types"]
+
         show_pct = (self.display_mode.get() == 1)
 
-        # Layout Adjustment: Fixed sizing for 1200x700 window
-        self.fig.subplots_adjust(left=0.05, right=0.75, top=0.90, bottom=0.08, wspace=0.4, hspace=0.25)
+        # --- Chart 1: Levels (Pie with Legend) ---
+        sorted_levels = sorted(data["levels"].items(), key=lambda item: item[1], reverse=True)
+        self.levels_pie.update([k for k, v in sorted_levels], [v for k, v in sorted_levels], show_pct)
 
-        # Create separated GridSpecs
-        gs_top = gridspec.GridSpec(1, 4, figure=self.fig, 
-                                   width_ratios=[1, 0.5, 1, 0.5], 
-                                   bottom=0.55, top=0.90, left=0.05, right=0.75, wspace=0.4)
-        
-        gs_bottom = gridspec.GridSpec(1, 1, figure=self.fig, 
-                                      top=0.45, bottom=0.08, left=0.05, right=0.95)
+        # --- Chart 2: Errors (Pie with Legend) ---
+        # Known signatures by legend name, then the most common mined templates
+        active_errors = {ERROR_ALIASES.get(k, k): v for k, v in error_counts.items() if v > 0}
+        templates = sorted(data["templates"].items(), key=lambda item: item[1], reverse=True)
+        active_errors.update((template_label(k), v) for k, v in templates[:TEMPLATE_CHART_SLICES])
+        other_templates = sum(v for k, v in templates[TEMPLATE_CHART_SLICES:])
+        if other_templates:
+            active_errors["~ Other templates"] = other_templates
+        sorted_errors = sorted(active_errors.items(), key=lambda item: item[1], reverse=True)
+        self.errors_pie.update([k for k, v in sorted_errors], [v for k, v in sorted_errors], show_pct)
 
-        ax_levels = self.fig.add_subplot(gs_top[0, 0])  # Top Left Chart
-        ax_errors = self.fig.add_subplot(gs_top[0, 2])  # Top Right Chart
-        ax_bar = self.fig.add_subplot(gs_bottom[0, 0])  # Bottom Chart (Wide)
+        # --- Chart 3: Gametypes (Single Stacked Bar) ---
+        self.gametype_bar.update(data["gametypes"], show_pct)
 
-        # --- Helper for Labels ---
-        def get_label(val, total):
-            if total == 0: return ""
-            return f"{val}" if not show_pct else f"{val/total:.1%}"
+        # --- Chart 4: Games / Players / Errors over Time ---
+        self.timeline_chart.update(data["timeline"], self.timeline_error.get())
 
-        # --- Chart 1: Levels (Pie with Legend) ---
-        level_counts = {}
-        for x in level_data:
-            level_counts[x['level']] = level_counts.get(x['level'], 0) + 1
-        
-        if level_counts:
-            sorted_levels = sorted(level_counts.items(), key=lambda item: item[1], reverse=True)
-            labels = [k for k, v in sorted_levels]
-            values = [v for k, v in sorted_levels]
-            total = sum(values)
-            
-            legend_labels = [f"{l} - {get_label(v, total)}" for l, v in zip(labels, values)]
-            wedges, _ = ax_levels.pie(values, startangle=90)
-            
-            ax_levels.legend(legend_labels, title="Levels", loc="center left", bbox_to_anchor=(1.05, 0.5), borderaxespad=0, fontsize=8)
-            ax_levels.set_title("Hosted Levels", color="white")
-        else:
-            ax_levels.text(0.5, 0.5, "No Level Data", ha='center', color="white")
-            ax_levels.axis('off')
+        self.draw_requested = time.perf_counter()
+        self.canvas.draw_idle()
 
-        # --- Chart 2: Errors (Pie with Legend) ---
-        active_errors = {k: v for k, v in error_counts.items() if v > 0}
-        if active_errors:
-            sorted_errors = sorted(active_errors.items(), key=lambda item: item[1], reverse=True)
-            labels_raw = [k for k, v in sorted_errors]
-            labels = [ERROR_ALIASES.get(lbl, lbl) for lbl in labels_raw]
-            values = [v for k, v in sorted_errors]
-            total = sum(values)
-
-            legend_labels = [f"{l} - {get_label(v, total)}" for l, v in zip(labels, values)]
-            wedges, _ = ax_errors.pie(values, startangle=90)
-
-            ax_errors.legend(legend_labels, title="Errors", loc="center left", bbox_to_anchor=(1.05, 0.5), borderaxespad=0, fontsize=8)
-            ax_errors.set_title("Errors", color="white")
+    def on_canvas_drawn(self, _event):
+        # draw_idle() renders later, when Tk is idle; time from request to pixels
+        if self.draw_requested is not None and self.engine is not None:
+            self.engine.metrics.add_time("chart.render", time.perf_counter() - self.draw_requested)
+            self.draw_requested = None
+
+def chart_label(val, total, show_pct):
+    if total == 0: return ""
+    return f"{val}" if not show_pct else f"{val/total:.1%}"
+
+class PieChart:
+    """A pie with a legend to its right, drawn like Axes.pie but updated in place."""
+    def __init__(self, ax, title, legend_title, empty_text):
+        self.ax = ax
+        self.legend_title = legend_title
+        ax.set(frame_on=False, xticks=[], yticks=[], xlim=(-1.25, 1.25), ylim=(-1.25, 1.25))
+        ax.set_aspect("equal")
+        self.title = ax.set_title(title, color="white")
+        self.empty = ax.text(0, 0, empty_text, ha='center', color="white")
+        self.wedges = []
+        self.legend = None
+
+    def update(self, labels, values, show_pct):
+        total = sum(values)
+        # Same geometry as pie(startangle=90): counter-clockwise from the top
+        theta = 90.0
+        for i, val in enumerate(values):
+            end = theta + 360.0 * val / total
+            if i < len(self.wedges):
+                self.wedges[i].set_theta1(theta)
+                self.wedges[i].set_theta2(end)
+            else:
+                self.wedges.append(self.ax.add_patch(Wedge((0, 0), 1, theta, end, facecolor=f"C{i}", clip_on=False)))
+            theta = end
+        for wedge in self.wedges[len(values):]:
+            wedge.remove()
+        del self.wedges[len(values):]
+
+        legend_labels = [f"{l} - {chart_label(v, total, show_pct)}" for l, v in zip(labels, values)]
+        if self.legend is not None and len(self.legend.texts) == len(legend_labels):
+            for text, label in zip(self.legend.texts, legend_labels):
+                text.set_text(label)
         else:
-            ax_errors.text(0.5, 0.5, "No Errors", ha='center', color="white")
-            ax_errors.axis('off')
+            if self.legend is not None:
+                self.legend.remove()
+            self.legend = None
+            if values:
+                self.legend = self.ax.legend(self.wedges, legend_labels, title=self.legend_title, loc="center left", bbox_to_anchor=(1.05, 0.5), borderaxespad=0, fontsize=8)
 
-        # --- Chart 3: Gametypes (Single Stacked Bar) ---
-        type_counts = {"Public": 0, "Private": 0}
-        for x in level_data:
-            if x['type'] in type_counts:
-                type_counts[x['type']] += 1
-        
-        total_gt = sum(type_counts.values())
+        self.title.set_visible(bool(values))
+        self.empty.set_visible(not values)
+
+class GametypeBar:
+    """The single stacked Public / Private bar."""
+    def __init__(self, ax):
+        self.ax = ax
+        self.public = ax.barh([0], [0], color='#1f77b4', height=0.6, label='Public')[0]
+        self.private = ax.barh([0], [0], color='#ff7f0e', height=0.6, label='Private')[0]
+        self.public_text = ax.text(0, 0, "", ha='center', va='center', color='white', fontweight='bold')
+        self.private_text = ax.text(0, 0, "", ha='center', va='center', color='white', fontweight='bold')
+        self.title = ax.set_title("Gametypes (Public / Private)", color="white")
+        self.empty = ax.text(0.5, 0.5, "No Gametype Data", ha='center', color="white", transform=ax.transAxes)
+        ax.set_ylim(-0.33, 0.33)
+        ax.margins(x=0)
+        ax.axis('off')
+
+    def update(self, type_counts, show_pct):
+        pub_val = type_counts["Public"]
+        priv_val = type_counts["Private"]
+        total_gt = pub_val + priv_val
+
+        self.public.set_width(pub_val)
+        self.private.set_x(pub_val)
+        self.private.set_width(priv_val)
+        self.public_text.set_position((pub_val / 2, 0))
+        self.public_text.set_text(f"Public: {chart_label(pub_val, total_gt, show_pct)}" if pub_val > 0 else "")
+        self.private_text.set_position((pub_val + priv_val / 2, 0))
+        self.private_text.set_text(f"Private: {chart_label(priv_val, total_gt, show_pct)}" if priv_val > 0 else "")
         if total_gt > 0:
-            pub_val = type_counts["Public"]
-            priv_val = type_counts["Private"]
-            
-            ax_bar.barh([0], [pub_val], color='#1f77b4', height=0.6, label='Public')
-            ax_bar.barh([0], [priv_val], left=[pub_val], color='#ff7f0e', height=0.6, label='Private')
-            
-            if pub_val > 0:
-                ax_bar.text(pub_val/2, 0, f"Public: {get_label(pub_val, total_gt)}", 
-                            ha='center', va='center', color='white', fontweight='bold')
-            if priv_val > 0:
-                ax_bar.text(pub_val + priv_val/2, 0, f"Private: {get_label(priv_val, total_gt)}", 
-                            ha='center', va='center', color='white', fontweight='bold')
-
-            ax_bar.set_xlim(0, total_gt)
-            ax_bar.margins(x=0)
-            ax_bar.axis('off')
-            ax_bar.set_title("Gametypes (Public / Private)", color="white")
-        else:
-            ax_bar.text(0.5, 0.5, "No Gametype Data", ha='center', color="white")
-            ax_bar.axis('off')
+            self.ax.set_xlim(0, total_gt)
+
+        for artist in (self.public, self.private, self.public_text, self.private_text, self.title):
+            artist.set_visible(total_gt > 0)
+        self.empty.set_visible(total_gt == 0)
+
+class TimelineChart:
+    """Games hosted, unique players and errors per bin, as steps over time."""
+    def __init__(self, ax):
+        self.ax = ax
+        ax.set_facecolor('#2b2b2b')
+        self.games = ax.plot([], [], color='#1f77b4', drawstyle='steps-post', label='Games')[0]
+        self.players = ax.plot([], [], color='#2cc985', drawstyle='steps-post', label='Players')[0]
+        self.errors = ax.plot([], [], color='#ff5555', drawstyle='steps-post', label='Errors')[0]
+        self.legend = ax.legend(loc='upper left', fontsize=8, facecolor='#2b2b2b', labelcolor='white', edgecolor='gray')
+        self.title = ax.set_title("", color="white", fontsize=10)
+        self.empty = ax.text(0.5, 0.5, "No Timeline Data", ha='center', color="white", transform=ax.transAxes)
+        ax.xaxis_date()
+        ax.tick_params(colors='white', labelsize=8)
+        for spine in ax.spines.values():
+            spine.set_color('gray')
+
+    def update(self, timeline, error_label):
+        starts = timeline["starts"]
+        has_data = bool(starts)
+        if has_data:
+            # One extra point closes the last step at the end of its bin
+            width = TIMELINE_BINS[timeline["bin"]]
+            xs = mdates.date2num([from_epoch(t) for t in starts + [starts[-1] + width]])
+            for line, key in ((self.games, "games"), (self.players, "players"), (self.errors, "errors")):
+                values = timeline[key]
+                line.set_data(xs, values + values[-1:])
+            self.ax.relim()
+            self.ax.autoscale_view()
+            self.ax.set_ylim(bottom=0)
+            self.title.set_text(f"Per {timeline['bin'].title()}")
+        self.legend.texts[2].set_text("Errors" if error_label == "All Errors" else error_label)
+        for artist in (self.games, self.players, self.errors, self.legend, self.title):
+            artist.set_visible(has_data)
+        self.empty.set_visible(not has_data)
 
-        self.canvas.draw()
+# --- Command Line ---
+def print_summary(summary, range_text):
+    since = summary["since"].strftime('%Y-%m-%d %H:%M') if summary["since"] else "Unknown"
+    until = f" until {summary['until'].strftime('%Y-%m-%d %H:%M')}" if summary["until"] else ""
+    print(f"Range: {range_text} (since {since}{until})")
+    print(f"Players Served: {summary['players']}")
+    print(f"Games Hosted: {summary['games']}")
+    print(f"Errors Encountered: {summary['errors']}")
+    if summary["peak_players"] is None:
+        print("Peak Players Online: n/a (no sessions kept for this range)")
+        print("Average Match Length: n/a")
+    else:
+        kept = f", since {summary['sessions_since'].strftime('%Y-%m-%d %H:%M')}" if summary["sessions_since"] else ""
+        print(f"Peak Players Online: {summary['peak_players']} (average {summary['avg_players']}{kept})")
+        print(f"Average Match Length: {summary['avg_match_minutes']} min")
+    for title, counts in (("Levels", summary["levels"]), ("Gametypes", summary["gametypes"]), ("Modes", summary["modes"])):
+        if counts:
+            print(f"\n{title}:")
+            for name, n in sorted(counts.items(), key=lambda item: item[1], reverse=True):
+                print(f"  {name}: {n}")
+    active_errors = {k: v for k, v in summary["error_types"].items() if v > 0}
+    if active_errors:
+        print("\nErrors:")
+        for err, n in sorted(active_errors.items(), key=lambda item: item[1], reverse=True):
+            print(f"  {ERROR_ALIASES.get(err, err)}: {n}")
+    if summary["templates"]:
+        print("\nError Templates:")
+        for template, n in sorted(summary["templates"].items(), key=lambda item: item[1], reverse=True):
+            print(f"  {template}: {n}")
+
+def print_templates(templates):
+    print(f"{'Count':>8}  {'First Seen':<17}{'Last Seen':<17}Template")
+    for template in templates:
+        first = from_epoch(template["first"]).strftime('%Y-%m-%d %H:%M') if template["first"] is not None else "-"
+        last = from_epoch(template["last"]).strftime('%Y-%m-%d %H:%M') if template["last"] is not None else "-"
+        print(f"{template['count']:>8}  {first:<17}{last:<17}{template['template']}")
+
+def summary_json(summary, range_text):
+    for key in ("since", "until", "sessions_since"):
+        summary[key] = summary[key].isoformat() if summary[key] else None
+    summary["range"] = range_text
+    return summary
+
+def print_timeline(timeline):
+    print(f"{'Start':<17}{'Games':>8}{'Players':>9}{'Errors':>8}")
+    for start, games, players, errors in zip(timeline["starts"], timeline["games"], timeline["players"], timeline["errors"]):
+        print(f"{from_epoch(start).strftime('%Y-%m-%d %H:%M'):<17}{games:>8}{players:>9}{errors:>8}")
+
+def add_range_arguments(cmd):
+    cmd.add_argument("--range", default="all", help="1h, 24h, 30d, any <n>m/h/d/w, or all (default)")
+    cmd.add_argument("--since", help="start date/time (ISO, e.g. 2024-05-01 or 2024-05-01T18:30); overrides --range")
+    cmd.add_argument("--until", help="end date/time (ISO, exclusive)")
+
+def parse_range_arguments(args):
+    """(since, until) epochs from --range / --since / --until."""
+    delta = parse_range(args.range)
+    since = parse_time(args.since) if args.since else (range_start(delta) if delta is not None else None)
+    until = parse_time(args.until) if args.until else None
+    return since, until
+
+def run_gui(engine=None):
+    if ctk is None or importlib.util.find_spec("matplotlib") is None:
+        print("The dashboard needs customtkinter, matplotlib and requests installed. "
+              "Use the import / summary / export commands on headless hosts.", file=sys.stderr)
+        return 1
+    ctk.set_appearance_mode("Dark")
+    ctk.set_default_color_theme(CTK_THEME)
+    app = StatTrackerApp(engine)
+    app.mainloop()
+    return 0
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="EchoVR server stat tracker. Run without a command to open the dashboard.")
+    parser.add_argument("--base-dir", default=BASE_DIR, help="ready-at-dawn-echo-arena folder to read logs from (default: next to this program)")
+    parser.add_argument("--stats-dir", help="stats folder to use (default: <base-dir>/dashboard/stats)")
+    parser.add_argument("--host-id", help="name this host's shard (default: the machine's hostname)")
+    commands = parser.add_subparsers(dest="command")
+
+    import_cmd = commands.add_parser("import", help="import new log data")
+    import_cmd.add_argument("--workers", type=int, default=IMPORT_WORKERS, help="worker processes (default: %(default)s)")
+    import_cmd.add_argument("--templates", action="store_true", help="also mine templates from unrecognised warning/error lines")
+
+    summary_cmd = commands.add_parser("summary", help="print the dashboard numbers for a range")
+    add_range_arguments(summary_cmd)
+    summary_cmd.add_argument("--json", action="store_true", help="print JSON instead of text")
+
+    timeline_cmd = commands.add_parser("timeline", help="print games, unique players and errors per hour/day/week")
+    add_range_arguments(timeline_cmd)
+    timeline_cmd.add_argument("--bin", choices=["auto"] + list(TIMELINE_BINS), default="auto", help="bin width (default: %(default)s)")
+    timeline_cmd.add_argument("--error", help="only count errors matching this (part of the message or its legend name)")
+    timeline_cmd.add_argument("--json", action="store_true", help="print JSON instead of a table")
+
+    follow_cmd = commands.add_parser("follow", help="keep importing as the logs grow and print the numbers for a range")
+    follow_cmd.add_argument("--range", default="24h", help="range to print, like summary (default: %(default)s)")
+    follow_cmd.add_argument("--interval", type=float, default=FOLLOW_UPDATE_SECONDS, help="print at most this often, in seconds (default: %(default)s)")
+    follow_cmd.add_argument("--json", action="store_true", help="print a JSON line per update")
+    follow_cmd.add_argument("--templates", action="store_true", help="also mine templates from unrecognised warning/error lines")
+
+    templates_cmd = commands.add_parser("templates", help="list the templates mined from unrecognised warning/error lines")
+    templates_cmd.add_argument("--json", action="store_true", help="print JSON instead of a table")
+
+    export_cmd = commands.add_parser("export", help="export levels/players/errors CSV files")
+    export_cmd.add_argument("--out", help="output folder (default: the stats folder)")
+    add_range_arguments(export_cmd)
+    export_cmd.add_argument("--gzip", action="store_true", help="write .csv.gz files")
+
+    metrics_cmd = commands.add_parser("metrics", help="show timings and per-file stats saved by the last import/export")
+    metrics_cmd.add_argument("--prometheus", action="store_true", help="print the Prometheus text format")
+    metrics_cmd.add_argument("--json", action="store_true", help="print the raw JSON")
+
+    query_cmd = commands.add_parser("query", help="print matching levels/players/errors/matches/visits rows")
+    query_cmd.add_argument("table", choices=list(STORE_TABLES))
+    query_cmd.add_argument("--player", help="exact player name")
+    query_cmd.add_argument("--level", help="level name or hex ID")
+    query_cmd.add_argument("--gametype", help="Public, Private or a gametype hex ID")
+    query_cmd.add_argument("--mode", help="Lobby, Arena or Combat")
+    query_cmd.add_argument("--error", help="part of an error signature or its legend name")
+    add_range_arguments(query_cmd)
+    query_cmd.add_argument("--limit", type=int, help="stop after this many rows")
+    query_cmd.add_argument("--newest", action="store_true", help="newest rows first")
+    query_cmd.add_argument("--format", choices=("json", "csv"), default="json", help="JSON Lines (default) or CSV")
+
+    compact_cmd = commands.add_parser("compact", help="merge old day segments into months and optionally drop old raw events")
+    compact_cmd.add_argument("--keep-days", type=int, default=RAW_RETENTION_DAYS, help="drop raw events older than this many days; summary counts keep them (default: keep everything)")
+    compact_cmd.add_argument("--months-after", type=int, default=COMPACT_AFTER_DAYS, help="merge the days of months that ended more than this many days ago (default: %(default)s)")
+
+    pack_cmd = commands.add_parser("pack", help="zip this host's stats into a shard for merging")
+    pack_cmd.add_argument("--out", help="shard file to write (default: <host-id>.zip in the current folder)")
+
+    merge_cmd = commands.add_parser("merge", help="combine shards from several hosts into one stats folder")
+    merge_cmd.add_argument("shards", nargs="+", help="shard .zip files or stats folders")
+    merge_cmd.add_argument("--out", required=True, help="folder for the merged stats (its previous stats are replaced)")
+
+    args = parser.parse_args(argv)
+    if args.command == "merge":
+        hosts = merge_shards(args.shards, args.out)
+        print(f"Merged {len(hosts)} shard(s) ({', '.join(hosts)}) into {args.out}")
+        return 0
+    if args.command is None and args.base_dir == BASE_DIR and not (args.stats_dir or args.host_id):
+        return run_gui()
+
+    engine = StatsEngine(args.base_dir, args.stats_dir)
+    if args.host_id:
+        engine.set_host_id(args.host_id)
+    if getattr(args, "templates", False):
+        engine.mine_templates = True
+    if args.command is None:
+        return run_gui(engine)
+    if args.command == "import":
+        files = engine.import_logs(workers=args.workers)
+        print(f"Imported {files} log file(s) into {engine.stats_dir}")
+    elif args.command == "summary":
+        try:
+            since, until = parse_range_arguments(args)
+        except ValueError as e:
+            parser.error(str(e))
+        summary = engine.summary(since=since, until=until)
+        if args.json:
+            print(json.dumps(summary_json(summary, "custom" if args.since or args.until else args.range), indent=2))
+        else:
+            print_summary(summary, "custom" if args.since or args.until else args.range)
+    elif args.command == "follow":
+        try:
+            delta = parse_range(args.range)
+        except ValueError as e:
+            parser.error(str(e))
+        def show():
+            summary = engine.summary(delta)
+            if args.json:
+                print(json.dumps(summary_json(summary, args.range)), flush=True)
+            else:
+                print(f"[{datetime.now().strftime('%H:%M:%S')}] {args.range}: {summary['players']} players, "
+                      f"{summary['games']} games, {summary['errors']} errors, "
+                      f"peak {summary['peak_players'] if summary['peak_players'] is not None else 'n/a'} online", flush=True)
+        print(f"Following {', '.join(engine.log_dirs)} (Ctrl+C to stop)", file=sys.stderr)
+        try:
+            engine.follow(on_update=show, interval=args.interval)
+        except KeyboardInterrupt:
+            pass
+    elif args.command == "timeline":
+        try:
+            since, until = parse_range_arguments(args)
+            timeline = engine.timeline(since, until, args.bin, args.error)
+        except ValueError as e:
+            parser.error(str(e))
+        if args.json:
+            timeline["starts"] = [from_epoch(start).isoformat() for start in timeline["starts"]]
+            print(json.dumps(timeline, indent=2))
+        else:
+            print_timeline(timeline)
+    elif args.command == "export":
+        try:
+            since, until = parse_range_arguments(args)
+        except ValueError as e:
+            parser.error(str(e))
+        print(f"Data exported to {engine.export_csv(args.out, compress=args.gzip, since=since, until=until)}")
+    elif args.command == "templates":
+        templates = engine.template_list()
+        if args.json:
+            for template in templates:
+                for key in ("first", "last"):
+                    template[key] = from_epoch(template[key]).isoformat() if template[key] is not None else None
+            print(json.dumps(templates, indent=2))
+        elif not templates:
+            print("No templates yet; they are mined while importing.", file=sys.stderr)
+        else:
+            print_templates(templates)
+    elif args.command == "metrics":
+        path = os.path.join(engine.stats_dir, METRICS_JSON)
+        if not os.path.exists(path):
+            print("No metrics yet; run an import first.", file=sys.stderr)
+            return 1
+        with open(path, 'r', encoding='utf-8') as f:
+            snapshot = json.load(f)
+        if args.prometheus:
+            print(prometheus_text(snapshot), end="")
+        elif args.json:
+            print(json.dumps(snapshot, indent=2))
+        else:
+            print(format_metrics(snapshot))
+    elif args.command == "query":
+        try:
+            since, until = parse_range_arguments(args)
+            filters = {name: getattr(args, name) for name in QUERY_FILTERS}
+            rows = engine.query(args.table, since, until, limit=args.limit, newest_first=args.newest, **filters)
+            if args.format == "csv":
+                writer = csv.DictWriter(sys.stdout, engine.query_fields(args.table), lineterminator="\n")
+                writer.writeheader()
+                writer.writerows(rows)
+            else:
+                for row in rows:
+                    sys.stdout.write(json.dumps(row) + "\n")
+        except ValueError as e:
+            parser.error(str(e))
+    elif args.command == "compact":
+        result = engine.compact(args.keep_days, args.months_after)
+        print(f"Merged {result['merged']} day segment(s) into months, dropped {result['dropped']} raw event(s)")
+    elif args.command == "pack":
+        out = args.out or f"{engine.shard['host_id']}.zip"
+        print(f"Shard written to {pack_shard(engine.stats_dir, out)}")
+    return 0
 
 if __name__ == "__main__":
-    app = StatTrackerApp()
-    app.mainloop()
\ No newline at end of file
+    # Needed for the import worker processes when running as a frozen exe
+    multiprocessing.freeze_support()
+    sys.exit(main())
\ No newline at end of file
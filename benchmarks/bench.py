@@ -0,0 +1,187 @@
+"""Benchmark import, dashboard queries and export on synthetic logs.
+
+Generates a log tree (see generate_logs.py), imports it into a fresh stats
+folder and writes the measurements as JSON, so two versions can be compared:
+
+    python benchmarks/bench.py --days 30 --lines-per-day 200000 --out before.json
+    python benchmarks/bench.py --days 30 --lines-per-day 200000 --out after.json --compare before.json
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import statistics
+import subprocess
+import tempfile
+
+from generate_logs import TRACKER_FILE, generate
+
+def peak_rss_mb():
+    """Peak resident memory of this process and of finished child processes (import workers)."""
+    try:
+        import resource
+    except ImportError:
+        resource = None
+    if resource is not None:
+        # ru_maxrss is KiB on Linux, bytes on macOS
+        scale = 1 if sys.platform == "darwin" else 1024
+        return {
+            "self": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale / 1e6,
+            "children": resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * scale / 1e6,
+        }
+    if sys.platform == "win32":
+        import ctypes
+        from ctypes import wintypes
+
+        class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+            _fields_ = [
+                ("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD),
+                ("PeakWorkingSetSize", ctypes.c_size_t), ("WorkingSetSize", ctypes.c_size_t),
+                ("QuotaPeakPagedPoolUsage", ctypes.c_size_t), ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t), ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                ("PagefileUsage", ctypes.c_size_t), ("PeakPagefileUsage", ctypes.c_size_t),
+            ]
+        counters = PROCESS_MEMORY_COUNTERS()
+        counters.cb = ctypes.sizeof(counters)
+        process = ctypes.windll.kernel32.GetCurrentProcess()
+        if ctypes.windll.psapi.GetProcessMemoryInfo(process, ctypes.byref(counters), counters.cb):
+            return {"self": counters.PeakWorkingSetSize / 1e6, "children": None}
+    return {"self": None, "children": None}
+
+def git_revision(path):
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=os.path.dirname(path),
+                             capture_output=True, text=True, timeout=10)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return out.stdout.strip() or None
+
+def import_tracker(path, work_dir):
+    # Imported under a plain module name from a folder on sys.path, so import
+    # worker processes can find it when they are spawned (Windows, macOS)
+    shutil.copy(path, os.path.join(work_dir, "stat_tracker.py"))
+    sys.path.insert(0, work_dir)
+    import stat_tracker
+    return stat_tracker
+
+def time_queries(tracker, engine, repeat):
+    results = {}
+    for label, delta in tracker.RANGE_OPTIONS.items():
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            engine.summary(delta)
+            timings.append((time.perf_counter() - start) * 1000)
+        results[label] = {"first_ms": timings[0], "median_ms": statistics.median(timings)}
+    return results
+
+def run(args, work_dir):
+    base_dir = os.path.join(work_dir, "base")
+    start = time.perf_counter()
+    log_stats = generate(base_dir, args.days, args.lines_per_day, args.players, args.seed, compress_old=args.compress_old)
+    generate_s = time.perf_counter() - start
+
+    tracker = import_tracker(args.tracker, work_dir)
+    engine = tracker.StatsEngine(base_dir)
+    start = time.perf_counter()
+    files = engine.import_logs(workers=args.workers)
+    import_s = time.perf_counter() - start
+
+    # A second import with nothing new measures the "already up to date" check
+    start = time.perf_counter()
+    engine.import_logs(workers=args.workers)
+    reimport_s = time.perf_counter() - start
+
+    # Cold: a new engine loads everything from disk on its first summary
+    start = time.perf_counter()
+    cold = tracker.StatsEngine(base_dir)
+    cold.summary(None)
+    cold_load_s = time.perf_counter() - start
+    queries = time_queries(tracker, cold, args.repeat)
+
+    start = time.perf_counter()
+    cold.export_csv(os.path.join(work_dir, "export"))
+    export_s = time.perf_counter() - start
+
+    return {
+        "version": tracker.CURRENT_VERSION,
+        "revision": git_revision(args.tracker),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "params": {
+            "days": args.days, "lines_per_day": args.lines_per_day, "players": args.players,
+            "seed": args.seed, "workers": args.workers, "compress_old": args.compress_old,
+        },
+        "logs": dict(log_stats, generate_s=generate_s),
+        "import": {
+            "files": files,
+            "seconds": import_s,
+            "lines_per_s": log_stats["lines"] / import_s,
+            "mb_per_s": log_stats["bytes"] / 1e6 / import_s,
+            "up_to_date_s": reimport_s,
+        },
+        "cold_load_s": cold_load_s,
+        "queries": queries,
+        "export_s": export_s,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+def compare(result, baseline):
+    """Print this run next to a previous result file."""
+    rows = [
+        ("import lines/s", result["import"]["lines_per_s"], baseline["import"]["lines_per_s"]),
+        ("import MB/s", result["import"]["mb_per_s"], baseline["import"]["mb_per_s"]),
+        ("cold load s", result["cold_load_s"], baseline["cold_load_s"]),
+        ("export s", result["export_s"], baseline["export_s"]),
+    ]
+    for label, timing in result["queries"].items():
+        if label in baseline["queries"]:
+            rows.append((f"summary {label} ms", timing["median_ms"], baseline["queries"][label]["median_ms"]))
+    print(f"\n{'':24}{'this run':>14}{'baseline':>14}{'ratio':>8}")
+    for name, now, before in rows:
+        ratio = now / before if before else float("nan")
+        print(f"{name:24}{now:14.2f}{before:14.2f}{ratio:8.2f}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the stat tracker on synthetic logs.")
+    parser.add_argument("--tracker", default=os.path.abspath(TRACKER_FILE), help="tracker script to benchmark (default: this checkout)")
+    parser.add_argument("--days", type=int, default=7, help="default: %(default)s")
+    parser.add_argument("--lines-per-day", type=int, default=100000, help="default: %(default)s")
+    parser.add_argument("--players", type=int, default=5000, help="default: %(default)s")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--compress-old", action="store_true", help="gzip the logs in old/")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="import worker processes (default: %(default)s)")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per summary query (default: %(default)s)")
+    parser.add_argument("--out", default="bench.json", help="result file (default: %(default)s)")
+    parser.add_argument("--compare", help="earlier result file to compare against")
+    parser.add_argument("--work-dir", help="keep logs and stats here instead of a temporary folder")
+    args = parser.parse_args(argv)
+
+    if args.work_dir:
+        os.makedirs(args.work_dir, exist_ok=True)
+        result = run(args, args.work_dir)
+    else:
+        with tempfile.TemporaryDirectory() as work_dir:
+            result = run(args, work_dir)
+
+    with open(args.out, 'w', encoding='utf-8') as f:
+        json.dump(result, f, indent=2)
+    imp = result["import"]
+    print(f"Imported {result['logs']['lines']} lines in {imp['seconds']:.2f}s "
+          f"({imp['lines_per_s']:,.0f} lines/s, {imp['mb_per_s']:.1f} MB/s)")
+    for label, timing in result["queries"].items():
+        print(f"  summary {label}: {timing['median_ms']:.1f} ms")
+    rss = result["peak_rss_mb"]["self"]
+    print(f"Export: {result['export_s']:.2f}s, peak RSS: " + (f"{rss:.0f} MB" if rss is not None else "unknown"))
+    print(f"Results written to {args.out}")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            compare(result, json.load(f))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
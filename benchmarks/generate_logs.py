@@ -0,0 +1,102 @@
+"""Write a synthetic ready-at-dawn-echo-arena log tree for benchmarking.
+
+The logs look like real r14 server logs as far as the tracker is concerned:
+session starts with the level / gametype IDs from LEVEL_MAP and GAMETYPE_MAP,
+"User '...' participating" joins, KNOWN_ERRORS lines and plenty of filler.
+
+    python benchmarks/generate_logs.py C:\\bench-base --days 30 --lines-per-day 200000
+"""
+import os
+import sys
+import gzip
+import random
+import argparse
+import importlib.util
+from datetime import date, timedelta
+
+TRACKER_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "EchoVR-Server-Stat-Tracker.py")
+
+# Rough share of each kind of line; the rest is filler
+SESSION_SHARE = 0.01
+JOIN_SHARE = 0.04
+ERROR_SHARE = 0.005
+
+FILLER = [
+    "[NETGAME] Sending heartbeat to game service",
+    "[NETGAME] Ping to relay {n}ms",
+    "[GAMESERVER] Tick time {n}us",
+    "[R14NETSERVER] Sent {n} bytes to peer",
+    "[AUDIO] Voice channel {n} opened",
+    "[NETLOBBY] Lobby state sync {n}",
+    "[SOCIAL] Presence update for {n} users",
+]
+
+def load_tracker(path=TRACKER_FILE):
+    spec = importlib.util.spec_from_file_location("stat_tracker", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def log_lines(tracker, rng, day, lines, players):
+    """Yield one day's log lines in time order."""
+    levels = list(tracker.LEVEL_MAP)
+    gametypes = list(tracker.GAMETYPE_MAP)
+    stamp = day.strftime("%m-%d-%Y")
+    for i in range(lines):
+        second = i * 86400 // lines
+        prefix = f"[{stamp}] [{second // 3600:02d}:{second // 60 % 60:02d}:{second % 60:02d}]: "
+        k = rng.random()
+        if k < SESSION_SHARE:
+            body = f"[NETLOBBY] Starting session gametype {rng.choice(gametypes)} level {rng.choice(levels)} with {rng.randint(1, 16)} slots"
+        elif k < SESSION_SHARE + JOIN_SHARE:
+            body = f"[NETGAME] User 'Player{rng.randrange(players):05d}' participating in match"
+        elif k < SESSION_SHARE + JOIN_SHARE + ERROR_SHARE:
+            body = f"{rng.choice(tracker.KNOWN_ERRORS)} (code {rng.randint(0, 999)})"
+        else:
+            body = rng.choice(FILLER).format(n=rng.randint(0, 100000))
+        yield prefix + body + "\n"
+
+def generate(base_dir, days=7, lines_per_day=100000, players=5000, seed=1, old_after=1, compress_old=False, tracker=None):
+    """Write <days> daily logs ending today; returns {"files", "lines", "bytes"} (bytes uncompressed)."""
+    tracker = tracker or load_tracker()
+    rng = random.Random(seed)
+    log_dir = os.path.join(base_dir, "_local", "r14logs")
+    old_dir = os.path.join(log_dir, "old")
+    os.makedirs(old_dir, exist_ok=True)
+
+    stats = {"files": 0, "lines": 0, "bytes": 0}
+    today = date.today()
+    for age in range(days):
+        day = today - timedelta(days=age)
+        name = f"r14[{day.strftime('%m-%d-%Y')}]-{rng.randrange(1 << 16):05d}.log"
+        is_old = age >= old_after
+        path = os.path.join(old_dir if is_old else log_dir, name)
+        if is_old and compress_old:
+            f = gzip.open(path + ".gz", 'wt', encoding='utf-8', newline='')
+        else:
+            f = open(path, 'w', encoding='utf-8', newline='')
+        with f:
+            for line in log_lines(tracker, rng, day, lines_per_day, players):
+                f.write(line)
+                stats["bytes"] += len(line)
+        stats["files"] += 1
+        stats["lines"] += lines_per_day
+    return stats
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write a synthetic r14logs tree for benchmarking.")
+    parser.add_argument("base_dir", help="folder to create _local/r14logs in")
+    parser.add_argument("--days", type=int, default=7, help="one log per day, ending today (default: %(default)s)")
+    parser.add_argument("--lines-per-day", type=int, default=100000, help="default: %(default)s")
+    parser.add_argument("--players", type=int, default=5000, help="distinct player names (default: %(default)s)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--old-after", type=int, default=1, help="logs this many days old or more go in old/ (default: %(default)s)")
+    parser.add_argument("--compress-old", action="store_true", help="gzip the logs in old/")
+    args = parser.parse_args(argv)
+
+    stats = generate(args.base_dir, args.days, args.lines_per_day, args.players, args.seed, args.old_after, args.compress_old)
+    print(f"Wrote {stats['files']} log file(s), {stats['lines']} lines, {stats['bytes'] / 1e6:.1f} MB to {args.base_dir}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,91 @@
+import os
+import re
+import sys
+import shutil
+import importlib.util
+from collections import Counter
+from datetime import datetime
+
+import pytest
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+TRACKER_FILE = os.path.join(ROOT, "EchoVR-Server-Stat-Tracker.py")
+
+def load_tracker():
+    # Registered under a plain name so import workers and pickling can find it
+    if "stat_tracker" in sys.modules:
+        return sys.modules["stat_tracker"]
+    spec = importlib.util.spec_from_file_location("stat_tracker", TRACKER_FILE)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules["stat_tracker"] = module
+    spec.loader.exec_module(module)
+    return module
+
+@pytest.fixture(scope="session")
+def tracker():
+    return load_tracker()
+
+@pytest.fixture(scope="session")
+def generate_logs():
+    """benchmarks/generate_logs.generate: daily synthetic logs ending today."""
+    sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+    from generate_logs import generate
+    return generate
+
+@pytest.fixture
+def frozen_now(tracker, monkeypatch):
+    """Pin the tracker's clock, so averages up to now compare exactly."""
+    now = datetime.now().replace(microsecond=0)
+    class Clock(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return now
+    monkeypatch.setattr(tracker, "datetime", Clock)
+    return now
+
+# --- Log helpers ---
+LINE = re.compile(r"\]: (.*)$")
+
+def log_date(name):
+    """Sort key of r14[MM-DD-YYYY]-n.log names: YYYYMM-DD."""
+    return name[10:14] + name[4:9]
+
+def newest_log(base):
+    log_dir = os.path.join(base, "_local", "r14logs")
+    return os.path.join(log_dir, max((name for name in os.listdir(log_dir) if name.endswith(".log")), key=log_date))
+
+def append_joins(base, tag, count=10):
+    """Add player joins at the end of the newest log, as a live server would."""
+    path = newest_log(base)
+    stamp = os.path.basename(path)[4:14]
+    with open(path, 'a', encoding='utf-8') as f:
+        for i in range(count):
+            f.write(f"[{stamp}] [23:59:{i:02d}]: [NETGAME] User 'Live{tag}_{i}' participating in match\n")
+
+def count_logs(tracker, base):
+    """The summary numbers, counted straight from the generated logs."""
+    games, levels, gametypes, errors, players = 0, Counter(), Counter(), Counter(), set()
+    log_dir = os.path.join(base, "_local", "r14logs")
+    for filepath in tracker.find_log_files([log_dir, os.path.join(log_dir, "old")]):
+        with tracker.open_log(filepath) as f:
+            lines = f.read().decode('utf-8').splitlines()
+        for line in lines:
+            body = LINE.search(line).group(1)
+            if body.startswith("[NETLOBBY] Starting session"):
+                words = body.split()
+                games += 1
+                levels[tracker.LEVEL_MAP[words[6]]] += 1
+                gametypes[tracker.GAMETYPE_MAP[words[4]][0]] += 1
+            elif "participating in match" in body:
+                players.add(body.split("'")[1])
+            elif " (code " in body:
+                errors[body.rsplit(" (code ", 1)[0]] += 1
+    return {"games": games, "levels": levels, "gametypes": gametypes, "errors": errors, "players": len(players)}
+
+def fresh_summary(tracker, base, workers=1):
+    """Summary of a from-scratch import of base's logs into a separate stats folder."""
+    stats_dir = os.path.join(base, "fresh")
+    shutil.rmtree(stats_dir, ignore_errors=True)
+    engine = tracker.StatsEngine(base, stats_dir)
+    engine.import_logs(workers=workers)
+    return engine.summary()
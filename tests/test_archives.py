@@ -0,0 +1,41 @@
+import os
+import bz2
+import lzma
+import gzip
+import shutil
+
+from conftest import append_joins, fresh_summary, log_date
+
+OPENERS = {".gz": gzip.open, ".bz2": bz2.open, ".xz": lzma.open}
+
+def compress(path, ext):
+    with open(path, 'rb') as src, OPENERS[ext](path + ext, 'wb') as dst:
+        shutil.copyfileobj(src, dst)
+    os.remove(path)
+
+def test_archives_import_like_plain_logs(tracker, generate_logs, tmp_path):
+    base = str(tmp_path)
+    generate_logs(base, days=4, lines_per_day=2000, players=100, seed=9, tracker=tracker)
+    old_dir = os.path.join(base, "_local", "r14logs", "old")
+    # Rotated logs are long finished, as archives always are
+    for name in os.listdir(old_dir):
+        os.utime(os.path.join(old_dir, name), (0, 0))
+    expected = fresh_summary(tracker, base)
+    for name, ext in zip(sorted(os.listdir(old_dir)), OPENERS):
+        compress(os.path.join(old_dir, name), ext)
+    assert sorted(os.path.splitext(name)[1] for name in os.listdir(old_dir)) == sorted(OPENERS)
+    assert fresh_summary(tracker, base) == expected
+
+def test_log_compressed_on_rotation_counts_once(tracker, generate_logs, tmp_path):
+    base = str(tmp_path)
+    generate_logs(base, days=3, lines_per_day=2000, players=100, seed=10, old_after=3, tracker=tracker)
+    engine = tracker.StatsEngine(base)
+    engine.import_logs(workers=1)
+
+    log_dir = os.path.join(base, "_local", "r14logs")
+    oldest = min((name for name in os.listdir(log_dir) if name.endswith(".log")), key=log_date)
+    os.replace(os.path.join(log_dir, oldest), os.path.join(log_dir, "old", oldest))
+    compress(os.path.join(log_dir, "old", oldest), ".gz")
+    append_joins(base, 0)
+    engine.import_logs(workers=1)
+    assert engine.summary() == fresh_summary(tracker, base)
@@ -0,0 +1,47 @@
+import pytest
+
+pytest.importorskip("matplotlib")
+
+@pytest.fixture
+def charts(tracker):
+    try:
+        tracker.load_chart_modules()
+    except ImportError:
+        pytest.skip("matplotlib's Tk backend is not available")
+    return tracker
+
+def test_pie_updates_its_wedges_in_place(charts):
+    figure = charts.Figure()
+    pie = charts.PieChart(figure.add_subplot(), "Levels", "Levels", "No Level Data")
+    pie.update(["Arena", "Lobby"], [3, 1], False)
+    first = list(pie.wedges)
+    legend = pie.legend
+    assert [(w.theta1, w.theta2) for w in first] == [(90.0, 360.0), (360.0, 450.0)]
+
+    pie.update(["Arena", "Lobby"], [1, 1], True)
+    assert pie.wedges == first and pie.legend is legend
+    assert [(w.theta1, w.theta2) for w in pie.wedges] == [(90.0, 270.0), (270.0, 450.0)]
+    assert [text.get_text() for text in legend.texts] == [f"Arena - {charts.chart_label(1, 2, True)}", f"Lobby - {charts.chart_label(1, 2, True)}"]
+
+    # Fewer slices: the extra wedge is removed, not the whole pie redrawn
+    pie.update(["Arena"], [5], False)
+    assert pie.wedges == first[:1] and len(pie.ax.patches) == 1
+    pie.update([], [], False)
+    assert pie.wedges == [] and pie.legend is None and pie.empty.get_visible()
+
+def test_bar_and_timeline_keep_their_artists(charts):
+    figure = charts.Figure()
+    bar = charts.GametypeBar(figure.add_subplot(211))
+    public = bar.public
+    bar.update({"Public": 3, "Private": 1}, False)
+    assert bar.public is public and (public.get_width(), bar.private.get_x(), bar.private.get_width()) == (3, 3, 1)
+    bar.update({"Public": 0, "Private": 0}, False)
+    assert bar.empty.get_visible() and not public.get_visible()
+
+    chart = charts.TimelineChart(figure.add_subplot(212))
+    lines = (chart.games, chart.players, chart.errors)
+    chart.update({"bin": "hour", "starts": [0, 3600], "games": [1, 2], "players": [3, 4], "errors": [0, 5]}, "All Errors")
+    assert (chart.games, chart.players, chart.errors) == lines and len(chart.ax.lines) == 3
+    assert list(chart.errors.get_ydata()) == [0, 5, 5]
+    chart.update({"bin": "hour", "starts": [], "games": [], "players": [], "errors": []}, "Disconnects")
+    assert chart.empty.get_visible() and chart.legend.texts[2].get_text() == "Disconnects"
@@ -0,0 +1,48 @@
+import re
+
+def test_trie_pattern_matches_exactly_the_words(tracker):
+    words = ["ab", "abc", "abd", "b", "[x]."]
+    pattern = re.compile(tracker.build_trie_pattern(words))
+    assert [m.group() for m in pattern.finditer("abcd abd ab a b [x]. [x]")] == ["abc", "abd", "ab", "b", "[x]."]
+    assert pattern.fullmatch("a") is None
+    # A word that is a prefix of another still matches on its own, the longer one where it fits
+    assert pattern.match("abx").group() == "ab"
+    assert tracker.build_trie_pattern([]) == ""
+
+def test_classify_kinds(tracker):
+    classifier = tracker.LineClassifier()
+    session = "[10-16-2026] [12:00:00]: [NETLOBBY] Starting session gametype 0xCB60A4DE7E1CAF73 level 0x576ED3F8428EBC4B"
+    assert classifier.classify(session) == ("session", ("0xCB60A4DE7E1CAF73", "0x576ED3F8428EBC4B"))
+    assert classifier.classify("[12:00:00]: [NETGAME] User 'Some One' participating in match") == ("join", "Some One")
+    error = tracker.KNOWN_ERRORS[0]
+    assert classifier.classify(f"[12:00:00]: {error} (code 5)") == ("error", error)
+    # Markers without the rest of their line are not events
+    assert classifier.classify("[12:00:00]: [NETLOBBY] Starting session") is None
+    assert classifier.classify("[12:00:00]: [NETGAME] User 'cut off") is None
+    assert classifier.classify("[12:00:00]: [NETGAME] Sending heartbeat") is None
+
+def test_which_signature_wins(tracker):
+    classifier = tracker.LineClassifier(signatures=["Lost connection", "Lost connection to peer", "timed out"])
+    # The longer signature where both fit, else the first one in the line
+    assert classifier.classify("Lost connection to peer 7") == ("error", "Lost connection to peer")
+    assert classifier.classify("Lost connection to relay") == ("error", "Lost connection")
+    assert classifier.classify("request timed out, Lost connection") == ("error", "timed out")
+    # A join or session marker before a signature is still read as such
+    assert classifier.classify("[NETGAME] User 'A' participating after Lost connection") == ("join", "A")
+    # A dangling join marker doesn't hide a signature after it
+    assert classifier.classify("[NETGAME] User '... Lost connection") == ("error", "Lost connection")
+
+def test_problem_lines_only_when_mining(tracker):
+    line = "[10-16-2026] [12:00:00]: [AUDIO] Warning: buffer underrun on device 3 after 40ms"
+    assert tracker.LineClassifier().classify(line) is None
+    mining = tracker.LineClassifier(mine=True)
+    assert mining.classify(line) == ("problem", "[AUDIO] Warning: buffer underrun on device <*> after <*>")
+    # A known signature later in the line wins over a problem marker
+    error = tracker.KNOWN_ERRORS[0]
+    assert mining.classify(f"[12:00:00]: Error: {error}") == ("error", error)
+
+def test_byte_pattern_finds_the_same_markers(tracker):
+    classifier = tracker.LineClassifier(mine=True)
+    line = f"[12:00:00]: [NETGAME] User 'A' participating; {tracker.KNOWN_ERRORS[1]}; Timeout"
+    found = [m.group() for m in classifier.pattern.finditer(line)]
+    assert [m.group().decode('utf-8') for m in classifier.byte_pattern.finditer(line.encode('utf-8'))] == found
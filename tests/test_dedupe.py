@@ -0,0 +1,93 @@
+import random
+
+def keys(n, seed):
+    rng = random.Random(seed)
+    return [rng.getrandbits(64) for _ in range(n)]
+
+def test_keys_persist_across_saves(tracker, tmp_path):
+    dedupe = tracker.DuplicateFilter(str(tmp_path))
+    first = keys(500, 1)
+    assert all(dedupe.add(key) for key in first)
+    assert not any(dedupe.add(key) for key in first[:50]) # pending repeats
+    dedupe.save()
+    dedupe.close()
+    reloaded = tracker.DuplicateFilter(str(tmp_path))
+    assert reloaded.bits is None # the Bloom filter waits for the first check
+    assert not any(reloaded.add(key) for key in first)
+    assert all(reloaded.add(key) for key in keys(500, 2))
+    assert reloaded.bits == dedupe.bits # read back from dedupe.bloom, not rebuilt
+    reloaded.close()
+
+def test_bloom_false_positive_is_settled_on_disk(tracker, tmp_path):
+    dedupe = tracker.DuplicateFilter(str(tmp_path))
+    stored = keys(100, 3)
+    for key in stored:
+        dedupe.add(key)
+    dedupe.save()
+    # Every bit set: the Bloom filter says "maybe" for every key
+    dedupe.bits = bytearray(b"\xff" * len(dedupe.bits))
+    checked = []
+    on_disk = dedupe.on_disk
+    dedupe.on_disk = lambda key: checked.append(key) or on_disk(key)
+    fresh = keys(20, 4)
+    assert all(dedupe.add(key) for key in fresh)
+    assert checked == fresh
+    assert not dedupe.add(stored[7])
+    dedupe.close()
+
+def test_runs_merge_into_sorted_keys(tracker, tmp_path):
+    dedupe = tracker.DuplicateFilter(str(tmp_path))
+    batches = [keys(100, 5), keys(10, 6), keys(60, 7)]
+    runs = []
+    for batch in batches:
+        for key in batch:
+            dedupe.add(key)
+        dedupe.save()
+        runs.append(list(dedupe.runs))
+    # 100 | 100, 10 | 100, 10, 60 -> 100, 70 -> 170
+    assert runs == [[100], [100, 10], [170]]
+    assert list(dedupe.iter_keys(0, dedupe.count)) == sorted(sum(batches, []))
+    assert all(dedupe.on_disk(key) for batch in batches for key in batch)
+    dedupe.close()
+
+def test_bloom_grows_with_the_keys(tracker, tmp_path, monkeypatch):
+    monkeypatch.setattr(tracker, "BLOOM_MIN_KEYS", 64)
+    dedupe = tracker.DuplicateFilter(str(tmp_path))
+    stored = keys(300, 8)
+    for start in range(0, 300, 50):
+        for key in stored[start:start + 50]:
+            dedupe.add(key)
+        dedupe.save()
+    assert dedupe.capacity >= dedupe.count == 300
+    dedupe.close()
+    reloaded = tracker.DuplicateFilter(str(tmp_path))
+    assert all(reloaded.maybe_on_disk(key) for key in stored)
+    assert not any(reloaded.add(key) for key in stored)
+    reloaded.close()
+
+def test_interrupted_save_starts_over(tracker, tmp_path):
+    dedupe = tracker.DuplicateFilter(str(tmp_path))
+    for key in keys(40, 9):
+        dedupe.add(key)
+    dedupe.save()
+    dedupe.close()
+    with open(dedupe.keys_path, 'r+b') as f:
+        f.truncate(100)
+    reloaded = tracker.DuplicateFilter(str(tmp_path))
+    assert reloaded.runs == [] and reloaded.count == 0
+
+def test_seed_drops_repeated_joins_and_visits(tracker, tmp_path):
+    store = tracker.EventStore(str(tmp_path))
+    day = tracker.to_epoch(tracker.datetime(2026, 9, 1))
+    a, b = store.intern("player", "Alpha"), store.intern("player", "Bravo")
+    store.append("players", {"ts": [day + 10, day + 10, day + 10, day + 20], "player": [a, a, b, a]})
+    store.append("players", {"ts": [day + 20], "player": [a]}) # the same join read again
+    store.append("visits", {"ts": [day + 10, day + 10], "end": [day + 90, day + 90], "player": [b, b]})
+    dedupe = tracker.DuplicateFilter(str(tmp_path))
+    dedupe.seed(store)
+    players = store.load("players")
+    assert list(zip(players["ts"], players["player"])) == [(day + 10, a), (day + 10, b), (day + 20, a)]
+    assert store.row_count("visits") == 1
+    assert not dedupe.add(tracker.event_key("J", day + 20, "Alpha"))
+    assert dedupe.add(tracker.event_key("J", day + 30, "Alpha"))
+    dedupe.close()
@@ -0,0 +1,43 @@
+import os
+import csv
+import gzip
+
+def read_csv(path):
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, 'rt', newline='') as f:
+        return list(csv.reader(f))
+
+def test_export_matches_the_store(tracker, generate_logs, tmp_path):
+    base = str(tmp_path)
+    generate_logs(base, days=3, lines_per_day=2000, players=100, seed=14, tracker=tracker)
+    engine = tracker.StatsEngine(base)
+    engine.import_logs(workers=1)
+    out = engine.export_csv(str(tmp_path / "all"))
+    store = engine.store
+
+    players = store.load("players")
+    rows = read_csv(os.path.join(out, "players.csv"))
+    assert rows[0] == ["Date", "Time", "Player"]
+    assert rows[1:] == [
+        [tracker.from_epoch(ts).strftime("%Y-%m-%d"), tracker.from_epoch(ts).strftime("%H:%M:%S"), store.lookup("player", p)]
+        for ts, p in zip(players["ts"], players["player"])
+    ]
+    levels = read_csv(os.path.join(out, "levels.csv"))
+    assert len(levels) - 1 == store.row_count("levels")
+    assert {row[4] for row in levels[1:]} <= set(tracker.LEVEL_MAP.values())
+    errors = read_csv(os.path.join(out, "errors.csv"))
+    assert [row[2] for row in errors[1:]] == [store.lookup("error", code) for code in store.load("errors")["error"]]
+
+def test_ranged_gzip_export(tracker, generate_logs, tmp_path):
+    base = str(tmp_path)
+    generate_logs(base, days=3, lines_per_day=2000, players=100, seed=15, tracker=tracker)
+    engine = tracker.StatsEngine(base)
+    engine.import_logs(workers=1)
+    ts = engine.store.load("players")["ts"]
+    since, until = ts[len(ts) // 3], ts[2 * len(ts) // 3]
+    plain = engine.export_csv(str(tmp_path / "plain"), since=since, until=until)
+    packed = engine.export_csv(str(tmp_path / "packed"), since=since, until=until, compress=True)
+    for name in ("levels.csv", "players.csv", "errors.csv"):
+        assert read_csv(os.path.join(packed, name + ".gz")) == read_csv(os.path.join(plain, name))
+    rows = read_csv(os.path.join(plain, "players.csv"))[1:]
+    assert len(rows) == sum(1 for t in ts if since <= t < until)
@@ -0,0 +1,29 @@
+import os
+import shutil
+
+def test_merged_shards_match_one_combined_import(tracker, generate_logs, tmp_path):
+    shards, combined = [], str(tmp_path / "combined")
+    for i, host in enumerate(("alpha", "beta")):
+        base = str(tmp_path / host)
+        generate_logs(base, days=3, lines_per_day=2000, players=150, seed=10 + i, tracker=tracker)
+        engine = tracker.StatsEngine(base)
+        engine.set_host_id(host)
+        engine.import_logs(workers=1)
+        shards.append(tracker.pack_shard(engine.stats_dir, str(tmp_path / f"{host}.zip")))
+        # Both hosts' logs in one tree, under names that can't collide
+        for root, _, names in os.walk(os.path.join(base, "_local")):
+            target = os.path.join(combined, os.path.relpath(root, base))
+            os.makedirs(target, exist_ok=True)
+            for name in names:
+                shutil.copy(os.path.join(root, name), os.path.join(target, name.replace("]-", f"]-{i}", 1)))
+
+    assert tracker.merge_shards(shards, str(tmp_path / "fleet")) == ["alpha", "beta"]
+    fleet = tracker.StatsEngine(combined, str(tmp_path / "fleet")).summary()
+    engine = tracker.StatsEngine(combined)
+    engine.import_logs(workers=1)
+    expected = engine.summary()
+    assert fleet == expected
+
+    # Re-running the merge, from a stats folder instead of a zip, doesn't double count
+    tracker.merge_shards([str(tmp_path / "alpha" / "dashboard" / "stats"), shards[1]], str(tmp_path / "fleet"))
+    assert tracker.StatsEngine(combined, str(tmp_path / "fleet")).summary() == expected
@@ -0,0 +1,52 @@
+import os
+
+from conftest import append_joins
+
+def assert_matches_rebuild(tracker, base):
+    engine = tracker.StatsEngine(base)
+    assert engine.rollups.is_current(engine.store) and engine.index.is_current(engine.store)
+    rebuilt = tracker.Rollups(os.path.join(base, "dashboard", "stats"))
+    rebuilt.rebuild(engine.store)
+    assert engine.rollups.buckets == rebuilt.buckets and engine.rollups.presence == rebuilt.presence
+    index = tracker.SecondaryIndex(os.path.join(base, "dashboard", "stats"))
+    index.rebuild(engine.store)
+    for key in index.postings:
+        assert engine.index.get(key) == index.get(key)
+
+def test_small_imports_append_to_journals(tracker, generate_logs, tmp_path, monkeypatch):
+    base = str(tmp_path)
+    generate_logs(base, days=3, lines_per_day=2000, players=100, seed=2, tracker=tracker)
+    engine = tracker.StatsEngine(base)
+    engine.import_logs(workers=1)
+    stats_dir = engine.stats_dir
+    rewritten = [os.path.join(stats_dir, name) for name in ("rollups.json", "presence.bin", "players.player.idx")]
+    before = [os.stat(path).st_mtime_ns for path in rewritten]
+    for tick in range(3):
+        append_joins(base, tick)
+        assert engine.import_logs(workers=1, snapshot=False) == 1
+    assert [os.stat(path).st_mtime_ns for path in rewritten] == before
+    assert os.path.exists(os.path.join(stats_dir, "rollups.journal"))
+    assert os.path.exists(os.path.join(stats_dir, "players.player.idx.journal"))
+    assert engine.summary()["players"] == tracker.StatsEngine(base).summary()["players"]
+    assert_matches_rebuild(tracker, base)
+
+    # Journals are folded back into their files once they outgrow them
+    monkeypatch.setattr(tracker, "journal_full", lambda journal_path, base_paths: True)
+    append_joins(base, "fold")
+    engine.import_logs(workers=1, snapshot=False)
+    assert not os.path.exists(os.path.join(stats_dir, "rollups.journal"))
+    assert not os.path.exists(os.path.join(stats_dir, "players.player.idx.journal"))
+    assert_matches_rebuild(tracker, base)
+
+def test_torn_journal_record_triggers_rebuild(tracker, generate_logs, tmp_path):
+    base = str(tmp_path)
+    generate_logs(base, days=2, lines_per_day=1000, players=50, seed=3, tracker=tracker)
+    engine = tracker.StatsEngine(base)
+    engine.import_logs(workers=1)
+    append_joins(base, 0)
+    engine.import_logs(workers=1, snapshot=False)
+    for name in ("rollups.journal", "players.player.idx.journal"):
+        path = os.path.join(engine.stats_dir, name)
+        with open(path, 'r+b') as f:
+            f.truncate(os.path.getsize(path) - 3)
+    assert_matches_rebuild(tracker, base)
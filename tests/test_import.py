@@ -0,0 +1,17 @@
+import importlib.util
+
+from conftest import TRACKER_FILE
+
+def test_unregistered_module_imports_in_one_process(generate_logs, tmp_path):
+    # As in the README example without the sys.modules line: workers couldn't unpickle the scanner
+    spec = importlib.util.spec_from_file_location("unregistered_tracker", TRACKER_FILE)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    generate_logs(str(tmp_path), days=3, lines_per_day=500, tracker=module)
+    assert not module.workers_can_import()
+    engine = module.StatsEngine(str(tmp_path))
+    assert engine.import_logs(workers=2) == 3
+    assert engine.summary()["games"] > 0
+
+def test_registered_module_uses_workers(tracker):
+    assert tracker.workers_can_import()
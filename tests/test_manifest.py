@@ -0,0 +1,59 @@
+import os
+
+from conftest import append_joins, count_logs, fresh_summary, log_date, newest_log
+
+def test_moved_log_is_found_among_many_orphans(tracker, generate_logs, tmp_path):
+    base = str(tmp_path)
+    generate_logs(base, days=2, lines_per_day=500, players=50, old_after=5, tracker=tracker)
+    engine = tracker.StatsEngine(base)
+    engine.import_logs(workers=1)
+    manifest = engine.manifest
+    log_dir = os.path.join(base, "_local", "r14logs")
+    log = sorted(name for name in os.listdir(log_dir) if name.endswith(".log"))[0]
+    moved = os.path.join(log_dir, "old", log)
+    os.replace(os.path.join(log_dir, log), moved)
+    # Logs long since deleted, one of them with the moved log's head but more read than it holds
+    entry = manifest.entries[os.path.join(log_dir, log)]
+    for i in range(200):
+        manifest.entries[os.path.join(log_dir, f"gone{i}.log")] = dict(entry, head=f"{i:040x}")
+    manifest.entries[os.path.join(log_dir, "longer.log")] = dict(entry, offset=entry["offset"] + 1)
+
+    assert manifest.plan(tracker.find_log_files(engine.log_dirs)) == []
+    assert manifest.entries[moved]["offset"] == os.path.getsize(moved)
+    assert os.path.join(log_dir, log) not in manifest.entries
+    assert os.path.join(log_dir, "longer.log") in manifest.entries
+
+def test_appended_and_moved_logs_count_once(tracker, generate_logs, tmp_path):
+    base = str(tmp_path)
+    generate_logs(base, days=4, lines_per_day=3000, players=200, seed=7, old_after=4, tracker=tracker)
+    engine = tracker.StatsEngine(base)
+    engine.import_logs(workers=1)
+
+    append_joins(base, 0)
+    assert engine.import_logs(workers=1) == 1
+    assert engine.import_logs(workers=1) == 0
+
+    log_dir = os.path.join(base, "_local", "r14logs")
+    oldest = min((name for name in os.listdir(log_dir) if name.endswith(".log")), key=log_date)
+    os.replace(os.path.join(log_dir, oldest), os.path.join(log_dir, "old", oldest))
+    append_joins(base, 1)
+    engine.import_logs(workers=1)
+
+    summary = engine.summary()
+    assert summary == fresh_summary(tracker, base)
+    expected = count_logs(tracker, base)
+    assert (summary["games"], summary["players"]) == (expected["games"], expected["players"])
+
+def test_replaced_log_is_read_from_the_start(tracker, generate_logs, tmp_path):
+    base = str(tmp_path)
+    generate_logs(base, days=2, lines_per_day=1000, players=50, seed=8, old_after=5, tracker=tracker)
+    engine = tracker.StatsEngine(base)
+    engine.import_logs(workers=1)
+    path = newest_log(base)
+    with open(path, 'r', encoding='utf-8') as f:
+        lines = f.readlines()
+    # Same name, different contents: a new server run reusing the file name
+    with open(path, 'w', encoding='utf-8') as f:
+        f.writelines(lines[1:] + lines[:1])
+    plan = engine.manifest.plan(tracker.find_log_files(engine.log_dirs))
+    assert [(task[0], task[1]) for task in plan] == [(path, 0)]
@@ -0,0 +1,33 @@
+import os
+import json
+
+def test_spans_and_counters_carry_over(tracker, tmp_path):
+    metrics = tracker.Metrics()
+    metrics.add_time("query.summary", 0.5)
+    metrics.add_time("query.summary", 0.25)
+    metrics.count("import.lines", 10)
+    metrics.save(str(tmp_path), 'host "a"')
+    reloaded = tracker.Metrics(os.path.join(str(tmp_path), tracker.METRICS_JSON))
+    reloaded.count("import.lines", 5)
+    snapshot = reloaded.snapshot()
+    assert snapshot["spans"]["query.summary"] == {"count": 2, "seconds": 0.75, "max_seconds": 0.5}
+    assert snapshot["counters"] == {"import.lines": 15}
+
+    prom = open(os.path.join(str(tmp_path), tracker.METRICS_PROM), encoding='utf-8').read()
+    assert '# TYPE echovr_tracker_span_seconds_total counter' in prom
+    assert 'echovr_tracker_span_count_total{host="host \\"a\\"",span="query.summary"} 2' in prom
+
+def test_import_records_per_file_stats(tracker, generate_logs, tmp_path):
+    base = str(tmp_path)
+    stats = generate_logs(base, days=2, lines_per_day=1000, players=50, seed=16, tracker=tracker)
+    engine = tracker.StatsEngine(base)
+    engine.import_logs(workers=1)
+    with open(os.path.join(engine.stats_dir, tracker.METRICS_JSON), encoding='utf-8') as f:
+        saved = json.load(f)
+    assert saved["counters"]["import.lines"] == stats["lines"]
+    assert saved["counters"]["import.bytes"] == stats["bytes"]
+    assert saved["counters"]["import.files"] == 2 and len(saved["files"]) == 2
+    assert sum(f["events"] for f in saved["files"]) == saved["counters"]["import.events"]
+    assert saved["spans"]["import.read"]["count"] == 2
+    report = tracker.format_metrics(saved)
+    assert "import.lines" in report and os.path.basename(saved["files"][0]["path"])[:33] in report
@@ -0,0 +1,46 @@
+from conftest import append_joins
+
+def test_refresh_rereads_only_what_another_process_changed(tracker, generate_logs, tmp_path):
+    base = str(tmp_path)
+    generate_logs(base, days=3, lines_per_day=2000, players=100, seed=11, tracker=tracker)
+    tracker.StatsEngine(base).import_logs(workers=1)
+    reader = tracker.StatsEngine(base)
+    before = reader.summary()
+    players = reader.model.table("players")
+    version = reader.model.version
+
+    # Nothing changed on disk: the parsed tables and derived values are kept
+    reader.refresh()
+    assert reader.model.version == version and reader.model.table("players") is players
+    assert reader.summary() == before
+
+    # Another process imports new joins
+    append_joins(base, 0)
+    assert tracker.StatsEngine(base).import_logs(workers=1) == 1
+    after = reader.summary()
+    assert reader.model.version > version
+    assert after["players"] == before["players"] + 10
+    assert reader.model.table("players") is not players
+    assert list(reader.model.table("players")["ts"]) == list(tracker.StatsEngine(base).store.load("players")["ts"])
+
+def test_own_import_appends_to_loaded_tables(tracker, generate_logs, tmp_path):
+    base = str(tmp_path)
+    generate_logs(base, days=3, lines_per_day=2000, players=100, seed=12, tracker=tracker)
+    engine = tracker.StatsEngine(base)
+    engine.import_logs(workers=1)
+    engine.model.table("players")
+    version = engine.model.version
+
+    append_joins(base, 0)
+    engine.import_logs(workers=1)
+    assert engine.model.version > version
+    fresh = tracker.StatsEngine(base).store
+    for table in tracker.STORE_TABLES:
+        if engine.model.loaded(table):
+            rows = fresh.load(table)
+            assert {column: list(values) for column, values in engine.model.table(table).items()} == {column: list(values) for column, values in rows.items()}
+    # Files this process saved are adopted rather than re-read on the next refresh
+    engine.summary()
+    version, derived = engine.model.version, dict(engine.model.derived)
+    engine.refresh()
+    assert engine.model.version == version and engine.model.derived == derived
@@ -0,0 +1,28 @@
+import random
+from array import array
+
+def test_bitmap_round_trip(tracker):
+    rng = random.Random(6)
+    for codes in ([], [0], [7, 8], [1 << 20], [rng.randrange(5000) for _ in range(300)]):
+        bitmap = tracker.bitmap_from_codes(codes)
+        assert tracker.bitmap_codes(bitmap) == sorted(set(codes))
+        assert tracker.popcount(bitmap) == len(set(codes))
+    assert tracker.bitmap_from_codes(set()) == 0 and tracker.bitmap_codes(0) == []
+
+def test_presence_survives_save_and_load(tracker, tmp_path):
+    rollups = tracker.Rollups(str(tmp_path))
+    ts = array('q', [0, 10, 3600, 3700, 90000])
+    rollups.add("players", {"ts": ts, "player": array('I', [1, 2, 2, 900, 1])})
+    assert tracker.bitmap_codes(rollups.presence["hour"][0]) == [1, 2]
+    assert tracker.bitmap_codes(rollups.presence["day"][0]) == [1, 2, 900]
+    rollups.save()
+    loaded = tracker.Rollups(str(tmp_path))
+    assert loaded.presence == rollups.presence and loaded.rows == {"players": 5}
+
+def test_players_are_interned_once(tracker, tmp_path):
+    store = tracker.EventStore(str(tmp_path))
+    codes = [store.intern("player", name) for name in ("A", "B", "A", "C", "B")]
+    assert codes == [0, 1, 0, 2, 1]
+    store.save_dictionary()
+    reopened = tracker.EventStore(str(tmp_path))
+    assert reopened.intern("player", "C") == 2 and reopened.lookup("player", 1) == "B"
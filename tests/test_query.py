@@ -0,0 +1,48 @@
+import pytest
+
+def imported(tracker, generate_logs, tmp_path):
+    base = str(tmp_path)
+    generate_logs(base, days=6, lines_per_day=3000, players=200, seed=18, tracker=tracker)
+    tracker.StatsEngine(base).import_logs(workers=1)
+    warm = tracker.StatsEngine(base)
+    for table in tracker.STORE_TABLES:
+        warm.model.table(table)
+    return tracker.StatsEngine(base), warm
+
+def test_point_lookups_read_only_matched_rows(tracker, generate_logs, tmp_path):
+    cold, warm = imported(tracker, generate_logs, tmp_path)
+    player = cold.store.dicts["player"][3]
+    lookups = (("players", {"player": player}), ("players", {"player": player.upper()}),
+               ("levels", {"mode": "Arena"}), ("levels", {"level": "Fission", "gametype": "Public"}),
+               ("errors", {"error": "404"}), ("players", {"player": "nobody"}))
+    for table, filters in lookups:
+        rows = list(cold.query(table, **filters))
+        assert rows == list(warm.query(table, **filters))
+        assert list(cold.query(table, newest_first=True, limit=3, **filters)) == rows[::-1][:3]
+    assert not cold.model.tables
+
+    # Matches are checked against a plain scan of the table
+    players = warm.model.table("players")
+    code = warm.store.codes["player"][player]
+    expected = [row for row, value in enumerate(players["player"]) if value == code]
+    assert [r["time"] for r in cold.query("players", player=player)] == \
+        [tracker.from_epoch(players["ts"][row]).strftime("%Y-%m-%d %H:%M:%S") for row in expected]
+
+def test_read_rows_spans_segments(tracker, generate_logs, tmp_path):
+    cold, _ = imported(tracker, generate_logs, tmp_path)
+    store = cold.store
+    table = store.load("players")
+    starts = store.starts["players"]
+    # Runs that cross segment boundaries, single rows, and the last row
+    rows = sorted({0, 1, 2, starts[1] - 1, starts[1], starts[1] + 1, starts[2] + 5, len(table["ts"]) - 1})
+    got = store.read_rows("players", rows)
+    for column in ("ts", "player"):
+        assert list(got[column]) == [table[column][row] for row in rows]
+    assert list(store.read_rows("players", [])["ts"]) == []
+
+def test_bad_filters_raise(tracker, generate_logs, tmp_path):
+    cold, _ = imported(tracker, generate_logs, tmp_path)
+    with pytest.raises(ValueError):
+        cold.query("visits", error="404")
+    with pytest.raises(ValueError):
+        cold.query("nothing")
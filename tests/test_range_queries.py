@@ -0,0 +1,48 @@
+from datetime import timedelta
+
+RANGES = [timedelta(hours=1), timedelta(hours=24), timedelta(days=3), timedelta(days=30)]
+
+def engines(tracker, generate_logs, tmp_path):
+    base = str(tmp_path)
+    generate_logs(base, days=12, lines_per_day=3000, players=400, seed=4, tracker=tracker)
+    tracker.StatsEngine(base).import_logs(workers=1)
+    warm = tracker.StatsEngine(base)
+    for table in tracker.STORE_TABLES:
+        warm.model.table(table)
+    return tracker.StatsEngine(base), warm
+
+def test_engine_start_loads_no_tables(tracker, generate_logs, tmp_path):
+    cold, _ = engines(tracker, generate_logs, tmp_path)
+    assert not cold.model.tables
+    cold.summary(timedelta(hours=24))
+    cold.timeline(tracker.range_start(timedelta(hours=24)))
+    list(cold.query("players", since=tracker.range_start(timedelta(days=2))))
+    assert not cold.model.tables
+
+def test_range_reads_open_only_overlapping_days(tracker, generate_logs, tmp_path):
+    cold, _ = engines(tracker, generate_logs, tmp_path)
+    opened = set()
+    segment_path = cold.store.segment_path
+    def record(table, name, column):
+        opened.add((table, name))
+        return segment_path(table, name, column)
+    cold.store.segment_path = record
+    since = tracker.range_start(timedelta(hours=24))
+    cold.summary(since=since)
+    days = {tracker.day_period(since)[0], tracker.day_period(since + tracker.DAY)[0]}
+    # The oldest day is opened for its first timestamp only ("Since: ...")
+    days.add(cold.store.segments["levels"][0]["name"])
+    assert opened and {name for table, name in opened if table != "visits"} <= days
+
+def test_cold_range_queries_match_loaded_tables(tracker, generate_logs, tmp_path):
+    cold, warm = engines(tracker, generate_logs, tmp_path)
+    for delta in RANGES:
+        assert cold.summary(delta) == warm.summary(delta)
+        since = tracker.range_start(delta)
+        until = since + 5 * tracker.HOUR + 17
+        assert cold.summary(since=since, until=until) == warm.summary(since=since, until=until)
+        assert cold.timeline(since) == warm.timeline(since)
+        assert cold.timeline(since, until, error="Service status") == warm.timeline(since, until, error="Service status")
+        for table, filters in (("players", {}), ("levels", {"mode": "Arena"}), ("visits", {}), ("errors", {"error": "404"})):
+            assert list(cold.query(table, since, until, **filters)) == list(warm.query(table, since, until, **filters))
+    assert not cold.model.tables
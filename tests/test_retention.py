@@ -0,0 +1,66 @@
+import os
+
+from conftest import newest_log
+
+DAY = 86400
+
+def imported(tracker, generate_logs, base):
+    generate_logs(base, days=10, lines_per_day=2000, players=150, seed=24, tracker=tracker)
+    # Logs are only finished once idle; the newest one is still being written
+    for name in os.listdir(os.path.dirname(newest_log(base))):
+        path = os.path.join(os.path.dirname(newest_log(base)), name)
+        if name.endswith(".log") and path != newest_log(base):
+            os.utime(path, (0, 0))
+    engine = tracker.StatsEngine(base)
+    engine.import_logs(workers=1)
+    return engine
+
+def loaded(tracker, base):
+    engine = tracker.StatsEngine(base)
+    for table in tracker.STORE_TABLES:
+        engine.model.table(table)
+    return engine
+
+SESSION_KEYS = ("peak_players", "avg_players", "avg_match_minutes", "sessions_since")
+
+def test_sessions_start_where_the_kept_visits_do(tracker, generate_logs, tmp_path, frozen_now, capsys):
+    base = str(tmp_path)
+    engine = imported(tracker, generate_logs, base)
+    oldest = engine.model.oldest_ts()
+    # Whole hours: raw rows for partial hours at the ends are gone with the rest
+    start = oldest - oldest % 3600 + DAY
+    dropped_range = (start, start + DAY)
+    before = engine.timeline(*dropped_range, "hour")
+    assert engine.summary()["sessions_since"] is None
+
+    assert engine.compact(keep_days=4)["dropped"]
+    kept = max(engine.store.dropped_before[table] for table in ("visits", "matches"))
+    assert kept > dropped_range[1]
+    cold, warm = tracker.StatsEngine(base), loaded(tracker, base)
+    visits = warm.model.table("visits")
+    assert min(visits["ts"]) >= engine.store.dropped_before["visits"]
+    profile = tracker.ConcurrencyProfile(visits["ts"], visits["end"])
+
+    # All time and a range that straddles the cutoff: just the kept part
+    for since, until in ((None, None), (oldest, None), (oldest, kept + DAY)):
+        stats = cold.session_stats(since, until)
+        assert stats == warm.session_stats(since, until)
+        assert stats["sessions_since"] == tracker.from_epoch(kept)
+        assert stats["peak_players"] == profile.peak(kept, until) > 0
+    assert not cold.model.tables # all time came from the rollups' totals
+    assert cold.summary()["players"] == engine.summary()["players"]
+
+    # Wholly before the cutoff: unavailable rather than zero
+    stats = cold.session_stats(*dropped_range)
+    assert stats == dict.fromkeys(SESSION_KEYS)
+    tracker.print_summary(cold.summary(since=dropped_range[0], until=dropped_range[1]), "custom")
+    assert "Peak Players Online: n/a" in capsys.readouterr().out
+    # The timeline keeps the dropped days' games, players and errors
+    assert cold.timeline(*dropped_range, "hour") == before
+    assert sum(before["games"]) and sum(before["players"])
+
+    # Ranges after the cutoff are unchanged
+    since = kept + DAY
+    assert cold.session_stats(since)["sessions_since"] is None
+    snapshot = tracker.read_snapshot(engine.stats_dir)
+    assert {key: snapshot[key] for key in SESSION_KEYS} == {key: warm.summary()[key] for key in SESSION_KEYS}
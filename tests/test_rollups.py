@@ -0,0 +1,68 @@
+import random
+from array import array
+from collections import Counter
+
+HOUR, DAY = 3600, 86400
+
+def test_split_range_edges(tracker):
+    split = tracker.split_range
+    assert split(None, None) == [("day", None, None)]
+    assert split(5, 5) == [] and split(10, 5) == []
+    # Inside one hour: raw rows only
+    assert split(DAY + 10, DAY + 20) == [("raw", DAY + 10, DAY + 20)]
+    # Whole hours inside one day
+    assert split(DAY + HOUR, DAY + 3 * HOUR) == [("hour", DAY + HOUR, DAY + 3 * HOUR)]
+    # Ragged on both sides across days
+    assert split(DAY - HOUR - 5, 3 * DAY + HOUR + 5) == [
+        ("raw", DAY - HOUR - 5, DAY - HOUR), ("hour", DAY - HOUR, DAY), ("day", DAY, 3 * DAY),
+        ("hour", 3 * DAY, 3 * DAY + HOUR), ("raw", 3 * DAY + HOUR, 3 * DAY + HOUR + 5),
+    ]
+    # Open ends
+    assert split(DAY + 5, None) == [("raw", DAY + 5, DAY + HOUR), ("hour", DAY + HOUR, 2 * DAY), ("day", 2 * DAY, None)]
+    assert split(None, DAY + 5) == [("day", None, DAY), ("raw", DAY, DAY + 5)]
+
+def test_pieces_cover_the_range_once(tracker):
+    rng = random.Random(2)
+    for _ in range(300):
+        lo, hi = sorted(rng.randrange(0, 5 * DAY) for _ in range(2))
+        covered = [(piece_lo, piece_hi) for _, piece_lo, piece_hi in tracker.split_range(lo, hi)]
+        if lo == hi:
+            assert covered == []
+            continue
+        assert all(a < b for a, b in covered)
+        assert covered[0][0] == lo and covered[-1][1] == hi
+        assert all(prev[1] == piece[0] for prev, piece in zip(covered, covered[1:]))
+
+def make_rollups(tracker, tmp_path, rng):
+    ts = array('q', sorted(rng.randrange(0, 10 * DAY) for _ in range(3000)))
+    rows = {
+        "levels": {"ts": ts, "level": array('I', (rng.randrange(6) for _ in ts)), "gametype": array('I', (rng.randrange(6) for _ in ts))},
+        "errors": {"ts": ts, "error": array('I', (rng.randrange(11) for _ in ts))},
+        "players": {"ts": ts, "player": array('I', (rng.randrange(500) for _ in ts))},
+    }
+    rollups = tracker.Rollups(str(tmp_path))
+    for table, columns in rows.items():
+        rollups.add(table, columns)
+
+    def view(table, lo, hi):
+        i, j = tracker.time_slice(rows[table]["ts"], lo, hi)
+        return rows[table], i, j, 0
+    return rollups, rows, view
+
+def test_query_and_unique_players_match_the_rows(tracker, tmp_path):
+    rng = random.Random(3)
+    rollups, rows, view = make_rollups(tracker, tmp_path, rng)
+    ranges = [(None, None), (None, 4 * DAY + 7), (2 * DAY + 5, None)]
+    ranges += [tuple(sorted(rng.randrange(-DAY, 11 * DAY) for _ in range(2))) for _ in range(100)]
+    for lo, hi in ranges:
+        i, j = tracker.time_slice(rows["levels"]["ts"], lo, hi)
+        counts = rollups.query(view, lo, hi)
+        assert counts["level"] == Counter(rows["levels"]["level"][i:j])
+        assert counts["error"] == Counter(rows["errors"]["error"][i:j])
+        assert rollups.unique_players(view, lo, hi) == len(set(rows["players"]["player"][i:j]))
+
+def test_new_buckets_are_found_after_a_query(tracker, tmp_path):
+    rollups, rows, view = make_rollups(tracker, tmp_path, random.Random(4))
+    before = rollups.query(view, 0, 20 * DAY)["level"]
+    rollups.add("levels", {"ts": array('q', [15 * DAY]), "level": array('I', [0]), "gametype": array('I', [0])})
+    assert rollups.query(view, 0, 20 * DAY)["level"] == before + Counter({0: 1})
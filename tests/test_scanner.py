@@ -0,0 +1,47 @@
+import io
+import os
+import re
+
+LOG = (
+    b"[12:00:00]: filler\r\n"
+    b"[12:00:01]: [NETGAME] User 'A' participating in match\r\n"
+    b"[12:00:02]: \xff\xfe broken bytes then MARK and MARK again\n"
+    b"\n"
+    b"[12:00:03]: filler\n"
+    b"[12:00:04]: last MARK without newline"
+)
+PATTERN = re.compile(rb"MARK|\[NETGAME\] User '")
+
+def test_marked_lines_and_offsets(tracker):
+    lines = list(tracker.iter_marked_lines(LOG, PATTERN))
+    assert [offset for offset, _ in lines] == [LOG.index(b"[12:00:01]"), LOG.index(b"[12:00:02]"), LOG.index(b"[12:00:04]")]
+    assert lines[0][1] == "[12:00:01]: [NETGAME] User 'A' participating in match"
+    assert lines[1][1] == "[12:00:02]:  broken bytes then MARK and MARK again"
+    # Bounded to [start, end), offsets shifted by base
+    start, end = LOG.index(b"[12:00:02]"), LOG.index(b"[12:00:04]")
+    assert [offset for offset, _ in tracker.iter_marked_lines(LOG, PATTERN, start, end, base=100)] == [100 + start]
+
+def test_stream_matches_mmap_scan_across_chunk_boundaries(tracker):
+    expected = list(tracker.iter_marked_lines(LOG, PATTERN))
+    for chunk_size in (1, 7, 16, 64, 1 << 20):
+        stats = {"lines": 0, "bytes": 0}
+        last_bytes = bytearray()
+        lines = list(tracker.iter_stream_marked_lines(io.BytesIO(LOG), PATTERN, chunk_size, stats, last_bytes))
+        assert lines == expected, chunk_size
+        assert stats == {"lines": LOG.count(b"\n") + 1, "bytes": len(LOG)}
+        assert bytes(last_bytes).endswith(b"without newline")
+    assert tracker.count_lines(LOG, 0, len(LOG), chunk_size=5) == LOG.count(b"\n")
+
+def test_live_log_leaves_its_partial_line(tracker, tmp_path):
+    path = str(tmp_path / "r14[10-16-2026]-1.log")
+    first = b"[12:00:01]: [NETGAME] User 'A' participating in match\n"
+    with open(path, 'wb') as f:
+        f.write(first + b"[12:00:02]: [NETGAME] User 'B' partic")
+    result = tracker.scan_log_file((path, 0, None, None, False))
+    assert result["offset"] == len(first)
+    assert result["strings"]["player"] == ["A"]
+    with open(path, 'ab') as f:
+        f.write(b"ipating in match\n")
+    resumed = tracker.scan_log_file((path, result["offset"], result["day"], result["open"], False))
+    assert resumed["offset"] == os.path.getsize(path)
+    assert resumed["strings"]["player"] == ["B"]
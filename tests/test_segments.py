@@ -0,0 +1,53 @@
+from datetime import datetime
+
+def epoch(tracker, *args):
+    return tracker.to_epoch(datetime(*args))
+
+def add_games(tracker, store, days):
+    """A few games at different hours on each (year, month, day)."""
+    ts = [epoch(tracker, *day, hour) for day in days for hour in (1, 9, 17, 23)]
+    store.append("levels", {"ts": ts, "level": [0] * len(ts), "gametype": [0] * len(ts)})
+    return ts
+
+def range_rows(store, since, until):
+    return [t for chunk in store.iter_rows("levels", since, until, chunk_rows=3) for t in chunk["ts"]]
+
+def assert_segments_hold_their_rows(store):
+    for k, segment in enumerate(store.segments["levels"]):
+        ts = store.read_column("levels", "ts", store.starts["levels"][k], segment["rows"])
+        assert all(segment["lo"] <= t < segment["hi"] for t in ts)
+
+def test_day_segments_and_range_reads(tracker, tmp_path):
+    store = tracker.EventStore(str(tmp_path))
+    ts = add_games(tracker, store, [(2026, 8, 20), (2026, 8, 21), (2026, 9, 3)])
+    assert [s["name"] for s in store.segments["levels"]] == ["2026-08-20", "2026-08-21", "2026-09-03"]
+    since, until = epoch(tracker, 2026, 8, 20, 12), epoch(tracker, 2026, 9, 3, 10)
+    assert range_rows(store, since, until) == [t for t in ts if since <= t < until]
+
+def test_backfill_lands_in_order(tracker, tmp_path):
+    store = tracker.EventStore(str(tmp_path))
+    later = add_games(tracker, store, [(2026, 9, 1), (2026, 9, 5)])
+    earlier = add_games(tracker, store, [(2026, 8, 30), (2026, 9, 1)])
+    assert list(store.load("levels")["ts"]) == sorted(later + earlier)
+    assert_segments_hold_their_rows(store)
+
+def test_compacting_several_months_keeps_range_reads(tracker, tmp_path):
+    store = tracker.EventStore(str(tmp_path))
+    days = [(2026, 7, d) for d in (3, 17)] + [(2026, 8, d) for d in range(1, 31, 3)] + [(2026, 9, d) for d in range(1, 21)]
+    add_games(tracker, store, days + [(2026, 10, 2)])
+    ranges = [(None, None), (epoch(tracker, 2026, 9, 1), epoch(tracker, 2026, 9, 15)),
+              (epoch(tracker, 2026, 7, 17, 5), epoch(tracker, 2026, 8, 10)), (epoch(tracker, 2026, 8, 31), None)]
+    before = [range_rows(store, since, until) for since, until in ranges]
+
+    removed = store.compact("levels", epoch(tracker, 2026, 10, 1))
+    names = [s["name"] for s in store.segments["levels"]]
+    assert names == ["2026-07", "2026-08", "2026-09", "2026-10-02"]
+    assert removed == len(days) - 3
+    assert_segments_hold_their_rows(store)
+    assert [range_rows(store, since, until) for since, until in ranges] == before
+    # What is on disk matches a fresh open, and nothing is left of the day files
+    reopened = tracker.EventStore(str(tmp_path))
+    assert [range_rows(reopened, since, until) for since, until in ranges] == before
+    assert sorted(p.name for p in (tmp_path / "levels").iterdir() if p.name.endswith(".ts.bin")) == \
+        [f"{name}.ts.bin" for name in names]
+    assert store.compact("levels", epoch(tracker, 2026, 10, 1)) == 0
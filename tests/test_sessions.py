@@ -0,0 +1,102 @@
+import os
+import random
+from datetime import datetime
+
+LEVEL, GAMETYPE = "0x576ED3F8428EBC4B", "0xCB60A4DE7E1CAF73"
+
+def epoch(tracker, text):
+    return tracker.to_epoch(datetime.strptime(text, "%m-%d-%Y %H:%M:%S"))
+
+def write_log(base, name, lines, mtime=0):
+    log_dir = os.path.join(base, "_local", "r14logs")
+    os.makedirs(os.path.join(log_dir, "old"), exist_ok=True)
+    path = os.path.join(log_dir, name)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.writelines(line + "\n" for line in lines)
+    if mtime is not None:
+        os.utime(path, (mtime, mtime))
+    return path
+
+def session(time):
+    return f"[{time}]: [NETLOBBY] Starting session gametype {GAMETYPE} level {LEVEL} with 8 slots"
+
+def join(time, name):
+    return f"[{time}]: [NETGAME] User '{name}' participating in match"
+
+def test_session_tracker_closes_at_next_session_and_last_line(tracker):
+    sessions = tracker.SessionTracker()
+    sessions.start_session(100, GAMETYPE, LEVEL)
+    sessions.join(110, "A")
+    sessions.join(120, "A")
+    sessions.join(130, "B")
+    sessions.start_session(200, GAMETYPE, LEVEL)
+    sessions.join(210, "C")
+    state = sessions.to_state()
+    # Handed over between imports while the log is live
+    resumed = tracker.SessionTracker(state)
+    resumed.seen(250)
+    resumed.finish(300)
+    assert sessions.matches == [(100, 200, GAMETYPE, LEVEL)]
+    assert sorted(sessions.visits) == [(110, 200, "A"), (130, 200, "B")]
+    assert resumed.matches == [(200, 300, GAMETYPE, LEVEL)]
+    assert resumed.visits == [(210, 300, "C")]
+    assert tracker.SessionTracker().to_state() is None
+
+def test_concurrency_profile_peak_and_average(tracker):
+    profile = tracker.ConcurrencyProfile([0, 10, 20, 50], [30, 40, 25, 50])
+    # 0-10: 1, 10-20: 2, 20-25: 3, 25-30: 2, 30-40: 1; the empty interval is ignored
+    assert profile.peak() == 3
+    assert profile.peak(0, 20) == 2
+    assert profile.peak(24, 26) == 3
+    assert profile.peak(25, 100) == 2
+    assert profile.peak(40, 100) == 0
+    assert profile.average(0, 40) == (10 + 20 + 15 + 10 + 10) / 40
+    assert profile.average(30, 30) == 0.0
+
+def test_concurrency_profile_range_peak_matches_a_scan(tracker):
+    rng = random.Random(1)
+    starts = [rng.randrange(100000) for _ in range(3000)]
+    profile = tracker.ConcurrencyProfile(starts, [start + rng.randrange(1, 3000) for start in starts])
+    for _ in range(500):
+        i, j = sorted(rng.randrange(len(profile.levels) + 1) for _ in range(2))
+        assert profile.range_peak(i, j) == max(profile.levels[i:j], default=0)
+        lo, hi = sorted(rng.randrange(-100, 110000) for _ in range(2))
+        first = max(tracker.bisect_right(profile.times, lo) - 1, 0)
+        assert profile.peak(lo, hi) == max(profile.levels[first:tracker.bisect_left(profile.times, hi)], default=0)
+
+def test_log_running_past_midnight(tracker, tmp_path):
+    base = str(tmp_path)
+    write_log(base, "r14[10-16-2026]-1.log", [
+        session("23:30:00"), join("23:40:00", "A"), join("23:50:00", "B"),
+        session("00:30:00"), join("00:40:00", "C"),
+        "[01:30:00]: [NETGAME] Sending heartbeat to game service",
+    ])
+    engine = tracker.StatsEngine(base)
+    engine.import_logs(workers=1)
+    matches = engine.store.load("matches")
+    assert list(zip(matches["ts"], matches["end"])) == [
+        (epoch(tracker, "10-16-2026 23:30:00"), epoch(tracker, "10-17-2026 00:30:00")),
+        (epoch(tracker, "10-17-2026 00:30:00"), epoch(tracker, "10-17-2026 01:30:00")),
+    ]
+    summary = engine.summary()
+    assert summary["avg_match_minutes"] == 60.0
+    assert summary["peak_players"] == 2
+
+def test_resumed_scan_keeps_the_day_after_midnight(tracker, tmp_path):
+    base = str(tmp_path)
+    lines = [session("23:30:00"), join("23:40:00", "A")]
+    path = write_log(base, "r14[10-16-2026]-1.log", lines, mtime=None)
+    engine = tracker.StatsEngine(base)
+    engine.import_logs(workers=1)
+    # The server keeps writing after midnight, and the log then goes quiet
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write(join("00:10:00", "B") + "\n")
+    engine.import_logs(workers=1)
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write(session("00:20:00") + "\n" + "[00:50:00]: [NETGAME] Sending heartbeat to game service\n")
+    os.utime(path, (0, 0))
+    engine.import_logs(workers=1)
+    players = engine.store.load("players")
+    assert list(players["ts"]) == [epoch(tracker, "10-16-2026 23:40:00"), epoch(tracker, "10-17-2026 00:10:00")]
+    matches = engine.store.load("matches")
+    assert list(matches["end"]) == [epoch(tracker, "10-17-2026 00:20:00"), epoch(tracker, "10-17-2026 00:50:00")]
@@ -0,0 +1,108 @@
+import os
+import json
+import random
+from datetime import datetime
+
+from conftest import append_joins, fresh_summary
+
+def loaded_engine(tracker, base):
+    engine = tracker.StatsEngine(base)
+    for table in tracker.STORE_TABLES:
+        engine.model.table(table)
+    return engine
+
+def assert_snapshot_matches(tracker, base):
+    snapshot = tracker.read_snapshot(os.path.join(base, "dashboard", "stats"))
+    timeline = snapshot.pop("timeline")
+    assert snapshot.pop("range") == "all"
+    warm = loaded_engine(tracker, base)
+    assert snapshot == warm.summary()
+    assert timeline == warm.timeline()
+
+def test_snapshot_reads_no_tables(tracker, generate_logs, tmp_path, frozen_now):
+    base = str(tmp_path)
+    generate_logs(base, days=8, lines_per_day=3000, players=300, seed=23, tracker=tracker)
+    tracker.StatsEngine(base).import_logs(workers=1)
+    assert_snapshot_matches(tracker, base)
+
+    cold = tracker.StatsEngine(base)
+    cold.write_snapshot()
+    assert not cold.model.tables
+    assert_snapshot_matches(tracker, base)
+
+def test_session_totals_follow_imports(tracker, generate_logs, tmp_path, frozen_now):
+    base = str(tmp_path)
+    generate_logs(base, days=4, lines_per_day=2000, players=120, seed=24, tracker=tracker)
+    engine = tracker.StatsEngine(base)
+    engine.import_logs(workers=1)
+    for tick in range(3):
+        append_joins(base, tick)
+        engine.import_logs(workers=1)
+        assert engine.rollups.sessions_current(engine.store)
+        assert_snapshot_matches(tracker, base)
+    keys = ("peak_players", "avg_players", "avg_match_minutes")
+    fresh = fresh_summary(tracker, base)
+    assert {key: engine.summary()[key] for key in keys} == {key: fresh[key] for key in keys}
+
+def test_rollups_without_session_totals(tracker, generate_logs, tmp_path, frozen_now):
+    base = str(tmp_path)
+    generate_logs(base, days=3, lines_per_day=2000, players=100, seed=25, tracker=tracker)
+    engine = tracker.StatsEngine(base)
+    engine.import_logs(workers=1)
+    expected = engine.summary()
+    # As saved by a version before the totals existed
+    path = os.path.join(engine.stats_dir, tracker.ROLLUPS_JSON)
+    with open(path, encoding='utf-8') as f:
+        data = json.load(f)
+    del data["sessions"]
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+    journal = os.path.join(engine.stats_dir, tracker.ROLLUPS_JOURNAL)
+    if os.path.exists(journal):
+        os.remove(journal)
+
+    old = tracker.StatsEngine(base)
+    assert not old.rollups.sessions_current(old.store)
+    assert old.summary() == expected # from the raw visits meanwhile
+    append_joins(base, "x")
+    old.import_logs(workers=1)
+    assert old.rollups.sessions_current(old.store)
+    assert_snapshot_matches(tracker, base)
+
+def test_peak_over_batches_and_merges(tracker, tmp_path):
+    rng = random.Random(23)
+    day = tracker.to_epoch(datetime(2026, 9, 1))
+    def visits(n):
+        ts = [day + rng.randrange(0, 5 * 86400) for _ in range(n)]
+        return {"ts": ts, "end": [t + rng.choice([0, 60, 900, 4 * 3600]) for t in ts], "player": [rng.randrange(50) for _ in ts]}
+
+    stores, rollups = [], []
+    for name in ("a", "b", "fleet"):
+        (tmp_path / name).mkdir()
+    for name in ("a", "b"):
+        store = tracker.EventStore(str(tmp_path / name))
+        rollup = tracker.Rollups(str(tmp_path / name))
+        for _ in range(6):
+            # Batches land anywhere in the history, overlapping earlier ones
+            batch = store.sort_rows("visits", visits(rng.randrange(1, 80)))
+            store.append("visits", batch)
+            rollup.add("visits", batch)
+            rollup.update_sessions(store)
+            rows = store.load("visits")
+            profile = tracker.ConcurrencyProfile(rows["ts"], rows["end"])
+            assert rollup.sessions_current(store)
+            assert rollup.sessions["peak"] == profile.peak()
+            assert rollup.sessions["first_visit"] == profile.times[0]
+            assert rollup.sessions["visit_seconds"] == sum(e - s for s, e in zip(rows["ts"], rows["end"]))
+        stores.append(store)
+        rollups.append(rollup)
+
+    fleet = tracker.EventStore(str(tmp_path / "fleet"))
+    merged = tracker.Rollups(str(tmp_path / "fleet"))
+    for store, rollup in zip(stores, rollups):
+        fleet.append("visits", store.load("visits"))
+        merged.merge(rollup, {"player": list(range(50))})
+    merged.update_sessions(fleet)
+    rows = fleet.load("visits")
+    assert merged.sessions["peak"] == tracker.ConcurrencyProfile(rows["ts"], rows["end"]).peak()
+    assert merged.sessions["peak"] > max(rollup.sessions["peak"] for rollup in rollups)
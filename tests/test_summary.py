@@ -0,0 +1,24 @@
+from conftest import count_logs
+
+def test_summary_matches_the_logs(tracker, generate_logs, tmp_path):
+    base = str(tmp_path)
+    generate_logs(base, days=4, lines_per_day=3000, players=200, seed=5, tracker=tracker)
+    expected = count_logs(tracker, base)
+    engine = tracker.StatsEngine(base)
+    assert engine.import_logs(workers=1) == 4
+    summary = engine.summary()
+    assert summary["games"] == expected["games"]
+    assert summary["players"] == expected["players"]
+    assert summary["errors"] == sum(expected["errors"].values())
+    assert {k: n for k, n in summary["levels"].items() if n} == dict(expected["levels"])
+    assert summary["gametypes"] == dict(expected["gametypes"])
+    assert {k: n for k, n in summary["error_types"].items() if n} == dict(expected["errors"])
+
+def test_columns_round_trip(tracker, tmp_path):
+    store = tracker.EventStore(str(tmp_path))
+    first = store.append("players", {"ts": tracker.array('q', [100, 200]), "player": tracker.array('I', [store.intern("player", "A"), store.intern("player", "B")])})
+    store.save_dictionary()
+    reopened = tracker.EventStore(str(tmp_path))
+    rows = reopened.load("players")
+    assert first == 0 and list(rows["ts"]) == [100, 200]
+    assert [reopened.lookup("player", code) for code in rows["player"]] == ["A", "B"]
@@ -0,0 +1,34 @@
+import os
+import shutil
+
+PROBLEMS = [
+    "[AUDIO] Warning: buffer underrun on device {i} after {i}0ms",
+    "[R14NETSERVER] Connection to peer 10.0.0.{i}:6792 timed out",
+    "[NETGAME] Service status request failed: 400 Bad Request",
+]
+
+def add_problem_lines(base):
+    log_dir = os.path.join(base, "_local", "r14logs")
+    log = sorted(name for name in os.listdir(log_dir) if name.endswith(".log"))[0]
+    stamp = log[4:14]
+    with open(os.path.join(log_dir, log), 'a', encoding='utf-8') as f:
+        for i in range(30):
+            f.write(f"[{stamp}] [12:00:{i:02d}]: {PROBLEMS[i % 3].format(i=i)}\n")
+
+def test_templates_are_opt_in_and_not_counted_as_errors(tracker, generate_logs, tmp_path):
+    plain, mined = str(tmp_path / "plain"), str(tmp_path / "mined")
+    generate_logs(plain, days=3, lines_per_day=2000, players=100, seed=4, tracker=tracker)
+    add_problem_lines(plain)
+    shutil.copytree(os.path.join(plain, "_local"), os.path.join(mined, "_local"))
+
+    engine = tracker.StatsEngine(plain)
+    engine.import_logs(workers=1)
+    assert engine.summary()["templates"] == {}
+    miner = tracker.StatsEngine(mined, mine_templates=True)
+    miner.import_logs(workers=1)
+    summary = miner.summary()
+    assert sum(summary["templates"].values()) == 20
+
+    expected = engine.summary()
+    assert summary["errors"] == expected["errors"] == sum(expected["error_types"].values())
+    assert miner.timeline(bin_name="day")["errors"] == engine.timeline(bin_name="day")["errors"]
@@ -0,0 +1,32 @@
+import random
+from array import array
+from datetime import datetime, timedelta
+
+def test_time_slice_matches_a_filter(tracker):
+    rng = random.Random(5)
+    ts = array('q', sorted(rng.randrange(1000) for _ in range(500)))
+    for _ in range(200):
+        since = rng.choice([None, rng.randrange(-10, 1010)])
+        until = rng.choice([None, rng.randrange(-10, 1010)])
+        i, j = tracker.time_slice(ts, since, until)
+        expected = [t for t in ts if (since is None or t >= since) and (until is None or t < until)]
+        assert list(ts[i:j]) == expected
+    assert tracker.time_slice(array('q'), 5, 10) == (0, 0)
+
+def test_range_start_keeps_the_old_inclusive_cutoff(tracker):
+    delta = timedelta(hours=24)
+    start = tracker.range_start(delta)
+    # now - log time <= delta, in whole seconds
+    assert datetime.now() - tracker.from_epoch(start) <= delta
+
+def test_ranged_summary_counts_rows_in_range(tracker, generate_logs, tmp_path):
+    base = str(tmp_path)
+    generate_logs(base, days=4, lines_per_day=2000, players=100, seed=13, tracker=tracker)
+    engine = tracker.StatsEngine(base)
+    engine.import_logs(workers=1)
+    levels = engine.store.load("levels")["ts"]
+    players = engine.store.load("players")
+    lo, hi = levels[len(levels) // 4] + 17, levels[3 * len(levels) // 4] - 5
+    summary = engine.summary(since=lo, until=hi)
+    assert summary["games"] == sum(1 for t in levels if lo <= t < hi)
+    assert summary["players"] == len({p for t, p in zip(players["ts"], players["player"]) if lo <= t < hi})
@@ -0,0 +1,59 @@
+import argparse
+from datetime import datetime
+
+import pytest
+
+from conftest import count_logs
+
+HOUR, DAY = 3600, 86400
+
+def test_parse_time_and_range_arguments(tracker):
+    assert tracker.parse_time("2026-05-01") == tracker.to_epoch(datetime(2026, 5, 1))
+    assert tracker.parse_time(" 2026-05-01T18:30 ") == tracker.to_epoch(datetime(2026, 5, 1, 18, 30))
+    with pytest.raises(ValueError, match="Unrecognised date/time"):
+        tracker.parse_time("May 1st")
+    parser = argparse.ArgumentParser()
+    tracker.add_range_arguments(parser)
+    args = parser.parse_args(["--range", "24h", "--since", "2026-05-01", "--until", "2026-05-02 06:00"])
+    assert tracker.parse_range_arguments(args) == (tracker.to_epoch(datetime(2026, 5, 1)), tracker.to_epoch(datetime(2026, 5, 2, 6)))
+    assert tracker.parse_range_arguments(parser.parse_args([])) == (None, None)
+
+def test_bins(tracker):
+    # Weeks start on Monday
+    wednesday = tracker.to_epoch(datetime(2026, 10, 14, 15, 20))
+    assert tracker.from_epoch(tracker.bin_floor(wednesday, tracker.WEEK)) == datetime(2026, 10, 12)
+    assert tracker.from_epoch(tracker.bin_floor(wednesday, DAY)) == datetime(2026, 10, 14)
+    assert tracker.from_epoch(tracker.bin_floor(wednesday, HOUR)) == datetime(2026, 10, 14, 15)
+    target = tracker.TIMELINE_TARGET_BINS
+    assert tracker.pick_bin(HOUR * target) == "hour"
+    assert tracker.pick_bin(HOUR * target + 1) == "day"
+    assert tracker.pick_bin(DAY * target + 1) == "week"
+    assert tracker.pick_bin(10 ** 12) == "week"
+
+def test_timeline_counts_match_the_rows(tracker, generate_logs, tmp_path):
+    base = str(tmp_path)
+    generate_logs(base, days=5, lines_per_day=2000, players=150, seed=20, tracker=tracker)
+    engine = tracker.StatsEngine(base)
+    engine.import_logs(workers=1)
+    levels = engine.model.table("levels")["ts"]
+    players = engine.model.table("players")
+    errors = engine.model.table("errors")["ts"]
+    since = levels[0] + 2 * DAY + 17 * 60 # not on a bin edge
+    until = since + 30 * HOUR + 5
+    for bin_name in ("hour", "day", "week", "auto"):
+        timeline = engine.timeline(since, until, bin_name)
+        edges = [since] + timeline["starts"][1:] + [until]
+        assert timeline["bin"] == ("hour" if bin_name == "auto" else bin_name)
+        assert timeline["games"] == [sum(a <= t < b for t in levels) for a, b in zip(edges, edges[1:])]
+        assert timeline["errors"] == [sum(a <= t < b for t in errors) for a, b in zip(edges, edges[1:])]
+        assert timeline["players"] == [
+            len({p for t, p in zip(players["ts"], players["player"]) if a <= t < b}) for a, b in zip(edges, edges[1:])
+        ]
+    with pytest.raises(ValueError):
+        engine.timeline(since, until, "month")
+    assert engine.timeline(until, since)["starts"] == []
+
+    # A custom range's summary agrees with its timeline, and the whole history with the logs
+    summary = engine.summary(since=since, until=until)
+    assert summary["games"] == sum(engine.timeline(since, until, "day")["games"])
+    assert engine.summary()["games"] == count_logs(tracker, base)["games"]